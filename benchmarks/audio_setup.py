@@ -0,0 +1,70 @@
+"""Per-turn microphone setup latency: a new PyAudio stream per turn vs the shared capture service.
+
+Usage:
+    python -m benchmarks.audio_setup [--turns 10] [--output results.json]
+
+Needs a microphone. "per_turn" is what record_audio_to_file used to pay
+before any audio was read (PortAudio init, stream open, first frame, and
+teardown); "service" is the delay between listen() and the first frame
+reaching the endpointer on the already open stream. The one second
+ambient noise calibration of speech_recognition is not included.
+"""
+import argparse
+import json
+import time
+import numpy as np
+import pyaudio
+from src.utils.audio_capture import AudioCaptureService
+from src.utils.vad import SAMPLE_RATE, frame_samples
+
+
+def per_turn_setup():
+    start = time.perf_counter()
+    p = pyaudio.PyAudio()
+    stream = p.open(format=pyaudio.paInt16, channels=1, rate=SAMPLE_RATE, input=True,
+                    frames_per_buffer=frame_samples())
+    stream.read(frame_samples(), exception_on_overflow=False)
+    first_frame = time.perf_counter() - start
+    stream.stop_stream()
+    stream.close()
+    p.terminate()
+    return first_frame, time.perf_counter() - start
+
+
+def summary(values):
+    return {"ms_p50": 1000 * float(np.percentile(values, 50)), "ms_max": 1000 * float(np.max(values))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    first_frames, totals = zip(*(per_turn_setup() for _ in range(args.turns)))
+
+    setups = []
+    with AudioCaptureService() as service:
+        open_ms = service.stats["open_ms"]
+        for _ in range(args.turns):
+            # Short timeout, only the time to the first frame matters
+            service.listen(timeout=0.5)
+            setups.append(service.stats["listen_setup_ms"] / 1000)
+
+    report = {
+        "per_turn_first_frame": summary(first_frames),
+        "per_turn_with_teardown": summary(totals),
+        "service_open_once_ms": open_ms,
+        "service_listen_first_frame": summary(setups),
+    }
+    for name, row in report.items():
+        print(f"{name:<28} {row if isinstance(row, float) else row['ms_p50']:.1f} ms")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
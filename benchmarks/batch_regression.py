@@ -0,0 +1,55 @@
+"""Nightly regression run: push the known queries through get_responses in one batch.
+
+Usage:
+    python -m benchmarks.batch_regression [--language en] [--questions faq.txt] [--output results.json]
+
+--questions takes a text file with one question per line, added to the
+queries from tests/test_vector_store.py.
+"""
+import argparse
+import json
+import time
+from src.handlers.langchain_handler import LangChainHandler
+
+QUERIES = [
+    "What is Orange Digital Center?",
+    "What programs does ODC offer?",
+    "Tell me about the Coding School at ODC",
+    "What is FabLab?",
+    "How does ODC help startups?",
+    "Upcoming trainings",
+    "formation",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--questions", help="Text file with one extra question per line")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    questions = list(QUERIES)
+    if args.questions:
+        with open(args.questions, encoding='utf-8') as f:
+            questions += [line.strip() for line in f if line.strip()]
+
+    handler = LangChainHandler(args.language)
+    start = time.perf_counter()
+    results = handler.get_responses(questions, args.language)
+    elapsed = time.perf_counter() - start
+
+    for result in results:
+        status = "ERROR" if "error" in result else result["classification"]
+        print(f"[{status}] {result['question']} ({result['timings'].get('total', 0):.2f}s)")
+        print(f"    {result['answer']}")
+    print(f"\n{len(results)} questions in {elapsed:.2f}s")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"elapsed": elapsed, "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
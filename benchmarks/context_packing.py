@@ -0,0 +1,50 @@
+"""Compare the prompt context of the fixed k=5 retriever with the context packer.
+
+Usage:
+    python -m benchmarks.context_packing
+"""
+import statistics
+from src.config import CONTEXT_FETCH_K, CONTEXT_TOKEN_BUDGET
+from src.utils.context_packer import pack_documents
+from src.utils.document_processor import DocumentProcessor
+from src.utils.tokens import estimate_tokens
+
+QUERIES = [
+    "What is Orange Digital Center?",
+    "What programs does ODC offer?",
+    "Tell me about the Coding School at ODC",
+    "What is FabLab?",
+    "How does ODC help startups?",
+    "Upcoming trainings",
+    "formation",
+    "Do you have a 3D printer?",
+    "Est-ce que vous avez un Arduino ?",
+]
+
+
+def context_tokens(docs):
+    return sum(estimate_tokens(doc.page_content) for doc in docs)
+
+
+def main():
+    vector_store = DocumentProcessor.load_vector_store()
+    if vector_store is None:
+        return
+
+    fixed, packed = [], []
+    print(f"{'query':<42} {'k=5':>6} {'packed':>7} {'chunks':>7}")
+    for query in QUERIES:
+        fixed_docs = vector_store.similarity_search(query, k=5)
+        packed_docs = pack_documents(vector_store.similarity_search(query, k=CONTEXT_FETCH_K),
+                                     CONTEXT_TOKEN_BUDGET)
+        fixed.append(context_tokens(fixed_docs))
+        packed.append(context_tokens(packed_docs))
+        print(f"{query[:42]:<42} {fixed[-1]:>6} {packed[-1]:>7} {len(packed_docs):>7}")
+
+    print(f"\nMean context tokens: k=5 {statistics.mean(fixed):.0f}, "
+          f"packed {statistics.mean(packed):.0f} "
+          f"({1 - statistics.mean(packed) / statistics.mean(fixed):.0%} smaller)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Compare embedding backends: load time, memory, query latency, throughput and parity.
+
+Usage:
+    python -m benchmarks.embedding_backends [--backends huggingface onnx] [--threads 2] [--output results.json]
+
+Each backend runs in a fresh process so load time and resident memory are
+not skewed by the other one (torch alone is hundreds of MB). Parity is the
+cosine similarity between each backend's vectors and the first backend's
+(HuggingFaceEmbeddings by default) over the knowledge base chunks, plus the
+share of test queries whose top-5 chunks agree.
+"""
+import argparse
+import json
+import multiprocessing
+import time
+import numpy as np
+from src.utils.document_processor import DocumentProcessor
+from .batch_regression import QUERIES
+
+ROUNDS = 20
+TOP_K = 5
+
+
+def run_backend(backend, threads, texts, queries, results):
+    from src.utils import model_registry
+
+    rss_before = model_registry.resident_memory_mb()
+    start = time.perf_counter()
+    options = {"threads": threads} if backend == "onnx" else {}
+    embeddings = model_registry.create_embeddings(backend, **options)
+    embeddings.embed_query("warm up")
+    load_seconds = time.perf_counter() - start
+
+    latencies = []
+    for _ in range(ROUNDS):
+        for query in queries:
+            start = time.perf_counter()
+            embeddings.embed_query(query)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    vectors = embeddings.embed_documents(texts)
+    throughput = len(texts) / (time.perf_counter() - start)
+
+    results[backend] = {
+        "load_seconds": load_seconds,
+        "rss_mb": model_registry.resident_memory_mb(),
+        "rss_delta_mb": model_registry.resident_memory_mb() - rss_before,
+        "query_ms_p50": 1000 * float(np.percentile(latencies, 50)),
+        "query_ms_p95": 1000 * float(np.percentile(latencies, 95)),
+        "docs_per_second": throughput,
+        "vectors": vectors,
+        "query_vectors": [embeddings.embed_query(query) for query in queries],
+    }
+
+
+def top_k(vectors, queries):
+    return [set(row) for row in np.argsort(-(queries @ vectors.T), axis=1)[:, :TOP_K]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", nargs="+", default=["huggingface", "onnx"])
+    parser.add_argument("--threads", type=int, default=2, help="ONNX Runtime intra-op threads")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    processor = DocumentProcessor()
+    texts = [chunk.page_content for chunk in processor.text_splitter.split_documents(processor.load_documents())]
+
+    context = multiprocessing.get_context("spawn")
+    with context.Manager() as manager:
+        shared = manager.dict()
+        for backend in args.backends:
+            process = context.Process(target=run_backend, args=(backend, args.threads, texts, QUERIES, shared))
+            process.start()
+            process.join()
+        results = dict(shared)
+
+    reference_name = args.backends[0]
+    reference = np.asarray(results[reference_name].pop("vectors"), dtype=np.float32)
+    reference_top = top_k(reference, np.asarray(results[reference_name].pop("query_vectors"), dtype=np.float32))
+    results[reference_name].update({"min_cosine": 1.0, "mean_cosine": 1.0, f"top{TOP_K}_agreement": 1.0})
+    for backend in args.backends[1:]:
+        vectors = np.asarray(results[backend].pop("vectors"), dtype=np.float32)
+        queries = np.asarray(results[backend].pop("query_vectors"), dtype=np.float32)
+        cosines = (reference * vectors).sum(axis=1) / (
+            np.linalg.norm(reference, axis=1) * np.linalg.norm(vectors, axis=1))
+        agreement = np.mean([len(a & b) / TOP_K for a, b in zip(reference_top, top_k(vectors, queries))])
+        results[backend].update({"min_cosine": float(cosines.min()), "mean_cosine": float(cosines.mean()),
+                                 f"top{TOP_K}_agreement": float(agreement)})
+
+    print(f"{len(texts)} chunks, {len(QUERIES)} queries x {ROUNDS}\n")
+    for backend, row in results.items():
+        print(f"{backend:<12} load {row['load_seconds']:.2f}s  RSS +{row['rss_delta_mb']:.0f} MB  "
+              f"query p50 {row['query_ms_p50']:.1f} ms p95 {row['query_ms_p95']:.1f} ms  "
+              f"{row['docs_per_second']:.0f} docs/s  cos min {row['min_cosine']:.4f} "
+              f"top{TOP_K} {row[f'top{TOP_K}_agreement']:.2f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Compare dense-only and hybrid (dense + BM25) retrieval on part-name questions.
+
+Usage:
+    python -m benchmarks.hybrid_retrieval [--k 5] [--output results.json]
+
+Each query is labelled with the name of the item that should be retrieved; a
+hit is a retrieved chunk whose metadata name matches it.
+"""
+import argparse
+import json
+import time
+import numpy as np
+from src.config import CONTEXT_FETCH_K, RRF_K
+from src.utils.document_processor import DocumentProcessor
+from src.utils.hybrid_retriever import HybridRetriever
+
+QUERIES = [
+    ("Do you have an ESP32?", "ESP32 Development Board"),
+    ("Is there a Raspberry Pi 4 8GB?", "Raspberry Pi 4"),
+    ("Can I borrow an Arduino Mega 2560?", "Arduino Mega 2560"),
+    ("L293D motor driver", "L293D Motor Driver"),
+    ("Do you have an NE555 timer?", "NE555"),
+    ("MPU6050 accelerometer", "MPU6050 Sensor Module"),
+    ("Est-ce que vous avez un module LORA ?", "LORA Module"),
+    ("Vous avez un GPS NEO 6 ?", "GPS TTL Upblox NEO 6 V2"),
+    ("SIM900 GSM shield", "GSM/GPRS SIM900 Shield"),
+    ("NEMA17 stepper motor", "NEMA17 Stepper Motor"),
+    ("واش عندكم Meta Quest 2؟", "Meta Quest 2 VR Headset"),
+    ("PIXHAWK PX4 kit for drones", "PIXHAWK PX4 Kit"),
+    ("Do you have a CNC milling machine?", "CNC Milling Machine"),
+    ("LCD 16x02 I2C screen", "LCD 16X02 I2C"),
+    ("Official case for Raspberry Pi 3", "Official Case for Raspberry Pi 3 Model B"),
+]
+
+
+def evaluate(retriever, k):
+    ranks, latencies = [], []
+    for query, expected in QUERIES:
+        start = time.perf_counter()
+        docs = retriever.invoke(query)[:k]
+        latencies.append(time.perf_counter() - start)
+        names = [doc.metadata.get("name") for doc in docs]
+        ranks.append(names.index(expected) + 1 if expected in names else None)
+    return {
+        f"recall@{k}": sum(rank is not None for rank in ranks) / len(ranks),
+        "mrr": sum(1 / rank for rank in ranks if rank) / len(ranks),
+        "latency_ms_p50": 1000 * float(np.percentile(latencies, 50)),
+        "latency_ms_p95": 1000 * float(np.percentile(latencies, 95)),
+        "misses": [query for (query, _), rank in zip(QUERIES, ranks) if rank is None],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    vector_store = DocumentProcessor.load_vector_store()
+    keyword_index = DocumentProcessor.load_keyword_index()
+    if vector_store is None or keyword_index is None:
+        raise SystemExit("No index found. Please run setup.py first.")
+
+    dense = vector_store.as_retriever(search_kwargs={"k": CONTEXT_FETCH_K})
+    retrievers = {
+        "dense": dense,
+        "hybrid": HybridRetriever(dense_retriever=dense, keyword_index=keyword_index,
+                                  fetch_k=CONTEXT_FETCH_K, rrf_k=RRF_K),
+    }
+    # Warm up the embedding model and the caches
+    for retriever in retrievers.values():
+        retriever.invoke(QUERIES[0][0])
+
+    report = {name: evaluate(retriever, args.k) for name, retriever in retrievers.items()}
+    for name, row in report.items():
+        print(f"{name:<8} recall@{args.k} {row[f'recall@{args.k}']:.2f}  MRR {row['mrr']:.2f}  "
+              f"p50 {row['latency_ms_p50']:.1f} ms  p95 {row['latency_ms_p95']:.1f} ms")
+        for query in row["misses"]:
+            print(f"    missed: {query}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Compare FAISS index types on the current knowledge base.
+
+Usage:
+    python -m benchmarks.index_types [--k 5] [--output results.json]
+
+Embeds every chunk of the data directory (served from the embedding cache
+after the first run) and reports recall@k against the exact flat index,
+index size on disk, build time and per-query latency for each INDEX_TYPE.
+"""
+import argparse
+import json
+from src.utils.document_processor import DocumentProcessor
+from src.utils.index_factory import INDEX_TYPES, compare_index_types
+from .batch_regression import QUERIES
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    processor = DocumentProcessor()
+    chunks = processor.text_splitter.split_documents(processor.load_documents())
+    vectors = processor.embeddings.embed_documents([chunk.page_content for chunk in chunks])
+    queries = [processor.embeddings.embed_query(query) for query in QUERIES]
+
+    report = compare_index_types(vectors, queries, k=args.k, index_types=INDEX_TYPES)
+    print(f"{len(vectors)} chunks, {len(queries)} queries\n")
+    print(f"{'type':<10}{'factory':<18}{'recall':>8}{'size KB':>10}{'build s':>9}{'p95 ms':>9}")
+    for index_type, row in report.items():
+        print(f"{index_type:<10}{row['factory']:<18}{row[f'recall@{args.k}']:>8.2f}"
+              f"{row['size_bytes'] / 1024:>10.1f}{row['build_seconds']:>9.3f}{row['query_ms_p95']:>9.3f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
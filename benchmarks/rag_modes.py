@@ -0,0 +1,117 @@
+"""Compare the condense chain with the single_call RAG mode.
+
+Runs scripted kiosk conversations (with follow-ups) through LangChainHandler
+in both modes and reports per-turn latency, number of LLM calls and a simple
+answer-quality score (share of expected keywords found in the answer).
+
+Usage:
+    python -m benchmarks.rag_modes [--output results.json]
+"""
+import argparse
+import json
+import statistics
+import time
+from langchain_core.callbacks import BaseCallbackHandler
+from src.handlers.langchain_handler import LangChainHandler
+
+CONVERSATIONS = [
+    {
+        "language": "en",
+        "turns": [
+            {"question": "Do you have a 3D printer in the FabLab?", "keywords": ["3d", "printer"]},
+            {"question": "How many of them are there?", "keywords": ["printer"]},
+            {"question": "And laser cutters?", "keywords": ["laser"]},
+        ],
+    },
+    {
+        "language": "en",
+        "turns": [
+            {"question": "What is the Coding School?", "keywords": ["coding", "school"]},
+            {"question": "Who can join it?", "keywords": ["student"]},
+            {"question": "Is it free?", "keywords": ["free"]},
+        ],
+    },
+    {
+        "language": "fr",
+        "turns": [
+            {"question": "Qu'est-ce que le FabLab Solidaire ?", "keywords": ["fablab"]},
+            {"question": "Et comment y accéder ?", "keywords": ["fablab"]},
+        ],
+    },
+]
+
+
+class LLMCallCounter(BaseCallbackHandler):
+    """Counts LLM round-trips made by the handler"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def on_llm_start(self, *args, **kwargs):
+        self.calls += 1
+
+    def on_chat_model_start(self, *args, **kwargs):
+        self.calls += 1
+
+
+def keyword_score(answer, keywords):
+    answer = answer.lower()
+    return sum(keyword.lower() in answer for keyword in keywords) / len(keywords)
+
+
+def run_mode(handler, mode):
+    counter = LLMCallCounter()
+    handler.llm_rag.callbacks = [counter]
+    handler.llm_general.callbacks = [counter]
+    handler.rag_mode = mode
+    handler.answer_cache = handler.inventory = None  # Measure the pipeline, not the shortcuts
+
+    turns = []
+    for conversation in CONVERSATIONS:
+        handler.selected_language = conversation["language"]
+        handler.clear_memory()
+        for turn in conversation["turns"]:
+            calls_before = counter.calls
+            start = time.perf_counter()
+            response = handler.get_response(turn["question"])
+            turns.append({
+                "question": turn["question"],
+                "latency": time.perf_counter() - start,
+                "llm_calls": counter.calls - calls_before,
+                "quality": keyword_score(response["answer"], turn["keywords"]),
+                "sources": response["sources"],
+                "answer": response["answer"],
+            })
+
+    latencies = [turn["latency"] for turn in turns]
+    return {
+        "mode": mode,
+        "turns": turns,
+        "mean_latency": statistics.mean(latencies),
+        "median_latency": statistics.median(latencies),
+        "mean_llm_calls": statistics.mean(turn["llm_calls"] for turn in turns),
+        "mean_quality": statistics.mean(turn["quality"] for turn in turns),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="Write the full results as JSON to this file")
+    args = parser.parse_args()
+
+    handler = LangChainHandler()
+    results = [run_mode(handler, mode) for mode in ("condense", "single_call")]
+
+    print(f"{'mode':<12} {'mean s':>8} {'median s':>9} {'LLM calls':>10} {'quality':>8}")
+    for result in results:
+        print(f"{result['mode']:<12} {result['mean_latency']:>8.2f} {result['median_latency']:>9.2f} "
+              f"{result['mean_llm_calls']:>10.2f} {result['mean_quality']:>8.2f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
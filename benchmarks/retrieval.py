@@ -0,0 +1,96 @@
+"""Retrieval benchmark: recall@k, MRR, latency, build time and index size for one index configuration.
+
+Usage:
+    python -m benchmarks.retrieval [--chunk-size 1000] [--chunk-overlap 200] [--index-type flat]
+                                   [--k 1 3 5] [--output results.json] [--baseline previous.json]
+
+Builds an index of the data directory with the given DocumentProcessor
+settings in a temporary directory (the published index is not touched),
+loads it the way the assistant does and runs the labelled en/fr/Darija
+queries of retrieval_queries.json through the dense and hybrid retrievers.
+--baseline prints the change from an earlier --output file.
+"""
+import argparse
+import json
+import tempfile
+from pathlib import Path
+from src.config import CHUNK_SIZE, CHUNK_OVERLAP, INDEX_TYPE, CONTEXT_FETCH_K, RRF_K
+from src.utils import model_registry, vector_store_io
+from src.utils.document_processor import DocumentProcessor
+from src.utils.hybrid_retriever import HybridRetriever
+from src.utils.index_factory import INDEX_TYPES
+from src.utils.keyword_index import KeywordIndex
+from src.utils.retrieval_benchmark import build, compare, evaluate, load_queries
+
+QUERIES_FILE = Path(__file__).with_name("retrieval_queries.json")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--chunk-overlap", type=int, default=CHUNK_OVERLAP)
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default=INDEX_TYPE)
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5])
+    parser.add_argument("--rounds", type=int, default=3, help="Searches per query for the latency percentiles")
+    parser.add_argument("--queries", default=str(QUERIES_FILE), help="Labelled queries (JSON)")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    queries = load_queries(args.queries)
+    processor = DocumentProcessor(args.chunk_size, args.chunk_overlap, args.index_type)
+    top_k = max(args.k)
+
+    with tempfile.TemporaryDirectory() as directory:
+        index_stats = build(processor, Path(directory))
+        vector_store = vector_store_io.load(Path(directory), processor.embeddings)
+        keyword_index = KeywordIndex.open(Path(directory) / vector_store_io.DOCSTORE_FILE)
+
+        dense = vector_store.as_retriever(search_kwargs={"k": max(top_k, CONTEXT_FETCH_K)})
+        retrievers = {"dense": dense}
+        if keyword_index is not None:
+            retrievers["hybrid"] = HybridRetriever(dense_retriever=dense, keyword_index=keyword_index,
+                                                   fetch_k=CONTEXT_FETCH_K, rrf_k=RRF_K)
+        # Warm up the embedding model and the page cache
+        for retriever in retrievers.values():
+            retriever.invoke(queries[0]["query"])
+        results = {name: evaluate(retriever.invoke, queries, args.k, args.rounds)
+                   for name, retriever in retrievers.items()}
+        vector_store.docstore.close()
+        if keyword_index is not None:
+            keyword_index.close()
+
+    report = {
+        "config": {"chunk_size": args.chunk_size, "chunk_overlap": args.chunk_overlap,
+                   "index_type": args.index_type, "model": model_registry.embedding_model_id(), "k": args.k},
+        "index": index_stats,
+        "retrievers": results,
+    }
+
+    print(f"\n{index_stats['chunks']} chunks, built in {index_stats['build_seconds']:.2f}s, "
+          f"{index_stats['size_bytes'] / 1024:.0f} KB on disk, {len(queries)} queries\n")
+    for name, row in results.items():
+        recalls = "  ".join(f"R@{k} {row[f'recall@{k}']:.2f}" for k in args.k)
+        print(f"{name:<8} {recalls}  MRR {row['mrr']:.2f}  "
+              f"p50 {row['latency_ms_p50']:.1f} ms  p95 {row['latency_ms_p95']:.1f} ms")
+        for language, scores in row["by_language"].items():
+            print(f"    {language}: R@{top_k} {scores[f'recall@{top_k}']:.2f}  MRR {scores['mrr']:.2f}")
+        for query in row["misses"]:
+            print(f"    missed: {query}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            changes = compare(report, json.load(f))
+        print(f"\nChange from {args.baseline}:")
+        for name, row in changes.items():
+            print(f"{name:<8} " + "  ".join(f"{metric} {value:+.3f}" for metric, value in row.items()))
+        report["baseline_changes"] = changes
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
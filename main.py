@@ -2,22 +2,27 @@ import asyncio
 import sys
 from pathlib import Path
 from src.assistant import Assistant  # Change to relative import
-from src.utils.utils import recognize_speech_from_mic, record_audio_to_file, transcribe_audio_with_groq  # Updated imports
+from src.utils.utils import record_audio
+from src.utils.speech_to_text import transcribe  # Updated imports
+from src.config import STREAM_RESPONSES, ASSISTANT_SERVER_URL
+from src.handlers.remote_handler import RemoteHandler
 
 async def assistant_main(selected_language='en'):
     # Initialize the Assistant with a greeting message
-    assistant = Assistant("Hello, I'm Orange Digital Center's Assistant. How can I help you?", lang=selected_language)
+    # Thin clients leave the model and the index to the shared server
+    handler = RemoteHandler(ASSISTANT_SERVER_URL, selected_language) if ASSISTANT_SERVER_URL else None
+    assistant = Assistant("Hello, I'm Orange Digital Center's Assistant. How can I help you?", lang=selected_language, handler=handler)
     await assistant.play_speech()
 
     while True:
         # Record and transcribe speech
         question = None
         while not question:
-            record_audio_to_file()
-            question = transcribe_audio_with_groq(language=selected_language)
-            if not question:
-                print("Falling back to speech_recognition...")
-                question = recognize_speech_from_mic(language=selected_language)
+            audio = record_audio()
+            if audio is None:
+                continue  # Nothing was said, listen again
+            # Groq, then Google and the offline model on the same recording if it fails or stalls
+            question = transcribe(audio, language=selected_language)
 
         # Check for exit condition
         if any(exit_phrase in question.lower() for exit_phrase in ["exit", "quit", "goodbye", "bye", "stop", "bslama", "au revoir", "مع السلامة", "وداعا", "بسلامة"]):
@@ -27,8 +32,14 @@ async def assistant_main(selected_language='en'):
 
         print(f"Question: {question}")
 
+        if STREAM_RESPONSES:
+            # Speak each sentence as soon as it is generated
+            response = await assistant.speak_response(question)
+            print(f"Response: {response}")
+            continue
+
         # Get the response
-        response = assistant.get_response(question)
+        response = await assistant.aget_response(question)
         print(f"Response: {response}")
 
         # Update the text and play the response
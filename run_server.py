@@ -0,0 +1,7 @@
+import os
+os.environ["TOKENIZERS_PARALLELISM"] = "false"
+
+from src.server import main
+
+if __name__ == "__main__":
+    main()
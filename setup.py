@@ -4,6 +4,8 @@ os.environ["TOKENIZERS_PARALLELISM"] = "false"
 from pathlib import Path
 from src.utils.event_scraper import EventScraper
 from src.utils.document_processor import DocumentProcessor
+from src.utils import onnx_embeddings
+from src.config import EMBEDDING_BACKEND, ONNX_MODEL_DIR
 
 def setup_assistant():
     print("Setting up ODC Assistant...")
@@ -22,6 +24,10 @@ def setup_assistant():
     else:
         print(f"Successfully scraped {len(events)} events")
     
+    if EMBEDDING_BACKEND == "onnx" and not (ONNX_MODEL_DIR / onnx_embeddings.MODEL_FILE).exists():
+        print("\nPreparing the int8 ONNX embedding model...")
+        onnx_embeddings.prepare_model()
+
     # 3. Process all documents and create vector store
     print("\n2. Processing all documents...")
     processor = DocumentProcessor()
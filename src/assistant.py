@@ -1,28 +1,23 @@
-import os
 import json
-import edge_tts
 from .handlers.langchain_handler import LangChainHandler
-from .utils.utils import speak
+from .utils.speech_player import get_speech_player, synthesize
+from .utils.text_stream import SentenceSplitter
 import asyncio
 
 class Assistant:
-    def __init__(self, text="", lang='en'):
-        """ Initialize the Assistant """
+    def __init__(self, text="", lang='en', handler=None, player=None):
+        """ Initialize the Assistant, handler can be a RemoteHandler on thin clients """
         self.text = text
         self.lang = lang
-        self.langchain_handler = LangChainHandler(selected_language=lang)
+        self.langchain_handler = handler or LangChainHandler(selected_language=lang)
+        self.player = player or get_speech_player()
         
-        # Pre-initialize TTS voices
+        # TTS voices, audio is streamed from edge-tts into the player
         self.voice_names = {
             'en': 'en-US-EmmaMultilingualNeural',
             'fr': 'fr-FR-DeniseNeural',
             'ar': 'ar-MA-MounaNeural'
         }
-        self.voices = {
-            'en': edge_tts.Communicate(text="", voice=self.voice_names['en']),
-            'fr': edge_tts.Communicate(text="", voice=self.voice_names['fr']),
-            'ar': edge_tts.Communicate(text="", voice=self.voice_names['ar'])
-        }
         
         self.basic_chat_patterns = {
             'greetings': ['hey.', 'hello.', 'hi.', 'bonjour.', 'salam.', 'mrhba.'],
@@ -30,20 +25,47 @@ class Assistant:
         }
 
     async def generate_speech(self):
-        """ Generate speech from text using pre-initialized voice """
-        output_file = "temp.mp3"
+        """ Stream the current text to the speech player as it is synthesized """
+        await self.player.play(synthesize(self.text, self.voice_names[self.lang]))
+
+    async def _sentence_audio(self, sentences):
+        """ Audio of queued sentences, the next one is synthesized while the current one plays """
+        while (sentence := await sentences.get()) is not None:
+            try:
+                async for chunk in synthesize(sentence, self.voice_names[self.lang]):
+                    yield chunk
+            except Exception as e:
+                print(f"Error during TTS: {e}")
+
+    async def _speak_sentences(self, sentences):
+        """ Play all queued sentences as one uninterrupted stream """
+        try:
+            await self.player.play(self._sentence_audio(sentences))
+        except Exception as e:
+            print(f"Error during playback: {e}")
+
+    def stop_speech(self):
+        """ Cut the current answer short, e.g. when the user starts talking """
+        self.player.stop()
+
+    async def speak_response(self, question):
+        """ Stream the answer and speak it sentence by sentence, returns the full answer """
+        sentences = asyncio.Queue()
+        speaker = asyncio.create_task(self._speak_sentences(sentences))
+        splitter = SentenceSplitter()
+        answer = ""
         try:
-            # Re-initialize the Communicate object with the current text
-            self.voices[self.lang] = edge_tts.Communicate(text=self.text, voice=self.voice_names[self.lang])
-            await self.voices[self.lang].save(output_file)
-            
-            # Play audio
-            # command = f'mpv --no-terminal {output_file}'
-            command = fr'"C:\Users\Home\Downloads\mpv-i686-w64-mingw32\mpv.exe" {output_file}'
-            os.system(command)
+            async for token in self.astream_response(question):
+                answer += token
+                for sentence in splitter.feed(token):
+                    await sentences.put(sentence)
+            for sentence in splitter.flush():
+                await sentences.put(sentence)
         finally:
-            if os.path.exists(output_file):
-                os.remove(output_file)
+            await sentences.put(None)
+            await speaker
+        self.text = answer
+        return answer
 
     async def play_speech(self):
         try:
@@ -53,7 +75,7 @@ class Assistant:
 
     def change_language(self, lang):
         """ Change the language of the speech """
-        if lang in self.voices:
+        if lang in self.voice_names:
             self.lang = lang
             self.langchain_handler.selected_language = lang
         return self.lang
@@ -97,3 +119,20 @@ class Assistant:
         response = self.langchain_handler.get_response(question)
         return response['answer']
 
+    async def aget_response(self, question):
+        """ Get a response using the speculative async pipeline """
+        if self.is_basic_chat(question):
+            return self.get_basic_response(question)
+
+        response = await self.langchain_handler.aget_response(question)
+        return response['answer']
+
+    async def astream_response(self, question):
+        """ Yield the response tokens as they are generated """
+        if self.is_basic_chat(question):
+            yield self.get_basic_response(question)
+            return
+
+        async for token in self.langchain_handler.astream_response(question):
+            yield token
+
@@ -1,14 +1,127 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).parent.parent
 DATA_DIR = BASE_DIR / "data"
 VECTOR_DB_PATH = DATA_DIR / "vectorstore"
+# Each build is written to its own directory under versions/ and published by
+# atomically replacing INDEX_VERSION_FILE (see src/utils/vector_store_io.py)
+INDEX_VERSION_FILE = VECTOR_DB_PATH / "index_version"
+INDEX_VERSIONS_DIR = VECTOR_DB_PATH / "versions"
+INDEX_KEEP_VERSIONS = 3  # Published versions kept on disk, for rollback and readers still on them
+
+# Embedding model shared by the index, the router and the answer cache
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Embedding backend: "huggingface" (sentence-transformers + torch) or "onnx"
+# (int8 ONNX Runtime, no torch; prepare with python -m src.utils.onnx_embeddings)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "huggingface")
+ONNX_MODEL_DIR = BASE_DIR / "models" / "all-MiniLM-L6-v2-int8"
+ONNX_THREADS = 2  # ONNX Runtime intra-op threads, leave cores for audio on the Pi
+
+# Persistent embedding cache, so unchanged text is never embedded twice
+USE_EMBEDDING_CACHE = True
+EMBEDDING_CACHE_PATH = DATA_DIR / "embedding_cache.sqlite"
+EMBEDDING_CACHE_MAX_ENTRIES = 50000
 
 # Vector DB settings
 # Reduce these values for Pi
 CHUNK_SIZE = 350  # Increased chunk size
 CHUNK_OVERLAP = 50  # Increased overlap
 
+# FAISS index type: "flat", "sq8", "ivf_flat" or "ivf_pq" (see src/utils/index_factory.py)
+# Compressed types save RAM on the Pi; compare them with python -m benchmarks.index_types
+INDEX_TYPE = "flat"
+IVF_NLIST = 64  # Inverted lists, scaled down automatically for small corpora
+IVF_NPROBE = 8  # Lists probed per query
+PQ_M = 48  # Sub-quantizers for ivf_pq, must divide the embedding size (384)
+
+# Intent router settings
+# Local embedding router in front of the LLM classifier
+USE_LOCAL_ROUTER = True
+ROUTER_MARGIN = 0.08  # Below this margin the LLM classifier decides
+ROUTER_HIT_WEIGHT = 0.5  # Weight of the top FAISS hit similarity
+ROUTER_HIT_BASELINE = 0.45  # Top hit similarity considered neutral
+
+# Async pipeline settings
+# Max Cohere calls in flight at once when running branches speculatively
+MAX_INFLIGHT_LLM_CALLS = 3
+
+# RAG settings
+# "condense": ConversationalRetrievalChain rewrites follow-ups with an extra LLM call
+# "single_call": follow-ups are rewritten locally and history goes into the answer prompt
+RAG_MODE = "condense"
+
+# Context packing settings
+# Retrieve more candidates, merge overlapping chunks and keep what fits the budget
+USE_CONTEXT_PACKER = True
+CONTEXT_FETCH_K = 10  # Candidates fetched from the index
+CONTEXT_TOKEN_BUDGET = 350  # Max context tokens sent to the LLM
+
+# Inventory lookup: availability and count questions about FabLab materials
+# are answered from materials_detailed.json without the LLM
+USE_INVENTORY_LOOKUP = True
+INVENTORY_FILE = DATA_DIR / "materials_detailed.json"
+INVENTORY_MATCH_THRESHOLD = 0.85  # Min fuzzy similarity for an item name or keyword
+
+# Hybrid retrieval: BM25 keyword search next to FAISS, fused by reciprocal rank
+# Catches exact part names ("ESP32", "Ender 3") the embeddings rank poorly
+USE_HYBRID_RETRIEVAL = True
+RRF_K = 60  # Rank offset in 1 / (RRF_K + rank), higher flattens the ranks
+
+# Conversation memory settings
+# Older turns are folded into a local summary above this many history tokens
+MEMORY_TOKEN_LIMIT = 500
+MEMORY_SUMMARY_TOKEN_LIMIT = 150
+
+# Semantic answer cache settings
+# Answers are reused for near-identical questions in the same language
+USE_ANSWER_CACHE = True
+ANSWER_CACHE_SIZE = 256  # Max entries per language
+ANSWER_CACHE_TTL = 24 * 3600  # Seconds
+ANSWER_CACHE_SIMILARITY = 0.93  # Min cosine similarity for a hit
+
+# Chat server settings
+# Several kiosks can share one process (python run_server.py) and only do audio I/O
+SERVER_HOST = os.getenv('ASSISTANT_SERVER_HOST', '0.0.0.0')
+SERVER_PORT = int(os.getenv('ASSISTANT_SERVER_PORT', '8080'))
+SERVER_WORKERS = 4  # Threads for embedding, FAISS and other blocking work
+SERVER_SESSION_TTL = 30 * 60  # Idle seconds before a session is dropped
+ASSISTANT_SERVER_URL = os.getenv('ASSISTANT_SERVER_URL')  # Set on thin kiosk clients
+
+# Speech input settings
+# Stop recording once the speaker pauses instead of after a fixed 8 seconds
+VAD_ENDPOINTING = True
+VAD_MODE = os.getenv('VAD_MODE', 'energy')  # 'energy' or 'webrtc' (needs webrtcvad)
+VAD_AGGRESSIVENESS = 2  # WebRTC only, 0 (lenient) to 3 (strict)
+VAD_ENERGY_MARGIN_DB = 12  # Energy only, dB above the noise floor that counts as speech
+VAD_NOISE_WINDOW_MS = 5000  # Energy only, the floor rises to the quietest frame of this window
+VAD_FRAME_MS = 30
+VAD_PRE_ROLL_MS = 300  # Audio kept from before speech was detected
+VAD_MIN_SPEECH_MS = 90  # Voiced audio needed to start an utterance
+VAD_TRAILING_SILENCE_MS = 800  # Silence that ends an utterance
+VAD_NO_SPEECH_TIMEOUT = 8  # Seconds of listening without speech before giving up
+VAD_MAX_RECORDING = 20  # Seconds
+# Recordings stay in memory; set to a path to also save each one as a WAV file for debugging
+DEBUG_AUDIO_FILE = os.getenv('DEBUG_AUDIO_FILE')
+
+# Speech-to-text settings
+# Backends in order of preference, all run on the same recording (see src/utils/speech_to_text.py):
+# "groq", "google", and the offline CPU models "faster_whisper" and "vosk"
+STT_BACKENDS = os.getenv('STT_BACKENDS', 'groq,google,faster_whisper').split(',')
+STT_HEDGE_DELAY = 2.0  # Seconds before the next backend starts too; 0 runs all at once, None only on failure
+FASTER_WHISPER_MODEL = "base"  # Loaded (downloaded once) the first time the backend runs, int8 on CPU
+FASTER_WHISPER_THREADS = 2
+VOSK_MODEL_DIR = BASE_DIR / "models" / "vosk"  # One model directory per language: en, fr, ar
+
+# Speech output settings
+# Stream answer tokens and speak each sentence as soon as it is complete
+STREAM_RESPONSES = True
+# "libmpv": one python-mpv player for the session, audio streamed in as it is synthesized
+# "pipe": an mpv process per answer reading from stdin (MPV_PATH), used when libmpv is missing
+SPEECH_PLAYER = os.getenv('SPEECH_PLAYER', 'libmpv')
+MPV_PATH = os.getenv('MPV_PATH', 'mpv')
+
 # Ensure directories exist
 DATA_DIR.mkdir(exist_ok=True)
 VECTOR_DB_PATH.mkdir(exist_ok=True)
@@ -0,0 +1,120 @@
+import numpy as np
+from ..config import ROUTER_MARGIN, ROUTER_HIT_BASELINE, ROUTER_HIT_WEIGHT
+
+RAG_RELEVANT = "RAG_RELEVANT"
+GENERAL_KNOWLEDGE = "GENERAL_KNOWLEDGE"
+UNCLEAR = "UNCLEAR"
+
+# Labelled exemplars used to build one centroid per category.
+# Keep them short and close to what visitors actually ask at the kiosk.
+EXEMPLARS = {
+    RAG_RELEVANT: [
+        "What programs does the Orange Digital Center offer?",
+        "What are the opening hours of the center?",
+        "Do you have a 3D printer in the FabLab?",
+        "Which materials are available in the FabLab?",
+        "How can I register for a training?",
+        "Are there any upcoming events or trainings?",
+        "Tell me about the Coding School",
+        "How does ODC help startups?",
+        "Do you have an Arduino or a Raspberry Pi?",
+        "Can I use the laser cutter?",
+        "Quels programmes propose l'Orange Digital Center ?",
+        "Est-ce que le FabLab a une imprimante 3D ?",
+        "Comment s'inscrire à une formation ?",
+        "Quels sont les prochains événements ?",
+        "شنو هي البرامج لي كاينين فأورونج ديجيتال سنتر؟",
+        "واش عندكم طابعة ثلاثية الأبعاد فالفاب لاب؟",
+        "كيفاش نتسجل فشي تكوين؟",
+    ],
+    GENERAL_KNOWLEDGE: [
+        "How do I learn to code?",
+        "What is the capital of France?",
+        "Explain what machine learning is",
+        "What is the difference between Python and Java?",
+        "How does the internet work?",
+        "Tell me a joke",
+        "What is the weather like today?",
+        "Who invented the telephone?",
+        "Comment apprendre à programmer ?",
+        "Qu'est-ce que l'intelligence artificielle ?",
+        "Quelle est la capitale du Maroc ?",
+        "شنو هو الذكاء الاصطناعي؟",
+        "كيفاش نتعلم البرمجة؟",
+    ],
+}
+
+
+class IntentRouter:
+    """Classify questions locally with the MiniLM embeddings already loaded for FAISS"""
+
+    def __init__(self, vector_store, exemplars=None):
+        self.vector_store = vector_store
+        self.embeddings = vector_store.embeddings
+        self.exemplars = exemplars or EXEMPLARS
+        self.centroids = {
+            label: self._centroid(self.embeddings.embed_documents(questions))
+            for label, questions in self.exemplars.items()
+        }
+        self.stats = {"total": 0, "local": 0, "fallback": 0}
+
+    @staticmethod
+    def _normalize(vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _centroid(self, vectors):
+        return self._normalize(np.mean([self._normalize(v) for v in vectors], axis=0))
+
+    def top_hit_similarity(self, vector):
+        """Cosine similarity between the query and the closest chunk in the index"""
+        results = self.vector_store.similarity_search_with_score_by_vector(vector.tolist(), k=1)
+        if not results:
+            return 0.0
+        # FAISS returns squared L2 distances; on unit vectors cos = 1 - d^2 / 2
+        _, distance = results[0]
+        return float(1.0 - distance / 2.0)
+
+    def route(self, question, vector=None, hit_similarity=None):
+        """Score a question against the exemplar centroids and the index.
+
+        Returns a dict with the chosen label, or None as label when the margin
+        is too small to decide locally and the LLM classifier should be used.
+        vector and hit_similarity can be passed when already computed.
+        """
+        if vector is None:
+            vector = self.embeddings.embed_query(question)
+        vector = self._normalize(vector)
+
+        rag_similarity = float(self.centroids[RAG_RELEVANT] @ vector)
+        general_similarity = float(self.centroids[GENERAL_KNOWLEDGE] @ vector)
+        if hit_similarity is None:
+            hit_similarity = self.top_hit_similarity(vector)
+
+        margin = (rag_similarity - general_similarity) \
+            + ROUTER_HIT_WEIGHT * (hit_similarity - ROUTER_HIT_BASELINE)
+
+        if margin >= ROUTER_MARGIN:
+            label = RAG_RELEVANT
+        elif margin <= -ROUTER_MARGIN:
+            label = GENERAL_KNOWLEDGE
+        else:
+            label = None
+
+        self.stats["total"] += 1
+        self.stats["local" if label else "fallback"] += 1
+
+        return {
+            "label": label,
+            "margin": margin,
+            "rag_similarity": rag_similarity,
+            "general_similarity": general_similarity,
+            "hit_similarity": hit_similarity,
+        }
+
+    def fallback_rate(self):
+        """Share of routed questions that needed the LLM classifier"""
+        if not self.stats["total"]:
+            return 0.0
+        return self.stats["fallback"] / self.stats["total"]
@@ -0,0 +1,260 @@
+import json
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from ..config import INVENTORY_MATCH_THRESHOLD
+
+# Phrases that make a question an availability or count question, matched on
+# the normalized question (lowercase, no accents, punctuation as spaces)
+COUNT_PATTERNS = ["how many", "combien", "شحال", "ch7al", "chhal"]
+AVAILABILITY_PATTERNS = [
+    "do you have", "have you got", "is there", "are there", "available", "can i use", "can i borrow",
+    "avez vous", "vous avez", "il y a", "y a t il", "disponible",
+    "عندكم", "كاين", "كاينة", "3ndkom", "3andkom", "kayn",
+]
+# Questions about activities mention materials without asking for them
+NOT_INVENTORY_PATTERNS = [
+    "training", "course", "workshop", "event", "program", "class",
+    "formation", "atelier", "cours", "evenement", "programme",
+    "تكوين", "دورة", "ورشة", "برنامج",
+]
+# Amenities of the place that are also item keywords ("wifi" is a keyword of
+# the ESP32): only a full item name answers a question that mentions them
+FACILITY_PATTERNS = [
+    "wifi", "wi fi", "internet", "network", "parking", "room", "space", "coffee", "toilet", "locker",
+    "connexion", "reseau", "salle", "espace", "cafe", "toilettes", "casier",
+    "ويفي", "الويفي", "انترنت", "الانترنت", "كونيكسيون", "بلاصة", "قهوة",
+]
+
+# Words that carry no item information, on top of the intent phrases
+STOPWORDS = {
+    "a", "an", "the", "any", "some", "for", "of", "with", "in", "at", "to", "please", "here", "your", "you",
+    "fablab", "lab", "odc", "center", "centre", "many", "much", "how",
+    "de", "des", "du", "le", "la", "les", "un", "une", "est", "ce", "que", "qu", "pour", "au", "aux", "dans",
+    "واش", "من", "شي", "فيه", "فالفاب", "لاب",
+}
+
+# Keywords shorter than this only match exactly
+MIN_FUZZY_LENGTH = 5
+# Share of the question's content words the matched items must account for,
+# so "laser cutter" is not answered with a hand cutter
+MIN_COVERAGE = 0.6
+WORD_SIMILARITY = 0.8
+MAX_LISTED = 8
+
+TEMPLATES = {
+    'en': {
+        "available_one": "Yes, the FabLab has {item}.",
+        "available_many": "Yes, the FabLab has {count} matching items: {items}.",
+        "count": "The FabLab inventory lists {count} {label}: {items}.",
+        "more": "and {count} more",
+    },
+    'fr': {
+        "available_one": "Oui, le FabLab dispose de {item}.",
+        "available_many": "Oui, le FabLab dispose de {count} articles correspondants : {items}.",
+        "count": "L'inventaire du FabLab compte {count} {label} : {items}.",
+        "more": "et {count} autres",
+    },
+    'ar': {
+        "available_one": "إيه، الفاب لاب عندو {item}.",
+        "available_many": "إيه، الفاب لاب عندو {count} ديال الحوايج: {items}.",
+        "count": "فالفاب لاب كاينين {count} ديال {label}: {items}.",
+        "more": "و {count} خرين",
+    },
+}
+
+
+def normalize(text):
+    """Lowercase, strip accents and turn punctuation into spaces"""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(re.findall(r"[^\W_]+", text))
+
+
+def _contains(text, pattern, prefix=False):
+    """Whole-word (or word-prefix) match on normalized text, where words are single-space separated"""
+    return f" {pattern}{'' if prefix else ' '}" in f" {text} "
+
+
+def _similarity(first, second, threshold):
+    # Cheap upper bounds of ratio first: lengths, then character counts
+    if 2 * min(len(first), len(second)) < threshold * (len(first) + len(second)):
+        return 0.0
+    matcher = SequenceMatcher(None, first, second)
+    if matcher.quick_ratio() < threshold:
+        return 0.0
+    return matcher.ratio()
+
+
+def phrase_score(tokens, phrase, threshold):
+    """Best similarity between phrase and a window of about as many question tokens"""
+    if not phrase:
+        return 0.0
+    if _contains(" ".join(tokens), phrase):
+        return 1.0
+    if len(phrase) < MIN_FUZZY_LENGTH:
+        return 0.0
+    size = len(phrase.split())
+    best = 0.0
+    for width in range(max(1, size - 2), size + 2):
+        for start in range(max(1, len(tokens) - width + 1)):
+            best = max(best, _similarity(" ".join(tokens[start:start + width]), phrase, threshold))
+    return best
+
+
+def content_words(normalized):
+    intent_words = {word for pattern in COUNT_PATTERNS + AVAILABILITY_PATTERNS for word in pattern.split()}
+    # Single letters are mostly French elisions ("d'arduinos", "l'imprimante"), single digits are models
+    return [word for word in normalized.split()
+            if (len(word) > 1 or word.isdigit()) and word not in STOPWORDS and word not in intent_words]
+
+
+class InventoryLookup:
+    """Answer availability and count questions straight from materials_detailed.json.
+
+    lookup() returns None when the question is not an inventory question or
+    nothing matches confidently, so the caller falls through to RAG.
+    """
+
+    def __init__(self, materials, source="", threshold=INVENTORY_MATCH_THRESHOLD):
+        self.source = source
+        self.threshold = threshold
+        self.items = []
+        for category, items in materials.items():
+            category_name = category.replace('_', ' ')
+            for item in items:
+                keywords = {normalize(k) for k in item.get('keywords', []) + [category_name]}
+                self.items.append({
+                    "name": item['name'],
+                    "details": item.get('details'),
+                    "category": category,
+                    "key": normalize(item['name']),
+                    # Bare numbers ("4") and tiny keywords would match almost anything
+                    "keywords": {k for k in keywords if len(k) >= 3 and not k.isdigit()},
+                    "words": set(normalize(" ".join([item['name'], item.get('details') or ""] + list(keywords))).split()),
+                })
+        self.keywords = sorted({k for item in self.items for k in item["keywords"]}, key=len, reverse=True)
+        # Words of item names and keywords, to find candidates before fuzzy phrase matching
+        self.vocabulary = {word for item in self.items for word in item["key"].split()} \
+            | {word for keyword in self.keywords for word in keyword.split()}
+        self.stats = {"total": 0, "answered": 0}
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f)['fablab_materials'], source=str(path), **kwargs)
+
+    @staticmethod
+    def intent(normalized):
+        """'count', 'availability' or None"""
+        if any(_contains(normalized, pattern, prefix=True) for pattern in NOT_INVENTORY_PATTERNS):
+            return None
+        if any(_contains(normalized, pattern) for pattern in COUNT_PATTERNS):
+            return "count"
+        if any(_contains(normalized, pattern) for pattern in AVAILABILITY_PATTERNS):
+            return "availability"
+        return None
+
+    def match(self, question):
+        """Items the question asks about and the phrase that matched them, ([], None) if unsure"""
+        normalized = normalize(question)
+        tokens = normalized.split()
+        similar = self.similar_words(tokens)
+        words = content_words(normalized)
+
+        # A single item only when its full name is in the question ("raspbery
+        # pi 4"), a partial name ("raspberry pi") is a group of items
+        named = [item for item in self.items
+                 if all(word in similar or word in tokens for word in item["key"].split())
+                 and phrase_score(tokens, item["key"], self.threshold) >= self.threshold]
+        if named:
+            longest = max(len(item["key"]) for item in named)
+            named = [item for item in named if len(item["key"]) == longest]
+
+        # Keywords and categories group items ("raspberry pi", "camera"); longest first on ties
+        best_score, label = 0.0, None
+        facility = any(_contains(normalized, pattern, prefix=True) for pattern in FACILITY_PATTERNS)
+        for keyword in [] if facility else self.keywords:
+            if not similar.intersection(keyword.split()):
+                continue
+            score = phrase_score(tokens, keyword, self.threshold)
+            if score > best_score:
+                best_score, label = score, keyword
+        grouped = []
+        if best_score >= self.threshold:
+            grouped = [item for item in self.items
+                       if _contains(item["key"], label) or any(_contains(k, label) for k in item["keywords"])]
+            # Keep the items that account for most of the question, so "case for
+            # raspberry pi 4" is the case and not every Raspberry Pi item
+            coverages = [self.coverage(words, [item]) for item in grouped]
+            grouped = [item for item, coverage in zip(grouped, coverages) if coverage == max(coverages)]
+
+        # The full name wins unless a group explains more of the question
+        named_coverage, grouped_coverage = self.coverage(words, named), self.coverage(words, grouped)
+        if named and named_coverage >= grouped_coverage:
+            items, coverage, label = named, named_coverage, named[0]["name"]
+        else:
+            items, coverage = grouped, grouped_coverage
+        if not items or coverage < MIN_COVERAGE:
+            return [], None
+        return items, label
+
+    def similar_words(self, tokens):
+        """Vocabulary words equal or close to a question word"""
+        return {
+            known for known in self.vocabulary
+            if any(known == token or _similarity(known, token, WORD_SIMILARITY) >= WORD_SIMILARITY
+                   for token in tokens)
+        }
+
+    @staticmethod
+    def coverage(words, items):
+        """Share of the question's content words found in the matched items"""
+        if not words:
+            return 0.0
+        vocabulary = set().union(*(item["words"] for item in items))
+        covered = sum(
+            1 for word in words
+            if word in vocabulary or any(_similarity(word, known, WORD_SIMILARITY) >= WORD_SIMILARITY
+                                         for known in vocabulary)
+        )
+        return covered / len(words)
+
+    @staticmethod
+    def describe(item):
+        return f"{item['name']} ({item['details']})" if item.get("details") else item["name"]
+
+    def format_items(self, items, templates):
+        described = list(dict.fromkeys(self.describe(item) for item in items))
+        listed = ", ".join(described[:MAX_LISTED])
+        if len(described) > MAX_LISTED:
+            listed += " " + templates["more"].format(count=len(described) - MAX_LISTED)
+        return listed
+
+    def lookup(self, question, language='en'):
+        """Templated answer for an inventory question, None to fall through to RAG"""
+        self.stats["total"] += 1
+        intent = self.intent(normalize(question))
+        if intent is None:
+            return None
+        items, label = self.match(question)
+        if not items:
+            return None
+
+        templates = TEMPLATES.get(language, TEMPLATES['en'])
+        if intent == "count":
+            answer = templates["count"].format(count=len(items), label=label,
+                                               items=self.format_items(items, templates))
+        elif len(items) == 1:
+            answer = templates["available_one"].format(item=self.describe(items[0]))
+        else:
+            answer = templates["available_many"].format(count=len(items), items=self.format_items(items, templates))
+
+        self.stats["answered"] += 1
+        return {"answer": answer, "sources": [self.source]}
+
+    def hit_rate(self):
+        """Share of questions answered without the LLM"""
+        if not self.stats["total"]:
+            return 0.0
+        return self.stats["answered"] / self.stats["total"]
@@ -1,9 +1,22 @@
 from langchain_cohere import ChatCohere
 from langchain.chains import ConversationalRetrievalChain
-from langchain.memory import ConversationBufferMemory
 from langchain.prompts import PromptTemplate, ChatPromptTemplate
 from src.utils.document_processor import DocumentProcessor
+from src.handlers.intent_router import IntentRouter
+from src.handlers.inventory_lookup import InventoryLookup
+from src.utils.answer_cache import SemanticCache
+from src.utils.question_rewriter import rewrite_question, is_follow_up
+from src.utils.context_packer import ContextPackingRetriever, pack_documents
+from src.utils.hybrid_retriever import HybridRetriever
+from src.utils.conversation_memory import TokenBudgetMemory
+from src.config import (USE_LOCAL_ROUTER, MAX_INFLIGHT_LLM_CALLS, USE_ANSWER_CACHE,
+                        ANSWER_CACHE_SIZE, ANSWER_CACHE_TTL, ANSWER_CACHE_SIMILARITY, RAG_MODE,
+                        USE_CONTEXT_PACKER, CONTEXT_FETCH_K, CONTEXT_TOKEN_BUDGET, USE_HYBRID_RETRIEVAL, RRF_K,
+                        MEMORY_TOKEN_LIMIT, MEMORY_SUMMARY_TOKEN_LIMIT, USE_INVENTORY_LOOKUP, INVENTORY_FILE)
 import os
+import time
+import asyncio
+import numpy as np
 from dotenv import load_dotenv
 from langchain.chains import LLMChain
 
@@ -15,7 +28,8 @@ class LangChainHandler:
         '4': {'code': 'ar', 'name': 'Moroccan Darija'}
     }
 
-    def __init__(self, selected_language='en'):
+    def __init__(self, selected_language='en', router=None, answer_cache=None, inventory=None):
+        """router, answer_cache and inventory can be passed in to share them between sessions"""
         load_dotenv()
         self.api_key = os.getenv('COHERE_API_KEY')
         
@@ -41,6 +55,7 @@ class LangChainHandler:
             raise ValueError("Failed to load vector store. Please check the DocumentProcessor configuration.")
         
         self.selected_language = selected_language
+        self.rag_mode = RAG_MODE
         self.greetings = {
             'en': "Hello! How can I help you?",
             'fr': "Bonjour! Comment puis-je vous aider?",
@@ -70,26 +85,29 @@ class LangChainHandler:
 
         Answer:"""
         
-        self.memory = ConversationBufferMemory(
+        # Bounded history: old turns are summarized locally past the token limit
+        self.memory = TokenBudgetMemory(
             memory_key="chat_history",
             output_key="answer",
             return_messages=True,
-            input_key="question"
+            input_key="question",
+            max_token_limit=MEMORY_TOKEN_LIMIT,
+            summary_token_limit=MEMORY_SUMMARY_TOKEN_LIMIT
         )
         
         # Custom retriever with control over number of results (k)
-        retriever = self.vector_store.as_retriever(search_kwargs={"k": 5})
+        self.retriever = self.build_retriever(self.vector_store)
+
+        self.rag_prompt = PromptTemplate(
+            template=prompt_template,
+            input_variables=["context", "chat_history", "question"]
+        )
         
         self.chain = ConversationalRetrievalChain.from_llm(
             llm=self.llm_rag, # RAG Specific LLM
-            retriever=retriever,
+            retriever=self.retriever,
             memory=self.memory,
-            combine_docs_chain_kwargs={
-                "prompt": PromptTemplate(
-                    template=prompt_template,
-                    input_variables=["context", "chat_history", "question"]
-                )
-            },
+            combine_docs_chain_kwargs={"prompt": self.rag_prompt},
             return_source_documents=True,
             chain_type="stuff",
             # question_generator=None, # set to None for no standalone question generation
@@ -139,6 +157,51 @@ class LangChainHandler:
         Question: {question}
         Category:
         """
+        self.classification_chain = LLMChain(llm=self.llm_general, prompt=PromptTemplate(template=self.classification_prompt))
+
+        # Local router answers most questions without a Cohere round-trip
+        if router is None and USE_LOCAL_ROUTER:
+            router = IntentRouter(self.vector_store)
+        self.router = router
+
+        # Caps concurrent Cohere calls in the async mode (created per event loop)
+        self._llm_semaphore = None
+        self._llm_semaphore_loop = None
+
+        # Filled by astream_response once a streamed answer is complete
+        self.last_response = None
+
+        # Answers to near-identical questions, dropped when a new index is written
+        if answer_cache is None and USE_ANSWER_CACHE:
+            answer_cache = SemanticCache(
+                max_size=ANSWER_CACHE_SIZE,
+                ttl=ANSWER_CACHE_TTL,
+                threshold=ANSWER_CACHE_SIMILARITY,
+                version_fn=DocumentProcessor.index_version
+            )
+        self.answer_cache = answer_cache
+
+        # Availability and count questions about materials skip the LLM entirely
+        if inventory is None and USE_INVENTORY_LOOKUP:
+            inventory = InventoryLookup.from_file(INVENTORY_FILE)
+        self.inventory = inventory
+
+    @staticmethod
+    def build_retriever(vector_store):
+        """Retriever used by every RAG path.
+
+        Dense results are fused with BM25 keyword hits when hybrid retrieval is
+        enabled, then packed into a token budget when the packer is enabled.
+        """
+        k = CONTEXT_FETCH_K if USE_CONTEXT_PACKER else 5
+        retriever = vector_store.as_retriever(search_kwargs={"k": k})
+        keyword_index = DocumentProcessor.load_keyword_index() if USE_HYBRID_RETRIEVAL else None
+        if keyword_index is not None:
+            retriever = HybridRetriever(dense_retriever=retriever, keyword_index=keyword_index,
+                                        fetch_k=k, rrf_k=RRF_K)
+        if not USE_CONTEXT_PACKER:
+            return retriever
+        return ContextPackingRetriever(base_retriever=retriever, token_budget=CONTEXT_TOKEN_BUDGET)
 
     @classmethod
     def select_language(cls):
@@ -175,11 +238,76 @@ class LangChainHandler:
         else:
             return "Hello! How can I help you?"
     
-    def classify_question(self, question):
+    def embed_question(self, question):
+        """Embed a question with the same model as the index"""
+        return self.vector_store.embeddings.embed_query(question)
+
+    def refresh_index(self):
+        """Switch to a newly published index between turns.
+
+        The new version loads in the background, so a turn never waits for it;
+        the conversation memory is kept.
+        """
+        vector_store = DocumentProcessor.published_vector_store()
+        if vector_store is None or vector_store is self.vector_store:
+            return
+        self.vector_store = vector_store
+        self.retriever = self.build_retriever(vector_store)
+        self.chain.retriever = self.retriever
+        if self.router is not None:
+            self.router.vector_store = vector_store
+
+    def lookup_inventory(self, question):
+        """Templated answer from the materials inventory, None when RAG is needed"""
+        if self.inventory is None:
+            return None
+        result = self.inventory.lookup(question, self.selected_language)
+        if result is not None:
+            print(f"Inventory answer (hit rate {self.inventory.hit_rate():.0%})")
+            self.memory.save_context({"question": question}, {"answer": result["answer"]})
+        return result
+
+    def lookup_cache(self, question):
+        """Return (question embedding, cached response or None)"""
+        if self.answer_cache is None:
+            return None, None
+        try:
+            vector = self.embed_question(question)
+            # The answer to a follow-up depends on this conversation, not only on its words
+            if is_follow_up(question, self.selected_language):
+                return vector, None
+            cached = self.answer_cache.get(vector, self.selected_language)
+        except Exception as e:
+            print(f"Error reading answer cache: {e}")
+            return None, None
+        if cached is not None:
+            print(f"Answer cache hit (hit rate {self.answer_cache.hit_rate():.0%})")
+            if cached["sources"]:
+                self.memory.save_context({"question": question}, {"answer": cached["answer"]})
+        return vector, cached
+
+    def store_in_cache(self, question, vector, response):
+        if self.answer_cache is not None and vector is not None and response.get("answer") \
+                and not is_follow_up(question, self.selected_language):
+            self.answer_cache.put(question, vector, self.selected_language, response)
+
+    def classify_question(self, question, vector=None):
         """Classifies the input question as RAG_RELEVANT, GENERAL_KNOWLEDGE or UNCLEAR"""
+        if self.router is not None:
+            try:
+                route = self.router.route(question, vector)
+                if route["label"]:
+                    return route["label"]
+                print(f"Router margin {route['margin']:.3f} is ambiguous, using LLM classifier "
+                      f"(fallback rate {self.router.fallback_rate():.0%})")
+            except Exception as e:
+                print(f"Error in local router: {e}")
+        return self.classify_question_with_llm(question)
+
+    def classify_question_with_llm(self, question):
+        """Classifies the input question with a Cohere call"""
         try:
-            classification_chain = LLMChain(llm = self.llm_general, prompt=PromptTemplate(template=self.classification_prompt))
-            response = classification_chain.invoke({"question": question})
+            response = self.classification_chain.invoke({"question": question})
             classification = response['text'].strip()
             return classification
         except Exception as e:
@@ -187,34 +315,359 @@ class LangChainHandler:
 
     def get_response(self, question, context=""):
         try:
-            classification = self.classify_question(question)
+            self.refresh_index()
+            inventory_answer = self.lookup_inventory(question)
+            if inventory_answer is not None:
+                return inventory_answer
 
-            if classification == "RAG_RELEVANT":
-                memory_variables = self.memory.load_memory_variables({})
-                chat_history = memory_variables.get("chat_history", "")
+            vector, cached = self.lookup_cache(question)
+            if cached is not None:
+                return cached
+
+            classification = self.classify_question(question, vector)
+
+            if classification == "RAG_RELEVANT" and self.rag_mode == "single_call":
+                result = self.single_call_rag(question)
+            elif classification == "RAG_RELEVANT":
                 response = self.chain.invoke({
                     "question": question,
                     "language": self.selected_language
                 })
-                return {
+                result = {
                     "answer": response.get("answer", "No answer generated"),
                     "sources": [doc.metadata.get('source', 'Unknown')
                             for doc in response.get("source_documents", [])]
                 }
             elif classification == "GENERAL_KNOWLEDGE":
                 response = self.general_chain.invoke({"question": question})
-                return {"answer": response['text'], "sources": []}
+                result = {"answer": response['text'], "sources": []}
             else:
                 # Use general LLM for fallback
                 response = self.general_chain.invoke({"question": question})
-                return {"answer": response['text'], "sources": []}
+                result = {"answer": response['text'], "sources": []}
+
+            self.store_in_cache(question, vector, result)
+            return result
+        except Exception as e:
+            return self.error_response()
+
+    def error_response(self, language=None):
+        """Localized answer returned when the pipeline fails, in the session language by default"""
+        language = language or self.selected_language
+        error_messages = {
+            'en': "Sorry, I encountered an error.",
+            'fr': "Désolé, j'ai rencontré une erreur.",
+            'ar': "عذراً، حدث خطأ ما."
+        }
+        return {"answer": error_messages.get(language, error_messages['en']), "sources": []}
+
+    def format_chat_history(self):
+        """Render the memory as the plain text history the RAG prompt expects"""
+        messages = self.memory.load_memory_variables({}).get("chat_history", [])
+        lines = []
+        for message in messages:
+            if message.type == "system":
+                lines.append(message.content)
+                continue
+            role = "Human" if message.type == "human" else "Assistant"
+            lines.append(f"{role}: {message.content}")
+        return "\n".join(lines)
+
+    def last_user_question(self):
+        """Most recent question stored in memory, None on the first turn"""
+        messages = self.memory.load_memory_variables({}).get("chat_history", [])
+        for message in reversed(messages):
+            if message.type == "human":
+                return message.content
+        return None
+
+    def retrieval_query(self, question):
+        """Standalone query for retrieval, rewritten locally in single_call mode"""
+        return rewrite_question(question, self.last_user_question(), self.selected_language)
+
+    def single_call_rag(self, question):
+        """Answer a RAG question with one Cohere call and no question condensing"""
+        chat_history = self.format_chat_history()
+        docs = self.retriever.invoke(self.retrieval_query(question))
+        answer = self.chain.combine_docs_chain.invoke({
+            "input_documents": docs,
+            "question": question,
+            "chat_history": chat_history,
+            "language": self.selected_language
+        })['output_text']
+        self.memory.save_context({"question": question}, {"answer": answer})
+        return {
+            "answer": answer or "No answer generated",
+            "sources": [doc.metadata.get('source', 'Unknown') for doc in docs]
+        }
+
+    def _llm_slot(self):
+        """Semaphore limiting in-flight LLM calls on the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._llm_semaphore is None or self._llm_semaphore_loop is not loop:
+            self._llm_semaphore = asyncio.Semaphore(MAX_INFLIGHT_LLM_CALLS)
+            self._llm_semaphore_loop = loop
+        return self._llm_semaphore
+
+    async def aclassify_question(self, question, vector=None):
+        """Async classification: local router in a thread, LLM classifier as fallback"""
+        if self.router is not None:
+            try:
+                route = await asyncio.to_thread(self.router.route, question, vector)
+                if route["label"]:
+                    return route["label"]
+                print(f"Router margin {route['margin']:.3f} is ambiguous, using LLM classifier "
+                      f"(fallback rate {self.router.fallback_rate():.0%})")
+            except Exception as e:
+                print(f"Error in local router: {e}")
+        try:
+            async with self._llm_slot():
+                response = await self.classification_chain.ainvoke({"question": question})
+            return response['text'].strip()
+        except Exception as e:
+            return "UNCLEAR"
+
+    async def _aretrieve(self, question, chat_history):
+        """Condense the question (when there is history) and retrieve documents.
+
+        Returns the question to put in the answer prompt and the documents.
+        """
+        if self.rag_mode == "single_call":
+            docs = await self.retriever.ainvoke(self.retrieval_query(question))
+            return question, docs
+
+        standalone_question = question
+        if chat_history:
+            async with self._llm_slot():
+                standalone_question = await self.chain.question_generator.ainvoke({
+                    "question": question,
+                    "chat_history": chat_history
+                })
+            standalone_question = standalone_question['text']
+
+        docs = await self.retriever.ainvoke(standalone_question)
+        return standalone_question, docs
+
+    async def _arag_answer(self, question, chat_history):
+        """Condense (when there is history), retrieve and answer without touching memory"""
+        standalone_question, docs = await self._aretrieve(question, chat_history)
+
+        async with self._llm_slot():
+            answer = await self.chain.combine_docs_chain.ainvoke({
+                "input_documents": docs,
+                "question": standalone_question,
+                "chat_history": chat_history,
+                "language": self.selected_language
+            })
+        return answer['output_text'], docs
+
+    async def _ageneral_answer(self, question):
+        async with self._llm_slot():
+            response = await self.general_chain.ainvoke({"question": question})
+        return response['text']
+
+    async def aget_response(self, question, context=""):
+        """Async get_response that speculatively runs both branches during classification.
+
+        Retrieval + RAG generation and the general chain start together with the
+        classifier; once the class is known the losing branch is cancelled.
+        """
+        rag_task = general_task = None
+        try:
+            self.refresh_index()
+            inventory_answer = await asyncio.to_thread(self.lookup_inventory, question)
+            if inventory_answer is not None:
+                return inventory_answer
+
+            vector, cached = await asyncio.to_thread(self.lookup_cache, question)
+            if cached is not None:
+                return cached
+
+            chat_history = self.format_chat_history()
+            rag_task = asyncio.create_task(self._arag_answer(question, chat_history))
+            general_task = asyncio.create_task(self._ageneral_answer(question))
+
+            classification = await self.aclassify_question(question, vector)
+
+            if classification == "RAG_RELEVANT":
+                general_task.cancel()
+                answer, docs = await rag_task
+                self.memory.save_context({"question": question}, {"answer": answer})
+                result = {
+                    "answer": answer or "No answer generated",
+                    "sources": [doc.metadata.get('source', 'Unknown') for doc in docs]
+                }
+            else:
+                # GENERAL_KNOWLEDGE and UNCLEAR both use the general LLM
+                rag_task.cancel()
+                result = {"answer": await general_task, "sources": []}
+
+            self.store_in_cache(question, vector, result)
+            return result
         except Exception as e:
-            error_messages = {
-                'en': "Sorry, I encountered an error.",
-                'fr': "Désolé, j'ai rencontré une erreur.",
-                'ar': "عذراً، حدث خطأ ما."
-            }
-            return {"answer": error_messages.get(self.selected_language, error_messages['en']), "sources": []}
+            return self.error_response()
+        finally:
+            for task in (rag_task, general_task):
+                if task is None:
+                    continue
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    task.exception()  # Mark a failed losing branch as retrieved
+
+    async def astream_response(self, question):
+        """Yield answer tokens as they arrive from Cohere.
+
+        The complete response (answer and sources) is available in
+        self.last_response once the generator is exhausted.
+        """
+        self.last_response = None
+        answer = ""
+        try:
+            self.refresh_index()
+            inventory_answer = await asyncio.to_thread(self.lookup_inventory, question)
+            if inventory_answer is not None:
+                self.last_response = inventory_answer
+                yield inventory_answer["answer"]
+                return
+
+            vector, cached = await asyncio.to_thread(self.lookup_cache, question)
+            if cached is not None:
+                self.last_response = cached
+                yield cached["answer"]
+                return
+
+            classification = await self.aclassify_question(question, vector)
+
+            if classification == "RAG_RELEVANT":
+                chat_history = self.format_chat_history()
+                standalone_question, docs = await self._aretrieve(question, chat_history)
+                prompt = self.rag_prompt.format(
+                    context="\n\n".join(doc.page_content for doc in docs),
+                    chat_history=chat_history,
+                    question=standalone_question,
+                    language=self.selected_language
+                )
+                llm, sources = self.llm_rag, [doc.metadata.get('source', 'Unknown') for doc in docs]
+            else:
+                prompt = self.general_chain.prompt.format(question=question)
+                llm, sources = self.llm_general, []
+
+            async with self._llm_slot():
+                async for chunk in llm.astream(prompt):
+                    if chunk.content:
+                        answer += chunk.content
+                        yield chunk.content
+
+            if classification == "RAG_RELEVANT":
+                self.memory.save_context({"question": question}, {"answer": answer})
+            self.last_response = {"answer": answer, "sources": sources}
+            self.store_in_cache(question, vector, self.last_response)
+        except Exception as e:
+            print(f"Error while streaming response: {e}")
+            if not answer:
+                self.last_response = self.error_response()
+                yield self.last_response["answer"]
+            else:
+                self.last_response = {"answer": answer, "sources": []}
+
+    def batch_search(self, vectors, k):
+        """Search the index for many query vectors in one FAISS call.
+
+        Returns, per query, the documents in relevance order and the squared L2
+        distance of the top hit.
+        """
+        distances, indices = self.vector_store.index.search(np.asarray(vectors, dtype=np.float32), k)
+        results = []
+        for row_distances, row_indices in zip(distances, indices):
+            docs = [
+                self.vector_store.docstore.search(self.vector_store.index_to_docstore_id[int(i)])
+                for i in row_indices if i != -1
+            ]
+            results.append((docs, float(row_distances[0]) if len(docs) else None))
+        return results
+
+    async def _abatch_item(self, question, vector, docs, top_distance, language):
+        """Classify and answer one batch item; batch items are independent of the memory"""
+        start = time.perf_counter()
+        if self.inventory is not None:
+            result = self.inventory.lookup(question, language)
+            if result is not None:
+                done = time.perf_counter()
+                return {"question": question, "classification": "INVENTORY", **result,
+                        "timings": {"classify": done - start, "llm": 0.0, "total": done - start}}
+        classification = None
+        if self.router is not None:
+            # Reuse the batched search for the router's top hit similarity
+            hit_similarity = 1.0 - top_distance / 2.0 if top_distance is not None else 0.0
+            classification = self.router.route(question, vector, hit_similarity)["label"]
+        if classification is None:
+            async with self._llm_slot():
+                response = await self.classification_chain.ainvoke({"question": question})
+            classification = response['text'].strip()
+        classified = time.perf_counter()
+
+        if classification == "RAG_RELEVANT":
+            if USE_CONTEXT_PACKER:
+                docs = pack_documents(docs, CONTEXT_TOKEN_BUDGET)
+            async with self._llm_slot():
+                response = await self.chain.combine_docs_chain.ainvoke({
+                    "input_documents": docs,
+                    "question": question,
+                    "chat_history": "",
+                    "language": language
+                })
+            answer = response['output_text']
+            sources = [doc.metadata.get('source', 'Unknown') for doc in docs]
+        else:
+            answer, sources = await self._ageneral_answer(question), []
+
+        done = time.perf_counter()
+        return {
+            "question": question,
+            "classification": classification,
+            "answer": answer,
+            "sources": sources,
+            "timings": {"classify": classified - start, "llm": done - classified, "total": done - start},
+        }
+
+    async def aget_responses(self, questions, language=None):
+        """Answer many independent questions at once.
+
+        All questions are embedded in one batch and searched with a single FAISS
+        matrix search; LLM calls run concurrently under MAX_INFLIGHT_LLM_CALLS.
+        Results come back in input order with per-item timings.
+        """
+        language = language or self.selected_language
+        if not questions:
+            return []
+        self.refresh_index()
+
+        start = time.perf_counter()
+        vectors = await asyncio.to_thread(self.vector_store.embeddings.embed_documents, list(questions))
+        embedded = time.perf_counter()
+        k = CONTEXT_FETCH_K if USE_CONTEXT_PACKER else 5
+        searches = await asyncio.to_thread(self.batch_search, vectors, k)
+        searched = time.perf_counter()
+
+        items = await asyncio.gather(*[
+            self._abatch_item(question, vector, docs, top_distance, language)
+            for question, vector, (docs, top_distance) in zip(questions, vectors, searches)
+        ], return_exceptions=True)
+
+        results = []
+        for question, item in zip(questions, items):
+            if isinstance(item, Exception):
+                item = {"question": question, "classification": None, "error": str(item),
+                        "timings": {}, **self.error_response(language)}
+            item["timings"]["embed_batch"] = embedded - start
+            item["timings"]["search_batch"] = searched - embedded
+            results.append(item)
+        return results
+
+    def get_responses(self, questions, language=None):
+        """Synchronous wrapper around aget_responses"""
+        return asyncio.run(self.aget_responses(questions, language))
 
 if __name__ == "__main__":
     # Get language preference at startup
@@ -253,6 +706,7 @@ if __name__ == "__main__":
                 print("\nAssistant:", response['answer'])
                 if response['sources']:
                     print("\nSources:", ", ".join(response['sources']))
+                print(f"History tokens: {handler.memory.history_tokens()}")
             print("-" * 50)
             
         except KeyboardInterrupt:
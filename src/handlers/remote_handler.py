@@ -0,0 +1,91 @@
+import requests
+import aiohttp
+
+
+class RemoteHandler:
+    """Drop-in replacement for LangChainHandler that talks to the chat server (src/server.py).
+
+    Thin kiosk clients use it so they do not load the model or the index.
+    """
+
+    def __init__(self, server_url, selected_language='en'):
+        self.server_url = server_url.rstrip('/')
+        response = requests.post(f"{self.server_url}/sessions", json={"language": selected_language}, timeout=30)
+        response.raise_for_status()
+        self.session_id = response.json()['session_id']
+        self._selected_language = selected_language
+        self.last_response = None
+
+    @property
+    def session_url(self):
+        return f"{self.server_url}/sessions/{self.session_id}"
+
+    @property
+    def selected_language(self):
+        return self._selected_language
+
+    @selected_language.setter
+    def selected_language(self, language):
+        requests.post(f"{self.session_url}/language", json={"language": language}, timeout=10).raise_for_status()
+        self._selected_language = language
+
+    def error_response(self, language=None):
+        """Localized answer returned when the server fails, in the session language by default"""
+        language = language or self._selected_language
+        error_messages = {
+            'en': "Sorry, I encountered an error.",
+            'fr': "Désolé, j'ai rencontré une erreur.",
+            'ar': "عذراً، حدث خطأ ما."
+        }
+        return {"answer": error_messages.get(language, error_messages['en']), "sources": []}
+
+    def clear_memory(self):
+        """Start a fresh server session, which drops the conversation memory"""
+        requests.delete(self.session_url, timeout=10)
+        response = requests.post(f"{self.server_url}/sessions", json={"language": self._selected_language}, timeout=30)
+        response.raise_for_status()
+        self.session_id = response.json()['session_id']
+
+    def get_response(self, question, context=""):
+        try:
+            response = requests.post(f"{self.session_url}/messages", json={"question": question}, timeout=60)
+            response.raise_for_status()
+            return response.json()
+        except requests.RequestException as e:
+            print(f"Error contacting assistant server: {e}")
+            return self.error_response()
+
+    async def aget_response(self, question, context=""):
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.post(f"{self.session_url}/messages", json={"question": question}) as response:
+                    response.raise_for_status()
+                    return await response.json()
+        except aiohttp.ClientError as e:
+            print(f"Error contacting assistant server: {e}")
+            return self.error_response()
+
+    async def astream_response(self, question):
+        """Yield answer tokens streamed over the session WebSocket"""
+        self.last_response = None
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.ws_connect(f"{self.session_url}/ws") as ws:
+                    await ws.send_json({"question": question})
+                    async for message in ws:
+                        if message.type != aiohttp.WSMsgType.TEXT:
+                            break  # ERROR, the socket closes without a final message
+                        data = message.json()
+                        if data['type'] == 'token':
+                            yield data['text']
+                        elif data['type'] == 'done':
+                            self.last_response = {"answer": data.get('answer', ''), "sources": data.get('sources', [])}
+                            break
+                        else:
+                            break  # Server error, answered below
+        except aiohttp.ClientError as e:
+            print(f"Error contacting assistant server: {e}")
+        if self.last_response is None:
+            print("Assistant server closed the stream before answering")
+            self.last_response = self.error_response()
+            yield self.last_response['answer']
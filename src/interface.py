@@ -3,7 +3,10 @@ from tkinter import font
 from itertools import cycle
 import asyncio
 from src.assistant import Assistant  # Import the Assistant class
-from src.utils.utils import recognize_speech_from_mic, record_audio_to_file, transcribe_audio_with_groq
+from src.utils.utils import record_audio
+from src.utils.speech_to_text import transcribe
+from src.config import STREAM_RESPONSES, ASSISTANT_SERVER_URL
+from src.handlers.remote_handler import RemoteHandler
 
 root = tk.Tk()
 root.title("AI Assistant Interface")
@@ -127,18 +130,20 @@ def show_listening_interface(language):
     exit_button.place(relx=0.98, rely=0.02, anchor="ne")
 
 async def assistant_main_loop(language):
-    assistant = Assistant("Hello, I'm Orange Digital Center's Assistant. How can I help you?", lang=language)
+    # Thin clients leave the model and the index to the shared server
+    handler = RemoteHandler(ASSISTANT_SERVER_URL, language) if ASSISTANT_SERVER_URL else None
+    assistant = Assistant("Hello, I'm Orange Digital Center's Assistant. How can I help you?", lang=language, handler=handler)
     await assistant.play_speech()
 
     while True:
         # Record and transcribe speech
         question = None
         while not question:
-            record_audio_to_file()
-            question = transcribe_audio_with_groq(language=language)
-            if not question:
-                print("Falling back to speech_recognition...")
-                question = recognize_speech_from_mic(language=language)
+            audio = record_audio()
+            if audio is None:
+                continue  # Nothing was said, listen again
+            # Groq, then Google and the offline model on the same recording if it fails or stalls
+            question = await asyncio.to_thread(transcribe, audio, language=language)
 
         # Check for exit condition
         if question.lower() in ["exit", "quit", "goodbye", "bye", "stop", "bslama", "au revoir"]:
@@ -148,8 +153,14 @@ async def assistant_main_loop(language):
 
         print(f"Question: {question}")
 
+        if STREAM_RESPONSES:
+            # Speak each sentence as soon as it is generated
+            response = await assistant.speak_response(question)
+            print(f"Response: {response}")
+            continue
+
         # Get the response
-        response = assistant.get_response(question)
+        response = await assistant.aget_response(question)
         print(f"Response: {response}")
 
         # Update the text and play the response
@@ -0,0 +1,192 @@
+"""Multi-session chat server.
+
+One process loads the embedding model, the FAISS index, the intent router and
+the answer cache once; every kiosk gets its own session (memory + language)
+and only does audio I/O locally.
+
+HTTP:
+    POST   /sessions                     {"language": "en"} -> {"session_id", "greeting"}
+    POST   /sessions/{id}/messages       {"question": "..."} -> {"answer", "sources"}
+    POST   /sessions/{id}/language       {"language": "fr"}
+    DELETE /sessions/{id}
+    GET    /health
+WebSocket:
+    GET    /sessions/{id}/ws             send {"question": "..."}, receive
+                                         {"type": "token", "text"} ... {"type": "done", "answer", "sources"}
+"""
+import asyncio
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from aiohttp import web, WSMsgType
+from .config import (SERVER_HOST, SERVER_PORT, SERVER_WORKERS, SERVER_SESSION_TTL, USE_LOCAL_ROUTER,
+                     USE_ANSWER_CACHE, ANSWER_CACHE_SIZE, ANSWER_CACHE_TTL, ANSWER_CACHE_SIMILARITY,
+                     USE_INVENTORY_LOOKUP, INVENTORY_FILE)
+from .handlers.intent_router import IntentRouter
+from .handlers.inventory_lookup import InventoryLookup
+from .handlers.langchain_handler import LangChainHandler
+from .utils.answer_cache import SemanticCache
+from .utils.document_processor import DocumentProcessor
+from .utils import model_registry
+
+LANGUAGES = {lang['code'] for lang in LangChainHandler.SUPPORTED_LANGUAGES.values()}
+EXPIRY_TASK = web.AppKey("expiry_task", asyncio.Task)
+
+
+class ChatSession:
+    def __init__(self, handler):
+        self.handler = handler
+        self.lock = asyncio.Lock()  # One turn at a time per kiosk
+        self.last_seen = time.time()
+
+
+class ChatServer:
+    def __init__(self, handler_factory=None):
+        """handler_factory(language) builds a session handler, by default a LangChainHandler on the shared state"""
+        self.sessions = {}
+        self.executor = ThreadPoolExecutor(max_workers=SERVER_WORKERS, thread_name_prefix="assistant")
+        self.router = self.answer_cache = self.inventory = None
+        self.handler_factory = handler_factory or self.load_shared_state()
+
+    def load_shared_state(self):
+        """Load the index, router, answer cache and inventory once, return the session handler factory"""
+        vector_store = DocumentProcessor.load_vector_store()
+        if vector_store is None:
+            raise ValueError("Failed to load vector store. Please run setup.py first.")
+        # Shared by every session
+        self.router = IntentRouter(vector_store) if USE_LOCAL_ROUTER else None
+        self.answer_cache = SemanticCache(
+            max_size=ANSWER_CACHE_SIZE,
+            ttl=ANSWER_CACHE_TTL,
+            threshold=ANSWER_CACHE_SIMILARITY,
+            version_fn=DocumentProcessor.index_version
+        ) if USE_ANSWER_CACHE else None
+        self.inventory = InventoryLookup.from_file(INVENTORY_FILE) if USE_INVENTORY_LOOKUP else None
+        return lambda language: LangChainHandler(language, router=self.router, answer_cache=self.answer_cache,
+                                                 inventory=self.inventory)
+
+    async def create_handler(self, language):
+        # Building the chains is blocking but cheap: model and index come from the registry
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.handler_factory, language)
+
+    def get_session(self, request):
+        session = self.sessions.get(request.match_info['session_id'])
+        if session is None:
+            raise web.HTTPNotFound(text="Unknown session")
+        session.last_seen = time.time()
+        return session
+
+    @staticmethod
+    async def read_json(request):
+        try:
+            return await request.json()
+        except ValueError:
+            raise web.HTTPBadRequest(text="Expected a JSON body")
+
+    @staticmethod
+    def read_language(body):
+        language = body.get('language', 'en')
+        if language not in LANGUAGES:
+            raise web.HTTPBadRequest(text=f"Unsupported language: {language}")
+        return language
+
+    async def create_session(self, request):
+        language = self.read_language(await self.read_json(request))
+        handler = await self.create_handler(language)
+        session_id = uuid.uuid4().hex
+        self.sessions[session_id] = ChatSession(handler)
+        return web.json_response({"session_id": session_id, "greeting": handler.greetings[language]})
+
+    async def delete_session(self, request):
+        self.sessions.pop(request.match_info['session_id'], None)
+        return web.json_response({"deleted": True})
+
+    async def set_language(self, request):
+        session = self.get_session(request)
+        session.handler.selected_language = self.read_language(await self.read_json(request))
+        return web.json_response({"language": session.handler.selected_language})
+
+    async def post_message(self, request):
+        session = self.get_session(request)
+        question = (await self.read_json(request)).get('question', '').strip()
+        if not question:
+            raise web.HTTPBadRequest(text="Missing question")
+        async with session.lock:
+            response = await session.handler.aget_response(question)
+        return web.json_response(response)
+
+    async def websocket(self, request):
+        session = self.get_session(request)
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        async for message in ws:
+            if message.type != WSMsgType.TEXT:
+                continue
+            try:
+                question = message.json().get('question', '').strip()
+            except ValueError:
+                question = ''
+            if not question:
+                await ws.send_json({"type": "error", "error": "Missing question"})
+                continue
+            session.last_seen = time.time()
+            async with session.lock:
+                async for token in session.handler.astream_response(question):
+                    await ws.send_json({"type": "token", "text": token})
+                await ws.send_json({"type": "done", **session.handler.last_response})
+        return ws
+
+    async def health(self, request):
+        return web.json_response({
+            "sessions": len(self.sessions),
+            "registry": model_registry.report(),
+            "router_fallback_rate": self.router.fallback_rate() if self.router else None,
+            "answer_cache_hit_rate": self.answer_cache.hit_rate() if self.answer_cache else None,
+            "inventory_hit_rate": self.inventory.hit_rate() if self.inventory else None,
+        })
+
+    def expire_idle_sessions(self, now=None, ttl=SERVER_SESSION_TTL):
+        """Drop sessions idle for more than ttl seconds, except those in the middle of a turn"""
+        now = time.time() if now is None else now
+        for session_id, session in list(self.sessions.items()):
+            if now - session.last_seen > ttl and not session.lock.locked():
+                del self.sessions[session_id]
+
+    async def expire_sessions(self):
+        while True:
+            await asyncio.sleep(60)
+            self.expire_idle_sessions()
+
+    async def on_startup(self, app):
+        # Thread work from the handlers (router, FAISS) also runs in the bounded pool
+        asyncio.get_running_loop().set_default_executor(self.executor)
+        app[EXPIRY_TASK] = asyncio.create_task(self.expire_sessions())
+
+    async def on_cleanup(self, app):
+        app[EXPIRY_TASK].cancel()
+        self.executor.shutdown(wait=False)
+
+    def create_app(self):
+        app = web.Application()
+        app.add_routes([
+            web.post('/sessions', self.create_session),
+            web.delete('/sessions/{session_id}', self.delete_session),
+            web.post('/sessions/{session_id}/language', self.set_language),
+            web.post('/sessions/{session_id}/messages', self.post_message),
+            web.get('/sessions/{session_id}/ws', self.websocket),
+            web.get('/health', self.health),
+        ])
+        app.on_startup.append(self.on_startup)
+        app.on_cleanup.append(self.on_cleanup)
+        return app
+
+
+def main():
+    server = ChatServer()
+    print(f"Starting ODC assistant server on {SERVER_HOST}:{SERVER_PORT}...")
+    web.run_app(server.create_app(), host=SERVER_HOST, port=SERVER_PORT)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+
+
+class SemanticCache:
+    """LRU/TTL cache of answers matched by cosine similarity of the query embedding.
+
+    Entries are scoped by language and the whole cache is dropped whenever
+    version_fn reports a different index version. Safe to share between
+    sessions whose turns run in different threads.
+    """
+
+    def __init__(self, max_size=256, ttl=86400, threshold=0.93, version_fn=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.threshold = threshold
+        self.version_fn = version_fn
+        self.version = version_fn() if version_fn else None
+        self.entries = {}  # language -> OrderedDict(question -> (vector, response, created_at))
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vector):
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _check_version(self):
+        # _check_version and _expire run with the lock held
+        if self.version_fn is None:
+            return
+        version = self.version_fn()
+        if version != self.version:
+            self.entries = {}
+            self.version = version
+            self.stats["invalidations"] += 1
+
+    def _expire(self, entries):
+        now = time.time()
+        for key in [k for k, (_, _, created_at) in entries.items() if now - created_at > self.ttl]:
+            del entries[key]
+
+    def get(self, vector, language):
+        """Return the cached response of the most similar question, or None"""
+        vector = self._normalize(vector)
+        with self._lock:
+            self._check_version()
+            entries = self.entries.get(language)
+            if entries:
+                self._expire(entries)
+            if not entries:
+                self.stats["misses"] += 1
+                return None
+
+            keys = list(entries.keys())
+            matrix = np.stack([entries[key][0] for key in keys])
+            similarities = matrix @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                self.stats["misses"] += 1
+                return None
+
+            entries.move_to_end(keys[best])
+            self.stats["hits"] += 1
+            return dict(entries[keys[best]][1])
+
+    def put(self, question, vector, language, response):
+        """Store a response, evicting the least recently used entry when full"""
+        vector = self._normalize(vector)
+        with self._lock:
+            self._check_version()
+            entries = self.entries.setdefault(language, OrderedDict())
+            entries[question] = (vector, response, time.time())
+            entries.move_to_end(question)
+            while len(entries) > self.max_size:
+                entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self.entries = {}
+
+    def hit_rate(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(entries) for entries in self.entries.values())
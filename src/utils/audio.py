@@ -0,0 +1,49 @@
+"""In-memory audio buffers handed from capture to speech-to-text.
+
+Audio is 16 kHz mono 16-bit PCM, as raw bytes, a NumPy int16 array or a
+complete WAV file in memory; nothing is written to disk unless asked for.
+"""
+import io
+import wave
+import numpy as np
+from .vad import SAMPLE_RATE, SAMPLE_WIDTH
+
+
+def is_wav(data):
+    return isinstance(data, (bytes, bytearray)) and data[:4] == b'RIFF' and data[8:12] == b'WAVE'
+
+
+def to_pcm(audio):
+    """Raw PCM bytes from PCM bytes, an int16 array or WAV bytes"""
+    if isinstance(audio, np.ndarray):
+        return audio.astype(np.int16).tobytes()
+    if is_wav(audio):
+        with wave.open(io.BytesIO(audio), 'rb') as wf:
+            return wf.readframes(wf.getnframes())
+    return bytes(audio)
+
+
+def to_array(audio):
+    return np.frombuffer(to_pcm(audio), dtype=np.int16)
+
+
+def to_wav(audio, rate=SAMPLE_RATE):
+    """WAV file bytes, the format the transcription APIs take"""
+    if is_wav(audio):
+        return bytes(audio)
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(SAMPLE_WIDTH)
+        wf.setframerate(rate)
+        wf.writeframes(to_pcm(audio))
+    return buffer.getvalue()
+
+
+def duration(audio, rate=SAMPLE_RATE):
+    return len(to_pcm(audio)) / (SAMPLE_WIDTH * rate)
+
+
+def save_wav(audio, file_name):
+    with open(file_name, 'wb') as f:
+        f.write(to_wav(audio))
@@ -0,0 +1,133 @@
+"""Long-lived microphone capture shared by every turn of the conversation.
+
+Opening PortAudio and a stream costs tens to hundreds of milliseconds per
+turn on a Pi, and speech_recognition adds a one second ambient noise
+calibration on top. AudioCaptureService opens the stream once; a reader
+thread keeps it drained and the VAD noise floor current between turns, so
+listen() starts endpointing on the very next frame.
+"""
+import queue
+import threading
+import time
+from .vad import SAMPLE_RATE, Endpointer, create_vad, frame_samples
+
+_lock = threading.Lock()
+_service = None
+
+
+class AudioCaptureService:
+    """One open input stream handing out utterances through a queue.
+
+    Between turns frames only update the noise floor and are dropped, so
+    the assistant's own voice is not captured while it speaks. listen()
+    starts an Endpointer on the live stream and waits for the utterance.
+    """
+
+    def __init__(self, vad=None, device_index=None, open_stream=None):
+        self.vad = vad or create_vad()
+        self.device_index = device_index
+        self.frame_size = frame_samples()
+        self.open_stream = open_stream or self._open_pyaudio
+        self.utterances = queue.Queue()
+        self.stream = None
+        self._pyaudio = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._running = False
+        self._endpointer = None
+        self._listen_started = None
+        self.stats = {"open_ms": None, "listen_setup_ms": None, "utterances": 0, "no_speech": 0}
+
+    def _open_pyaudio(self):
+        import pyaudio
+        self._pyaudio = pyaudio.PyAudio()
+        return self._pyaudio.open(format=pyaudio.paInt16,
+                                  channels=1,
+                                  rate=SAMPLE_RATE,
+                                  input=True,
+                                  input_device_index=self.device_index,
+                                  frames_per_buffer=self.frame_size)
+
+    def start(self):
+        if self._running:
+            return self
+        if self.stream is not None:
+            self.close()  # The reader stopped on an error, reopen
+        start = time.perf_counter()
+        self.stream = self.open_stream()
+        self.stats["open_ms"] = 1000 * (time.perf_counter() - start)
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="audio-capture", daemon=True)
+        self._thread.start()
+        print(f"Microphone opened in {self.stats['open_ms']:.0f} ms")
+        return self
+
+    def _run(self):
+        while self._running:
+            try:
+                # Don't raise on overflow, a dropped frame is better than a lost question
+                frame = self.stream.read(self.frame_size, exception_on_overflow=False)
+            except Exception as e:
+                if self._running:  # Not closed on purpose
+                    print(f"Error reading from the microphone: {e}")
+                    self._running = False
+                    self.utterances.put(None)
+                break
+            with self._lock:
+                endpointer = self._endpointer
+                if endpointer is None:
+                    self.vad.is_speech(frame)  # Keep the noise floor current between turns
+                    continue
+                if endpointer.seen == 0:
+                    self.stats["listen_setup_ms"] = 1000 * (time.perf_counter() - self._listen_started)
+                if endpointer.feed(frame):
+                    self._endpointer = None
+                    self.utterances.put(endpointer.audio() or None)
+
+    def listen(self, timeout=None):
+        """Wait for the next utterance, returns its PCM bytes or None if nothing was said"""
+        if not self._running:
+            self.start()
+        # Drop an utterance finished after an earlier listen() timed out
+        while not self.utterances.empty():
+            self.utterances.get_nowait()
+        with self._lock:
+            self._listen_started = time.perf_counter()
+            self._endpointer = Endpointer(self.vad)
+        try:
+            audio = self.utterances.get(timeout=timeout)
+        except queue.Empty:
+            audio = None
+        with self._lock:
+            self._endpointer = None
+        self.stats["utterances" if audio else "no_speech"] += 1
+        return audio
+
+    def close(self):
+        self._running = False
+        if self.stream is not None:
+            try:
+                self.stream.stop_stream()
+                self.stream.close()
+            except Exception as e:
+                print(f"Error closing the microphone: {e}")
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+        if self._pyaudio is not None:
+            self._pyaudio.terminate()
+        self.stream = self._pyaudio = self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def get_capture_service():
+    """Shared capture service, the microphone is opened on first use"""
+    global _service
+    with _lock:
+        if _service is None:
+            _service = AudioCaptureService()
+        return _service.start()
@@ -0,0 +1,136 @@
+import re
+from langchain.schema import Document
+from langchain_core.retrievers import BaseRetriever
+from .tokens import CHARS_PER_TOKEN, estimate_tokens
+
+# Shortest suffix/prefix match treated as chunk overlap rather than coincidence
+MIN_OVERLAP = 20
+
+WHITESPACE = re.compile(r"\s+")
+
+# Metadata that identifies the document a chunk was split from; a JSON file holds
+# many documents (one per item) that all share the file as source
+DOCUMENT_KEYS = ("source", "category", "name")
+
+
+def _normalize(text):
+    return WHITESPACE.sub(" ", text).strip().lower()
+
+
+def _merge_by_text(first, second):
+    """Join two chunks when the end of the first is the start of the second"""
+    longest = min(len(first), len(second))
+    for size in range(longest, MIN_OVERLAP - 1, -1):
+        if first.endswith(second[:size]):
+            return first + second[size:]
+    return None
+
+
+def _document_id(doc):
+    return tuple(doc.metadata.get(key) for key in DOCUMENT_KEYS)
+
+
+def _merge(group, doc):
+    """Merge doc into group when both come from adjacent or overlapping spans"""
+    start = doc.metadata.get("start_index")
+    if start is not None and group["start"] is not None:
+        first, second = (group, {"text": doc.page_content, "start": start})
+        if start < group["start"]:
+            first, second = second, first
+        first_end = first["start"] + len(first["text"])
+        # Only overlapping or touching spans, the text of a gap between them is unknown
+        if second["start"] > first_end:
+            return False
+        overlap = max(0, first_end - second["start"])
+        group["text"] = first["text"] + second["text"][overlap:]
+        group["start"] = first["start"]
+        return True
+
+    merged = _merge_by_text(group["text"], doc.page_content) \
+        or _merge_by_text(doc.page_content, group["text"])
+    if merged is None:
+        return False
+    group["text"] = merged
+    return True
+
+
+def _truncate(group, token_budget):
+    """Text of a group cut to the budget, starting at its most relevant chunk"""
+    text = group["text"][max(0, group["text"].find(group["anchor"])):]
+    limit = token_budget * CHARS_PER_TOKEN
+    if len(text) > limit:
+        cut = text.rfind(" ", 0, limit + 1)
+        text = text[:cut if cut > 0 else limit].rstrip()
+    return text
+
+
+def pack_documents(docs, token_budget):
+    """Merge overlapping chunks, drop duplicate spans and fill a token budget.
+
+    docs must be in relevance order; the packed documents keep the rank of
+    their most relevant chunk.
+    """
+    groups = []
+    for rank, doc in enumerate(docs):
+        text = _normalize(doc.page_content)
+        if not text or any(text in _normalize(group["text"]) for group in groups):
+            continue
+        # start_index and text overlap are only meaningful within one document
+        document_id = _document_id(doc)
+        if any(group["document"] == document_id and _merge(group, doc) for group in groups):
+            continue
+        groups.append({
+            "document": document_id,
+            "text": doc.page_content,
+            "start": doc.metadata.get("start_index"),
+            "rank": rank,
+            "anchor": doc.page_content,
+            "metadata": dict(doc.metadata),
+        })
+
+    # A merge can make one group cover another one
+    unique = []
+    for group in sorted(groups, key=lambda g: -len(g["text"])):
+        if not any(_normalize(group["text"]) in _normalize(kept["text"]) for kept in unique):
+            unique.append(group)
+
+    packed = []
+    used = 0
+    for group in sorted(unique, key=lambda g: g["rank"]):
+        text = group["text"]
+        tokens = estimate_tokens(text)
+        if used + tokens > token_budget:
+            if packed:
+                continue
+            # The best evidence is cut to the budget rather than left out
+            text = _truncate(group, token_budget)
+            tokens = estimate_tokens(text)
+        used += tokens
+        packed.append(Document(page_content=text, metadata=group["metadata"]))
+    return packed
+
+
+class ContextPackingRetriever(BaseRetriever):
+    """Wraps a retriever and packs its candidates into a token budget instead of a fixed k"""
+
+    base_retriever: BaseRetriever
+    token_budget: int
+    last_stats: dict = {}
+
+    def _pack(self, docs):
+        packed = pack_documents(docs, self.token_budget)
+        self.last_stats = {
+            "candidates": len(docs),
+            "packed": len(packed),
+            "tokens_before": sum(estimate_tokens(doc.page_content) for doc in docs),
+            "tokens_after": sum(estimate_tokens(doc.page_content) for doc in packed),
+        }
+        return packed
+
+    def _get_relevant_documents(self, query, *, run_manager):
+        docs = self.base_retriever.invoke(query, config={"callbacks": run_manager.get_child()})
+        return self._pack(docs)
+
+    async def _aget_relevant_documents(self, query, *, run_manager):
+        docs = await self.base_retriever.ainvoke(query, config={"callbacks": run_manager.get_child()})
+        return self._pack(docs)
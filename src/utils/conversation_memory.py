@@ -0,0 +1,68 @@
+import re
+from langchain.memory import ConversationBufferMemory
+from langchain_core.messages import SystemMessage, get_buffer_string
+from .tokens import estimate_tokens
+
+SENTENCE_END = re.compile(r'(?<=[.!?؟])\s+')
+
+
+def _first_sentence(text):
+    return SENTENCE_END.split(text.strip(), maxsplit=1)[0]
+
+
+class TokenBudgetMemory(ConversationBufferMemory):
+    """Conversation buffer with a token ceiling.
+
+    When the history grows past max_token_limit the oldest turns are folded
+    into a rolling extractive summary (no LLM call), which is itself capped at
+    summary_token_limit. The history token count after every turn is kept in
+    turn_token_counts.
+    """
+
+    max_token_limit: int = 500
+    summary_token_limit: int = 150
+    summary_lines: list = []
+    turn_token_counts: list = []
+
+    @property
+    def summary(self):
+        return " ".join(self.summary_lines)
+
+    def history_messages(self):
+        messages = list(self.chat_memory.messages)
+        if self.summary_lines:
+            messages.insert(0, SystemMessage(content=f"Earlier in the conversation: {self.summary}"))
+        return messages
+
+    def history_tokens(self):
+        """Tokens of the history as it is sent to the LLM"""
+        return sum(estimate_tokens(message.content) for message in self.history_messages())
+
+    def load_memory_variables(self, inputs):
+        messages = self.history_messages()
+        if not self.return_messages:
+            messages = get_buffer_string(messages, human_prefix=self.human_prefix, ai_prefix=self.ai_prefix)
+        return {self.memory_key: messages}
+
+    def _compact(self):
+        messages = self.chat_memory.messages
+        # Keep at least the latest exchange verbatim
+        while len(messages) > 2 and self.history_tokens() > self.max_token_limit:
+            question, answer = messages[0], messages[1]
+            self.chat_memory.messages = messages = messages[2:]
+            self.summary_lines.append(
+                f"Q: {_first_sentence(question.content)} A: {_first_sentence(answer.content)}"
+            )
+            while len(self.summary_lines) > 1 \
+                    and estimate_tokens(self.summary) > self.summary_token_limit:
+                self.summary_lines.pop(0)
+
+    def save_context(self, inputs, outputs):
+        super().save_context(inputs, outputs)
+        self._compact()
+        self.turn_token_counts.append(self.history_tokens())
+
+    def clear(self):
+        super().clear()
+        self.summary_lines = []
+        self.turn_token_counts = []
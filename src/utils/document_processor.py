@@ -1,121 +1,399 @@
 import json
+import hashlib
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_huggingface.embeddings import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.document_loaders import DirectoryLoader, TextLoader
 from pathlib import Path
-from ..config import DATA_DIR, VECTOR_DB_PATH, CHUNK_SIZE, CHUNK_OVERLAP
+from ..config import (DATA_DIR, INDEX_VERSION_FILE, INDEX_VERSIONS_DIR, INDEX_KEEP_VERSIONS, CHUNK_SIZE,
+                      CHUNK_OVERLAP, INDEX_TYPE)
 from langchain.schema import Document
+from . import model_registry, vector_store_io
+from .index_factory import build_index, supports_sequential_remove
+
+def _humanize(key):
+    return key.replace('_', ' ').strip().capitalize()
+
+
+def _is_scalar(value):
+    return isinstance(value, (str, int, float, bool))
+
+
+def _is_flat(value):
+    """Scalar, list of scalars, or dict whose values are all scalars / lists of scalars"""
+    if _is_scalar(value):
+        return True
+    if isinstance(value, list):
+        return all(_is_scalar(v) for v in value)
+    if isinstance(value, dict):
+        return all(_is_scalar(v) or (isinstance(v, list) and all(_is_scalar(i) for i in v))
+                   for v in value.values())
+    return False
+
+
+def _format_value(value):
+    if isinstance(value, list):
+        return "; ".join(str(v).rstrip('.') for v in value)
+    if isinstance(value, dict):
+        return "; ".join(f"{_humanize(k).lower()}: {_format_value(v)}" for k, v in value.items() if k != 'keywords')
+    return str(value).rstrip('.')
+
 
 class JSONLoader:
+    """Turn the data/*.json files into one compact natural-text document per item"""
+
+    VERSION = 2  # Bump when the generated text changes so indexes are rebuilt
+
     def __init__(self, file_path):
         self.file_path = file_path
 
+    def _document(self, text, **metadata):
+        return Document(page_content=text, metadata={"source": str(self.file_path), **metadata})
+
+    def load_materials(self, materials):
+        documents = []
+        for category, items in materials.items():
+            category_name = _humanize(category)
+            names = []
+            for item in items:
+                name = item.get('name', '').strip()
+                if not name:
+                    continue
+                names.append(name)
+                details = f" ({item['details']})" if item.get('details') else ""
+                documents.append(self._document(
+                    f"FabLab {category_name.lower()}: {name}{details}.",
+                    category=f"fablab_materials/{category}", name=name, keywords=item.get('keywords', [])
+                ))
+            # One overview per category answers "which sensors do you have?"
+            if names:
+                documents.append(self._document(
+                    f"FabLab {category_name.lower()} available ({len(names)}): {', '.join(names)}.",
+                    category=f"fablab_materials/{category}", name=category_name, keywords=[category.replace('_', ' ')]
+                ))
+        return documents
+
+    def load_knowledge(self, node, path):
+        """One document per section; nested sections that only hold values are inlined"""
+        documents = []
+        lines = []
+        for key, value in node.items():
+            if key in ('keywords', 'name'):
+                continue
+            # Sections with their own keywords are knowledge items, not attributes
+            if _is_flat(value) and not (isinstance(value, dict) and 'keywords' in value):
+                lines.append(f"{_humanize(key)}: {_format_value(value)}")
+            elif isinstance(value, dict):
+                documents.extend(self.load_knowledge(value, path + [key]))
+            elif isinstance(value, list):
+                for index, item in enumerate(value):
+                    if isinstance(item, dict):
+                        documents.extend(self.load_knowledge(item, path + [f"{key}_{index + 1}"]))
+        if lines:
+            title = node.get('name') or " - ".join(_humanize(part) for part in path[-2:])
+            documents.insert(0, self._document(
+                f"{title}. " + ". ".join(line.rstrip('.') for line in lines) + ".",
+                category="knowledge_base/" + "/".join(path), name=title, keywords=node.get('keywords', [])
+            ))
+        return documents
+
+    def load_events(self, events):
+        documents = []
+        for event in events:
+            event = event.get('content', event) if isinstance(event, dict) else event
+            if not isinstance(event, dict) or not event.get('title'):
+                continue
+            parts = [f"Event: {event['title']}"]
+            if event.get('day') or event.get('month'):
+                parts.append(f"Date: {event.get('day', '')} {event.get('month', '')}".strip())
+            if event.get('start_date'):
+                parts.append(f"Time: {event['start_date']} - {event.get('end_date', '')}".rstrip(' -'))
+            if event.get('location'):
+                parts.append(f"Location: {event['location']}")
+            if event.get('description'):
+                parts.append(f"Description: {event['description']}")
+            documents.append(self._document(". ".join(parts) + ".", category="events", name=event['title'], keywords=[]))
+        return documents
+
     def load(self):
+        """Return the list of documents contained in the file"""
         with open(self.file_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
-            # Extract content based on known keys and place it into the 'content' field
-            if 'fablab_materials' in data:
-                content = data['fablab_materials']
-            elif 'knowledge_base' in data:
-                content = data['knowledge_base']
-            elif 'message' in data:
-                content = data['message']
-            else:
-                content = data.get('content', '')
-            return Document(page_content=str(content), metadata={"source": str(self.file_path)})
+        if 'fablab_materials' in data:
+            return self.load_materials(data['fablab_materials'])
+        if 'knowledge_base' in data:
+            return self.load_knowledge(data['knowledge_base'], [])
+        if 'events' in data:
+            return self.load_events(data['events'])
+        content = data.get('message') or data.get('content', '')
+        if isinstance(content, dict):
+            return self.load_events([content])
+        if isinstance(content, list):
+            return self.load_events(content)
+        if not content:
+            return []
+        return [self._document(str(content), category="message", name=self.file_path.stem, keywords=[])]
 
 class DocumentProcessor:
-    def __init__(self):
+    def __init__(self, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP, index_type=INDEX_TYPE):
         self.data_dir = DATA_DIR
-        self.vector_store_path = VECTOR_DB_PATH
+        self.version_file = INDEX_VERSION_FILE
+        self.versions_dir = INDEX_VERSIONS_DIR
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.index_type = index_type
         
         # Use the tested configurations
         self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=CHUNK_SIZE,  # Use updated config value
-            chunk_overlap=CHUNK_OVERLAP,  # Use updated config value
+            chunk_size=chunk_size,  # Use updated config value
+            chunk_overlap=chunk_overlap,  # Use updated config value
             length_function=len,
+            add_start_index=True,  # Lets the context packer merge adjacent chunks
         )
-        
-        # Use the lightweight model we tested
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2"
-        )
+
+    @property
+    def embeddings(self):
+        """Shared lightweight model, loaded once per process by the registry"""
+        return model_registry.get_embeddings()
     
+    def load_file(self, json_file):
+        """Load one .json file, returns its documents"""
+        documents = JSONLoader(json_file).load()
+        if not documents:
+            print(f"No content found in {json_file}")
+        return documents
+
     def load_documents(self):
         """Load all .json files from data directory"""
         print("Loading documents from data directory...")
         documents = []
         for json_file in self.data_dir.glob("*.json"):
-            loader = JSONLoader(json_file)
-            document = loader.load()
-            if document.page_content:
-                documents.append(document)
-            else:
-                print(f"No content found in {json_file}")
+            documents.extend(self.load_file(json_file))
         print(f"Loaded {len(documents)} documents")
         return documents
 
-    def process_documents(self):
-        """Process documents and create vector store"""
+    @staticmethod
+    def file_hash(path):
+        return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+    @staticmethod
+    def chunk_ids(chunks):
+        """Stable IDs from content and metadata, so unchanged chunks keep their ID.
+
+        All metadata is part of the ID: the context packer merges chunks by
+        start_index, and names and keywords are stored in the docstore and
+        the keyword index. A chunk whose offset or metadata changed is stored
+        again (its vector comes from the embedding cache).
+        """
+        seen = {}
+        ids = []
+        for chunk in chunks:
+            metadata = json.dumps(chunk.metadata, sort_keys=True, ensure_ascii=False, default=str)
+            key = hashlib.sha256(f"{metadata}\0{chunk.page_content}".encode('utf-8')).hexdigest()
+            # Identical chunks in the same file get an occurrence suffix
+            seen[key] = seen.get(key, -1) + 1
+            ids.append(f"{key[:32]}-{seen[key]}")
+        return ids
+
+    def index_settings(self):
+        """Anything that makes stored vectors or chunks incompatible when it changes"""
+        return {"model": model_registry.embedding_model_id(), "chunk_size": self.chunk_size,
+                "chunk_overlap": self.chunk_overlap, "loader_version": JSONLoader.VERSION, "index_type": self.index_type}
+
+    def current_index_path(self):
+        """Directory of the published index, None if nothing was published"""
+        version = vector_store_io.read_version(self.version_file)
+        return self.versions_dir / version if version else None
+
+    def load_manifest(self, index_path):
+        try:
+            with open(index_path / vector_store_io.MANIFEST_FILE, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if manifest.get("settings") != self.index_settings():
+            print("Index settings changed, rebuilding from scratch")
+            return None
+        return manifest
+
+    def save_manifest(self, manifest, index_path):
+        with open(index_path / vector_store_io.MANIFEST_FILE, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+    def create_vector_store(self, docs, ids):
+        """Embed docs into a new store using the configured index type"""
+        if self.index_type == "flat":
+            return FAISS.from_documents(docs, self.embeddings, ids=ids)
+        vectors = self.embeddings.embed_documents([doc.page_content for doc in docs])
+        print(f"Training {self.index_type} index on {len(vectors)} vectors...")
+        vector_store = FAISS(
+            embedding_function=self.embeddings,
+            index=build_index(vectors, self.index_type),
+            docstore=InMemoryDocstore(),
+            index_to_docstore_id={}
+        )
+        vector_store.add_embeddings(
+            zip([doc.page_content for doc in docs], vectors),
+            metadatas=[doc.metadata for doc in docs],
+            ids=ids
+        )
+        return vector_store
+
+    def rebuild_vector_store(self, vector_store, stale_ids, new_docs, new_ids):
+        """New store from the chunks kept in vector_store plus new_docs.
+
+        IVF indexes keep their internal IDs on removal, which breaks the
+        position -> docstore mapping FAISS.delete relies on, so they are
+        retrained instead. Kept vectors come from the embedding cache.
+        """
+        removed = set(stale_ids)
+        kept_ids = [doc_id for _, doc_id in sorted(vector_store.index_to_docstore_id.items())
+                    if doc_id not in removed]
+        docs = [vector_store.docstore.search(doc_id) for doc_id in kept_ids] + list(new_docs)
+        if not docs:
+            return None
+        return self.create_vector_store(docs, kept_ids + list(new_ids))
+
+    def process_documents(self, rebuild=False):
+        """Process documents and update the vector store.
+
+        Files whose hash did not change are skipped; for changed files only new
+        chunks are embedded and chunks that disappeared are deleted by ID.
+        rebuild=True ignores the manifest and re-embeds everything.
+
+        The result is written to a new version directory and published
+        atomically; the published index is never modified in place.
+        """
         try:
-            # Load and split documents
             print("Processing documents...")
-            documents = self.load_documents()
-            print(f"Found {len(documents)} documents")
-            
-            print("Splitting into chunks...")
-            chunks = self.text_splitter.split_documents(documents)
-            print(f"Created {len(chunks)} chunks")
-            
-            # Create vector store
-            print("Creating FAISS index...")
-            vector_store = FAISS.from_documents(chunks, self.embeddings)
-            
-            # Save vector store
+            current_path = self.current_index_path()
+            manifest = None if rebuild or current_path is None else self.load_manifest(current_path)
+            vector_store = None
+            if manifest is not None:
+                try:
+                    vector_store = vector_store_io.load(current_path, self.embeddings, mmap=False)
+                except Exception as e:
+                    print(f"Could not load existing index ({e}), rebuilding from scratch")
+                    manifest = None
+            if manifest is None:
+                manifest = {"settings": self.index_settings(), "files": {}}
+
+            reused = 0
+            files = {}
+            new_chunks = []  # (id, chunk) to embed
+            stale_ids = []
+            for json_file in sorted(self.data_dir.glob("*.json")):
+                file_hash = self.file_hash(json_file)
+                previous = manifest["files"].get(json_file.name)
+                if previous and previous["hash"] == file_hash and vector_store is not None:
+                    files[json_file.name] = previous
+                    reused += len(previous["chunks"])
+                    continue
+
+                chunks = self.text_splitter.split_documents(self.load_file(json_file))
+                ids = self.chunk_ids(chunks)
+                old_ids = set(previous["chunks"]) if previous and vector_store is not None else set()
+                added = [(chunk_id, chunk) for chunk_id, chunk in zip(ids, chunks) if chunk_id not in old_ids]
+                new_chunks.extend(added)
+                stale_ids.extend(old_ids - set(ids))
+                reused += len(ids) - len(added)
+                files[json_file.name] = {"hash": file_hash, "chunks": ids}
+
+            # Files removed from the data directory
+            for name, previous in manifest["files"].items():
+                if name not in files and vector_store is not None:
+                    stale_ids.extend(previous["chunks"])
+
+            new_ids = [chunk_id for chunk_id, _ in new_chunks]
+            new_docs = [chunk for _, chunk in new_chunks]
+            if vector_store is None:
+                if new_docs:
+                    vector_store = self.create_vector_store(new_docs, new_ids)
+            elif stale_ids and not supports_sequential_remove(vector_store.index):
+                vector_store = self.rebuild_vector_store(vector_store, stale_ids, new_docs, new_ids)
+            else:
+                if stale_ids:
+                    vector_store.delete(stale_ids)
+                if new_docs:
+                    vector_store.add_documents(new_docs, ids=new_ids)
+            embedded, deleted = len(new_chunks), len(stale_ids)
+
+            print(f"Embedded {embedded} chunks, reused {reused}, deleted {deleted}")
+            if hasattr(self.embeddings, "hit_rates"):
+                print(f"Embedding cache document hit rate: {self.embeddings.hit_rates()['document']:.0%}")
+            if vector_store is None:
+                print("No documents to index")
+                return None
+            # A changed file hash alone still publishes, so the manifest records it
+            if not embedded and not deleted and files == manifest["files"]:
+                print("Index is up to date")
+                model_registry.set_vector_store(vector_store, current_path.name)
+                return vector_store
+
+            # Save to a new version, then switch readers over to it
+            version = vector_store_io.new_version()
+            index_path = self.versions_dir / version
             print("Saving index to disk...")
-            vector_store.save_local(str(self.vector_store_path))
-            print(f"Index saved to {self.vector_store_path}")
-            
+            vector_store_io.save(vector_store, index_path)
+            manifest["files"] = files
+            self.save_manifest(manifest, index_path)
+            self.publish_index_version(version)
+            model_registry.set_vector_store(vector_store, version)
+            print(f"Index saved to {index_path} and published")
+
             return vector_store
-            
+
         except Exception as e:
             print(f"Error processing documents: {e}")
             return None
     
+    def publish_index_version(self, version):
+        """Make version the index running assistants load; caches built on the previous one are invalidated"""
+        vector_store_io.publish(self.version_file, version)
+        vector_store_io.prune(self.versions_dir, INDEX_KEEP_VERSIONS, version)
+
+    @staticmethod
+    def index_version():
+        """Return the published index version, empty if none was published"""
+        return vector_store_io.read_version(INDEX_VERSION_FILE)
+
     @staticmethod
     def load_vector_store():
         """Load existing vector store with the lightweight model"""
         try:
-            print("Loading FAISS index...")
-            if not VECTOR_DB_PATH.exists():
-                print("Vector store not found. Please run setup.py first")
-                return None
-                
-            embeddings = HuggingFaceEmbeddings(
-                model_name="sentence-transformers/all-MiniLM-L6-v2"
-            )
-            return FAISS.load_local(str(VECTOR_DB_PATH), embeddings, allow_dangerous_deserialization=True)
+            # Loaded once per process, later calls return the shared instance
+            return model_registry.get_vector_store()
         except Exception as e:
             print(f"Error loading vector store: {e}")
             print("Please ensure setup.py has been run to initialize the vector store")
             return None
 
+    @staticmethod
+    def published_vector_store():
+        """The shared store, switched to a newly published version once it has loaded in the background"""
+        try:
+            return model_registry.published_vector_store()
+        except Exception as e:
+            print(f"Error checking for a new index: {e}")
+            return None
+
+    @staticmethod
+    def load_keyword_index():
+        """BM25 keyword index saved next to the vector store, None if missing"""
+        return model_registry.get_keyword_index()
+
     def retrieve_context(self, query):
         """Retrieve context based on the query"""
         try:
-            print("Loading FAISS index...")
             vector_store = self.load_vector_store()
             if vector_store is None:
-                print("Vector store not found. Please run setup.py first")
                 return None
 
             print("Generating query embedding...")
             query_embedding = self.embeddings.embed_query(query)
 
-            print("Using retriever to search for similar chunks...")
-            retriever = vector_store.as_retriever()
-            similar_chunks = retriever.retrieve(query_embedding, k=5)  # Retrieve top 5 similar chunks
+            print("Searching for similar chunks...")
+            similar_chunks = vector_store.similarity_search_by_vector(query_embedding, k=5)  # Retrieve top 5 similar chunks
 
             print("Retrieved context:")
             for chunk in similar_chunks:
@@ -0,0 +1,132 @@
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+# SQLite limits the number of parameters per statement
+BATCH = 500
+# Cache hits are only written back (last_used) with the next store or once this many are pending
+TOUCH_FLUSH_SIZE = 256
+
+
+def normalize_text(text):
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class CachedEmbeddings(Embeddings):
+    """Disk-backed cache of embedding vectors in front of another Embeddings.
+
+    Vectors are stored as float32 blobs in SQLite, keyed by a hash of the
+    model name and the normalized text. The least recently used entries are
+    evicted beyond max_entries. Lookups don't write: the last_used times of
+    hits are kept in memory and written in one transaction with the next
+    store, so the query path adds no disk writes on the SD card.
+    """
+
+    def __init__(self, embeddings, model_name, path, max_entries=50000):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.stats = {"document_hits": 0, "document_misses": 0, "query_hits": 0, "query_misses": 0}
+        self._lock = threading.Lock()
+        self._touched = {}  # key -> last_used not yet written
+        self._connection = sqlite3.connect(str(path), check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, model TEXT NOT NULL, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings(last_used)")
+        self._connection.commit()
+
+    def key(self, text, kind="document"):
+        # Queries are keyed apart since some models embed them differently
+        return hashlib.sha256(f"{self.model_name}\0{kind}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+    def _lookup(self, keys):
+        found = {}
+        now = time.time()
+        with self._lock:
+            for start in range(0, len(keys), BATCH):
+                batch = keys[start:start + BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._connection.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                found.update((key, np.frombuffer(vector, dtype=np.float32).tolist()) for key, vector in rows)
+            self._touched.update((key, now) for key in found)
+            if len(self._touched) >= TOUCH_FLUSH_SIZE:
+                self._flush_touched()
+                self._connection.commit()
+        return found
+
+    def _flush_touched(self):
+        # Called with the lock held, the caller commits
+        if self._touched:
+            self._connection.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                [(last_used, key) for key, last_used in self._touched.items()]
+            )
+            self._touched = {}
+
+    def flush(self):
+        """Write pending last_used times, e.g. before shutting down"""
+        with self._lock:
+            self._flush_touched()
+            self._connection.commit()
+
+    def _store(self, items):
+        now = time.time()
+        with self._lock:
+            self._flush_touched()  # Eviction below needs current last_used times
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, vector, last_used) VALUES (?, ?, ?, ?)",
+                [(key, self.model_name, np.asarray(vector, dtype=np.float32).tobytes(), now)
+                 for key, vector in items]
+            )
+            count = self._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            if count > self.max_entries:
+                self._connection.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+            self._connection.commit()
+
+    def embed_documents(self, texts):
+        keys = [self.key(text) for text in texts]
+        found = self._lookup(list(set(keys)))
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+            self._store(computed.items())
+            found.update(computed)
+
+        self.stats["document_hits"] += len(texts) - len(missing)
+        self.stats["document_misses"] += len(missing)
+        return [found[key] for key in keys]
+
+    def embed_query(self, text):
+        key = self.key(text, kind="query")
+        found = self._lookup([key])
+        if key in found:
+            self.stats["query_hits"] += 1
+            return found[key]
+        self.stats["query_misses"] += 1
+        vector = self.embeddings.embed_query(text)
+        self._store([(key, vector)])
+        return vector
+
+    def hit_rates(self):
+        rates = {}
+        for kind in ("document", "query"):
+            lookups = self.stats[f"{kind}_hits"] + self.stats[f"{kind}_misses"]
+            rates[kind] = self.stats[f"{kind}_hits"] / lookups if lookups else 0.0
+        return rates
@@ -71,18 +71,16 @@ class EventScraper:
     def _save_events(self, events):
         """Save events to JSON file"""
         print(f"Saving events to {self.events_file}")
-        events_data = {{
-            "content": {
-                "title": event.title,
-                "start_date": event.start_date,
-                "end_date": event.end_date,
-                "location": event.location,
-                "month": event.month,
-                "day": event.day,
-                "description": event.description,
-                "venue": event.venue
-            }
-        } for event in events}
+        events_data = {"events": [{
+            "title": event.title,
+            "start_date": event.start_date,
+            "end_date": event.end_date,
+            "location": event.location,
+            "month": event.month,
+            "day": event.day,
+            "description": event.description,
+            "venue": event.venue
+        } for event in events]}
         
         with open(self.events_file, 'w', encoding='utf-8') as f:
             json.dump(events_data, f, ensure_ascii=False, indent=4)
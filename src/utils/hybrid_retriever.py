@@ -0,0 +1,44 @@
+import asyncio
+from langchain_core.retrievers import BaseRetriever
+
+
+def _key(doc):
+    return doc.id or (doc.metadata.get("source"), doc.metadata.get("start_index"), doc.page_content)
+
+
+def reciprocal_rank_fusion(rankings, k=60, limit=None):
+    """Fuse ranked document lists: each list adds 1 / (k + rank) to a document's score"""
+    scores = {}
+    docs = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, start=1):
+            key = _key(doc)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            docs.setdefault(key, doc)
+    fused = sorted(scores, key=scores.get, reverse=True)
+    return [docs[key] for key in fused[:limit]]
+
+
+class HybridRetriever(BaseRetriever):
+    """Dense FAISS retrieval and BM25 keyword search, fused with reciprocal-rank fusion"""
+
+    dense_retriever: BaseRetriever
+    keyword_index: object  # KeywordIndex
+    fetch_k: int = 10
+    rrf_k: int = 60
+
+    def _fuse(self, dense_docs, keyword_hits):
+        return reciprocal_rank_fusion(
+            [dense_docs, [doc for doc, _ in keyword_hits]], k=self.rrf_k, limit=self.fetch_k
+        )
+
+    def _get_relevant_documents(self, query, *, run_manager):
+        dense_docs = self.dense_retriever.invoke(query, config={"callbacks": run_manager.get_child()})
+        return self._fuse(dense_docs, self.keyword_index.search(query, self.fetch_k))
+
+    async def _aget_relevant_documents(self, query, *, run_manager):
+        dense_docs, keyword_hits = await asyncio.gather(
+            self.dense_retriever.ainvoke(query, config={"callbacks": run_manager.get_child()}),
+            asyncio.to_thread(self.keyword_index.search, query, self.fetch_k)
+        )
+        return self._fuse(dense_docs, keyword_hits)
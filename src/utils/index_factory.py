@@ -0,0 +1,110 @@
+"""FAISS index types for the vector store.
+
+flat      exact search, float32 vectors (FAISS.from_documents default)
+sq8       exact scan over int8 scalar-quantized vectors, ~4x smaller
+ivf_flat  inverted lists over float32 vectors, probes IVF_NPROBE lists per query
+ivf_pq    inverted lists over product-quantized codes, smallest index
+"""
+import math
+import os
+import tempfile
+import time
+import faiss
+import numpy as np
+from ..config import INDEX_TYPE, IVF_NLIST, IVF_NPROBE, PQ_M
+
+INDEX_TYPES = ("flat", "sq8", "ivf_flat", "ivf_pq")
+
+# FAISS k-means wants ~39 training points per centroid
+POINTS_PER_CENTROID = 39
+# Smallest PQ code size used; training needs at least 2 ** MIN_PQ_BITS vectors
+MIN_PQ_BITS = 4
+
+
+def factory_string(index_type, count, dimension):
+    """index_factory description for index_type, scaled down to small corpora"""
+    nlist = max(1, min(IVF_NLIST, count // POINTS_PER_CENTROID))
+    if index_type == "flat":
+        return "Flat"
+    if index_type == "sq8":
+        return "SQ8"
+    if index_type == "ivf_flat":
+        return f"IVF{nlist},Flat"
+    if index_type == "ivf_pq":
+        if count < 2 ** MIN_PQ_BITS:
+            return "Flat"  # Too few vectors to train the quantizer, and nothing to compress
+        m = PQ_M if dimension % PQ_M == 0 else 8
+        nbits = max(MIN_PQ_BITS, min(8, int(math.log2(max(2, count // POINTS_PER_CENTROID)))))
+        return f"IVF{nlist},PQ{m}x{nbits}"
+    raise ValueError(f"Unknown index type: {index_type}. Expected one of {', '.join(INDEX_TYPES)}")
+
+
+def configure_index(index):
+    """Apply search-time settings that are not fixed at build time"""
+    try:
+        faiss.extract_index_ivf(index).nprobe = IVF_NPROBE
+    except RuntimeError:
+        pass  # Not an IVF index
+    return index
+
+
+def build_index(vectors, index_type=INDEX_TYPE):
+    """Create and train an empty index of index_type for these vectors (not added)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    count, dimension = vectors.shape
+    index = faiss.index_factory(dimension, factory_string(index_type, count, dimension))
+    if not index.is_trained:
+        index.train(vectors)
+    return configure_index(index)
+
+
+def supports_sequential_remove(index):
+    """True when remove_ids compacts the index like langchain's FAISS.delete expects"""
+    try:
+        faiss.extract_index_ivf(index)
+        return False
+    except RuntimeError:
+        return True
+
+
+def index_size_bytes(index):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "index.faiss")
+        faiss.write_index(index, path)
+        return os.path.getsize(path)
+
+
+def compare_index_types(vectors, queries, k=5, index_types=INDEX_TYPES):
+    """Recall@k against the flat index, size on disk, build time and query latency per index type"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    queries = np.asarray(queries, dtype=np.float32)
+
+    exact = faiss.IndexFlatL2(vectors.shape[1])
+    exact.add(vectors)
+    _, truth = exact.search(queries, k)
+
+    report = {}
+    for index_type in index_types:
+        start = time.perf_counter()
+        index = build_index(vectors, index_type)
+        index.add(vectors)
+        build_seconds = time.perf_counter() - start
+
+        latencies = []
+        found = []
+        for query in queries:
+            start = time.perf_counter()
+            _, ids = index.search(query[None, :], k)
+            latencies.append(time.perf_counter() - start)
+            found.append(ids[0])
+
+        recall = np.mean([len(set(row) & set(expected)) / k for row, expected in zip(found, truth)])
+        report[index_type] = {
+            "factory": factory_string(index_type, len(vectors), vectors.shape[1]),
+            f"recall@{k}": float(recall),
+            "size_bytes": index_size_bytes(index),
+            "build_seconds": build_seconds,
+            "query_ms_mean": 1000 * float(np.mean(latencies)),
+            "query_ms_p95": 1000 * float(np.percentile(latencies, 95)),
+        }
+    return report
@@ -0,0 +1,85 @@
+"""BM25 keyword index over the chunks, stored next to them in docstore.sqlite.
+
+Uses SQLite FTS5, whose bm25() ranking is built in. Exact part names
+("ESP32", "Ender 3", "Raspberry Pi 4 8GB") and the `keywords` of each
+knowledge item are matched literally, which MiniLM embeddings often miss.
+"""
+import json
+import re
+import sqlite3
+import threading
+import unicodedata
+from langchain.schema import Document
+
+TABLE = "chunks_fts"
+
+# unicode61 splits on anything that is not a letter or digit and folds
+# accents, so "Évènement" matches "evenement"
+TOKENIZER = "unicode61 remove_diacritics 2"
+
+# Matches of the keywords column (item name + keywords) count double
+COLUMN_WEIGHTS = (1.0, 2.0)
+
+WORD = re.compile(r"\w+")
+
+
+def keyword_text(metadata):
+    return " ".join([metadata.get("name", "")] + list(metadata.get("keywords", [])))
+
+
+def create(connection):
+    """Build the FTS table from the chunks table of a docstore being written"""
+    connection.execute(
+        f"CREATE VIRTUAL TABLE {TABLE} USING fts5(content, keywords, content='', tokenize='{TOKENIZER}')"
+    )
+    rows = connection.execute("SELECT position, content, metadata FROM chunks").fetchall()
+    connection.executemany(
+        f"INSERT INTO {TABLE} (rowid, content, keywords) VALUES (?, ?, ?)",
+        [(position, content, keyword_text(json.loads(metadata))) for position, content, metadata in rows]
+    )
+
+
+def match_expression(query):
+    """FTS5 query matching any word of the question, quoted so punctuation is never syntax"""
+    words = WORD.findall(unicodedata.normalize("NFC", query).lower())
+    return " OR ".join(f'"{word}"' for word in dict.fromkeys(words))
+
+
+class KeywordIndex:
+    """Read-only BM25 search over a saved docstore.sqlite"""
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+
+    @classmethod
+    def open(cls, path):
+        """KeywordIndex for path, None if the docstore has no keyword table"""
+        try:
+            index = cls(path)
+            with index._lock:
+                found = index._connection.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = ?", (TABLE,)
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        return index if found else None
+
+    def search(self, query, k=10):
+        """Top k chunks as (Document, score), best first. Higher scores are better"""
+        expression = match_expression(query)
+        if not expression:
+            return []
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT c.id, c.content, c.metadata, bm25({TABLE}, ?, ?) AS rank "
+                f"FROM {TABLE} JOIN chunks c ON c.position = {TABLE}.rowid "
+                f"WHERE {TABLE} MATCH ? ORDER BY rank LIMIT ?",
+                (*COLUMN_WEIGHTS, expression, k)
+            ).fetchall()
+        # FTS5 returns bm25 negated so that ascending order is best first
+        return [(Document(id=doc_id, page_content=content, metadata=json.loads(metadata)), -rank)
+                for doc_id, content, metadata, rank in rows]
+
+    def close(self):
+        self._connection.close()
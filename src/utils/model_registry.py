@@ -0,0 +1,181 @@
+"""Process-wide registry for the embedding model and the FAISS index.
+
+Everything that needs embeddings or the vector store goes through here so the
+MiniLM model and the index are loaded once per process and shared.
+"""
+import threading
+import time
+from ..config import (INDEX_VERSION_FILE, INDEX_VERSIONS_DIR, EMBEDDING_MODEL, EMBEDDING_BACKEND, USE_EMBEDDING_CACHE,
+                      EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_MAX_ENTRIES)
+from .embedding_cache import CachedEmbeddings
+from . import vector_store_io
+from .keyword_index import KeywordIndex
+
+_lock = threading.RLock()
+_embeddings = None
+_vector_store = None
+_vector_store_version = None
+_keyword_index = None
+_reloading = None  # Version being loaded in the background
+_retired = None  # (vector store, keyword index) replaced by the last swap
+_load_stats = {}
+
+
+def resident_memory_mb():
+    """Current resident set size of the process in MB"""
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    import sys
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and KB elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _record(name, start, rss_before):
+    _load_stats[name] = {
+        "load_seconds": time.perf_counter() - start,
+        "rss_delta_mb": resident_memory_mb() - rss_before,
+    }
+    print(f"Loaded {name} in {_load_stats[name]['load_seconds']:.2f}s "
+          f"(+{_load_stats[name]['rss_delta_mb']:.0f} MB, RSS {resident_memory_mb():.0f} MB)")
+
+
+def create_embeddings(backend=EMBEDDING_BACKEND, **options):
+    """Uncached embedding model for backend, imported lazily so the ONNX path never loads torch.
+
+    options go to OnnxEmbeddings (model_dir, threads, batch_size).
+    """
+    if backend == "onnx":
+        from .onnx_embeddings import OnnxEmbeddings
+        return OnnxEmbeddings(**options)
+    if backend == "huggingface":
+        from langchain_huggingface.embeddings import HuggingFaceEmbeddings
+        return HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+    raise ValueError(f"Unknown embedding backend: {backend}")
+
+
+def embedding_model_id(backend=EMBEDDING_BACKEND):
+    """Identifies the vectors a backend produces, for the embedding cache and the index manifest"""
+    return EMBEDDING_MODEL if backend == "huggingface" else f"{EMBEDDING_MODEL}:{backend}-int8"
+
+
+def get_embeddings():
+    """Shared embedding model, loaded on first use"""
+    global _embeddings
+    with _lock:
+        if _embeddings is None:
+            start, rss_before = time.perf_counter(), resident_memory_mb()
+            _embeddings = create_embeddings()
+            if USE_EMBEDDING_CACHE:
+                _embeddings = CachedEmbeddings(_embeddings, embedding_model_id(), EMBEDDING_CACHE_PATH,
+                                               max_entries=EMBEDDING_CACHE_MAX_ENTRIES)
+            _record("embeddings", start, rss_before)
+        return _embeddings
+
+
+def _load_version(version):
+    start, rss_before = time.perf_counter(), resident_memory_mb()
+    # Memory-mapped index, chunks are read from SQLite on demand
+    vector_store = vector_store_io.load(INDEX_VERSIONS_DIR / version, get_embeddings())
+    _record("vector_store", start, rss_before)
+    return vector_store
+
+
+def get_vector_store():
+    """Shared FAISS index, loaded on first use. Returns None if no index was built"""
+    global _vector_store, _vector_store_version
+    with _lock:
+        if _vector_store is None:
+            version = vector_store_io.read_version(INDEX_VERSION_FILE)
+            if not version or not vector_store_io.exists(INDEX_VERSIONS_DIR / version):
+                print("Vector store not found. Please run setup.py first")
+                return None
+            _vector_store, _vector_store_version = _load_version(version), version
+        return _vector_store
+
+
+def _reload(version):
+    global _reloading
+    try:
+        vector_store = _load_version(version)
+        set_vector_store(vector_store, version)
+        print(f"Switched to index version {version}")
+    except Exception as e:
+        print(f"Error loading index version {version}: {e}")
+    finally:
+        with _lock:
+            _reloading = None
+
+
+def published_vector_store():
+    """Shared index, following the published version without blocking.
+
+    When a new version is published, it is loaded in a background thread and
+    the current store is returned until it is ready, so callers can check on
+    every turn and swap once this returns a different object.
+    """
+    global _reloading
+    version = vector_store_io.read_version(INDEX_VERSION_FILE)
+    with _lock:
+        if _vector_store is None:
+            return get_vector_store()
+        if version and version != _vector_store_version and _reloading is None:
+            _reloading = version
+            threading.Thread(target=_reload, args=(version,), name="index-reload", daemon=True).start()
+        return _vector_store
+
+
+def vector_store_version():
+    """Version of the shared index, None before it is loaded"""
+    return _vector_store_version
+
+
+def get_keyword_index():
+    """Shared BM25 index saved with the vector store, None if it has none"""
+    global _keyword_index
+    with _lock:
+        if _keyword_index is None and _vector_store_version:
+            _keyword_index = KeywordIndex.open(INDEX_VERSIONS_DIR / _vector_store_version / vector_store_io.DOCSTORE_FILE)
+        return _keyword_index
+
+
+def _close(vector_store, keyword_index):
+    """Close the SQLite connections of a replaced index"""
+    for resource in (getattr(vector_store, "docstore", None), keyword_index):
+        if hasattr(resource, "close"):
+            try:
+                resource.close()
+            except Exception as e:
+                print(f"Error closing replaced index: {e}")
+
+
+def set_vector_store(vector_store, version):
+    """Replace the shared index, e.g. after rebuilding it in this process.
+
+    Sessions keep reading the replaced index until their next turn, so its
+    connections are closed on the following swap rather than right away.
+    """
+    global _vector_store, _vector_store_version, _keyword_index, _retired
+    stale = None
+    with _lock:
+        if vector_store is not _vector_store:
+            stale, _retired = _retired, (_vector_store, _keyword_index)
+        _vector_store, _vector_store_version = vector_store, version
+        # Reopened from the new docstore on next use
+        _keyword_index = None
+    if stale is not None and stale[0] is not vector_store:
+        _close(*stale)
+
+
+def report():
+    """Load times and memory of everything loaded so far"""
+    stats = {"loaded": dict(_load_stats), "rss_mb": resident_memory_mb(), "index_version": _vector_store_version}
+    if isinstance(_embeddings, CachedEmbeddings):
+        stats["embedding_cache"] = {**_embeddings.stats, "hit_rates": _embeddings.hit_rates()}
+    return stats
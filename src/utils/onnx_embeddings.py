@@ -0,0 +1,107 @@
+"""all-MiniLM-L6-v2 on ONNX Runtime, int8-quantized, without torch or sentence-transformers.
+
+Prepare the model once (needs network access and the onnx package):
+
+    python -m src.utils.onnx_embeddings
+
+This downloads the ONNX export and tokenizer published with the model,
+quantizes the weights to int8 and writes model_int8.onnx and tokenizer.json
+to ONNX_MODEL_DIR. At runtime only onnxruntime, tokenizers and numpy are needed.
+"""
+from pathlib import Path
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from ..config import EMBEDDING_MODEL, ONNX_MODEL_DIR, ONNX_THREADS
+
+MODEL_FILE = "model_int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+
+# Same as the sentence-transformers config of all-MiniLM-L6-v2
+MAX_LENGTH = 256
+
+
+class OnnxEmbeddings(Embeddings):
+    """Mean-pooled, L2-normalized sentence embeddings from an ONNX transformer.
+
+    Matches HuggingFaceEmbeddings for all-MiniLM-L6-v2 (whose pipeline ends
+    with mean pooling and normalization) up to quantization error.
+    """
+
+    def __init__(self, model_dir=ONNX_MODEL_DIR, threads=ONNX_THREADS, batch_size=32, max_length=MAX_LENGTH):
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        model_dir = Path(model_dir)
+        self.batch_size = batch_size
+        self.tokenizer = Tokenizer.from_file(str(model_dir / TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length)
+        self.tokenizer.enable_padding()
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        self.session = onnxruntime.InferenceSession(
+            str(model_dir / MODEL_FILE), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {node.name for node in self.session.get_inputs()}
+
+    def _embed_batch(self, texts):
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            inputs["token_type_ids"] = np.zeros_like(input_ids)
+
+        token_embeddings = self.session.run(None, inputs)[0]
+        mask = attention_mask[:, :, None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return pooled / np.clip(norms, 1e-12, None)
+
+    def embed_documents(self, texts):
+        texts = [text.replace("\n", " ") for text in texts]
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            vectors.extend(self._embed_batch(texts[start:start + self.batch_size]).tolist())
+        return vectors
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def quantize(source, target):
+    """Dynamic int8 quantization of the weights (activations stay float)"""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    quantize_dynamic(str(source), str(target), weight_type=QuantType.QInt8)
+
+
+def prepare_model(model_name=EMBEDDING_MODEL, model_dir=ONNX_MODEL_DIR):
+    """Download the ONNX export of model_name and write the int8 model to model_dir"""
+    from huggingface_hub import hf_hub_download
+
+    model_dir = Path(model_dir)
+    model_dir.mkdir(parents=True, exist_ok=True)
+    print(f"Downloading ONNX export of {model_name}...")
+    source = hf_hub_download(model_name, "onnx/model.onnx")
+    tokenizer = hf_hub_download(model_name, TOKENIZER_FILE)
+    (model_dir / TOKENIZER_FILE).write_bytes(Path(tokenizer).read_bytes())
+
+    print("Quantizing to int8...")
+    quantize(source, model_dir / MODEL_FILE)
+    print(f"ONNX model written to {model_dir}")
+    return model_dir
+
+
+def parity(reference, candidate, texts):
+    """Cosine similarity between the two backends' vectors for the same texts"""
+    expected = np.asarray(reference.embed_documents(texts), dtype=np.float32)
+    actual = np.asarray(candidate.embed_documents(texts), dtype=np.float32)
+    expected /= np.linalg.norm(expected, axis=1, keepdims=True)
+    actual /= np.linalg.norm(actual, axis=1, keepdims=True)
+    cosines = (expected * actual).sum(axis=1)
+    return {"min_cosine": float(cosines.min()), "mean_cosine": float(cosines.mean())}
+
+
+if __name__ == "__main__":
+    prepare_model()
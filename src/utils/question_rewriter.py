@@ -0,0 +1,64 @@
+import re
+
+# Words that usually point back to something said earlier in the conversation
+FOLLOW_UP_WORDS = {
+    'en': {'it', 'its', 'they', 'them', 'their', 'that', 'this', 'those', 'these',
+           'there', 'he', 'she', 'him', 'her'},
+    'fr': {'il', 'elle', 'ils', 'elles', 'lui', 'leur', 'leurs',
+           'ça', 'ca', 'cela', 'ceci', 'celui', 'celle', 'ceux', 'celles'},
+    'ar': {'هو', 'هي', 'هوما', 'هادي', 'هادا', 'هاد', 'هاديك', 'هاداك', 'ديالو',
+           'ديالها', 'ديالهم', 'فيه', 'فيها', 'عليه', 'عليها'},
+}
+
+# Openers of elliptical follow-ups ("and the price?", "what about Saturday?")
+FOLLOW_UP_OPENERS = {
+    'en': ('and ', 'what about', 'how about', 'also', 'more ', 'tell me more'),
+    'fr': ('et ', 'et pour', 'aussi', 'plus de', 'encore'),
+    'ar': ('وشنو', 'وكيفاش', 'وفين', 'وشحال', 'زيد'),
+}
+
+# "Is there a ...", "Y a-t-il des ..." introduce a new topic, the pronoun refers to nothing
+EXISTENTIALS = {
+    'en': re.compile(r"\b(?:is|are|was|were) there\b(?=\s*\w)"),
+    'fr': re.compile(r"\by a[- ]t[- ]il\b|\bil y a\b|\bil faut\b"),
+    'ar': None,
+}
+
+# Bare one- or two-word questions ("price?", "on Saturday?") lean on the previous turn
+SHORT_QUESTION_WORDS = 2
+
+WORD = re.compile(r"[\w']+", re.UNICODE)
+
+
+def is_follow_up(question, language=None):
+    """Guess whether a question depends on the previous turn.
+
+    Only the pronouns and openers of language are checked, all languages
+    when it is None.
+    """
+    languages = [language] if language in FOLLOW_UP_WORDS else list(FOLLOW_UP_WORDS)
+    text = question.lower().strip()
+    words = WORD.findall(text)
+    if not words:
+        return False
+    if len(words) <= SHORT_QUESTION_WORDS:
+        return True
+    if any(text.startswith(FOLLOW_UP_OPENERS[lang]) for lang in languages):
+        return True
+    for lang in languages:
+        if EXISTENTIALS[lang] is not None:
+            text = EXISTENTIALS[lang].sub(" ", text)
+    words = WORD.findall(text)
+    return any(word in FOLLOW_UP_WORDS[lang] for lang in languages for word in words)
+
+
+def rewrite_question(question, previous_question, language=None):
+    """Build a standalone retrieval query without an LLM call.
+
+    Follow-ups are expanded with the previous user question so retrieval
+    still finds the topic the visitor is referring to; the answer prompt keeps
+    the original question and the chat history.
+    """
+    if not previous_question or not is_follow_up(question, language):
+        return question
+    return f"{previous_question} {question}"
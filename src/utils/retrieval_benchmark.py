@@ -0,0 +1,98 @@
+"""Retrieval quality and speed of a DocumentProcessor configuration on labelled queries.
+
+Each labelled query lists the data files ("sources") and the documents
+("items", matched against the chunk's metadata name) that answer it. A
+retrieved chunk is relevant when its source file is one of the sources and,
+if items are given, its name is one of the items. recall@k is the share of
+queries with a relevant chunk in the top k, MRR the mean reciprocal rank of
+the first relevant chunk.
+"""
+import json
+import time
+from pathlib import Path
+import numpy as np
+from . import vector_store_io
+
+
+def load_queries(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def is_relevant(doc, query):
+    if Path(doc.metadata.get("source", "")).name not in query["sources"]:
+        return False
+    return not query.get("items") or doc.metadata.get("name") in query["items"]
+
+
+def first_relevant_rank(docs, query):
+    """1-based rank of the first relevant chunk, None if none was retrieved"""
+    for rank, doc in enumerate(docs, 1):
+        if is_relevant(doc, query):
+            return rank
+    return None
+
+
+def summarize(ranks, ks):
+    row = {f"recall@{k}": sum(rank is not None and rank <= k for rank in ranks) / len(ranks) for k in ks}
+    row["mrr"] = sum(1 / rank for rank in ranks if rank) / len(ranks)
+    row["queries"] = len(ranks)
+    return row
+
+
+def evaluate(search, queries, ks=(1, 3, 5), rounds=3):
+    """Run search(text) -> ranked documents for every query.
+
+    Latency percentiles are over all rounds; relevance is taken from the first.
+    """
+    ranks, latencies = [], []
+    for query in queries:
+        for round_number in range(rounds):
+            start = time.perf_counter()
+            docs = search(query["query"])
+            latencies.append(time.perf_counter() - start)
+            if round_number == 0:
+                ranks.append(first_relevant_rank(docs[:max(ks)], query))
+
+    report = summarize(ranks, ks)
+    report["latency_ms_p50"] = 1000 * float(np.percentile(latencies, 50))
+    report["latency_ms_p95"] = 1000 * float(np.percentile(latencies, 95))
+    report["by_language"] = {
+        language: summarize([rank for query, rank in zip(queries, ranks) if query["language"] == language], ks)
+        for language in sorted({query["language"] for query in queries})
+    }
+    report["misses"] = [query["query"] for query, rank in zip(queries, ranks) if rank is None]
+    return report
+
+
+def directory_size(path):
+    return sum(file.stat().st_size for file in Path(path).rglob("*") if file.is_file())
+
+
+def build(processor, path):
+    """Chunk, embed and index the data directory with processor's settings and save it to path.
+
+    Embeddings come from the embedding cache when it is enabled, so
+    build_seconds after the first run is mostly chunking and indexing.
+    """
+    start = time.perf_counter()
+    chunks = processor.text_splitter.split_documents(processor.load_documents())
+    vector_store = processor.create_vector_store(chunks, processor.chunk_ids(chunks))
+    vector_store_io.save(vector_store, path)
+    return {"chunks": len(chunks), "build_seconds": time.perf_counter() - start,
+            "size_bytes": directory_size(path)}
+
+
+def compare(report, baseline):
+    """Changes from a previous report of the same shape, per retriever and metric"""
+    changes = {}
+    for name, row in report["retrievers"].items():
+        previous = baseline.get("retrievers", {}).get(name)
+        if previous:
+            changes[name] = {metric: value - previous[metric] for metric, value in row.items()
+                             if metric != "queries" and isinstance(value, (int, float))
+                             and isinstance(previous.get(metric), (int, float))}
+    for metric in ("build_seconds", "size_bytes"):
+        if metric in baseline.get("index", {}):
+            changes.setdefault("index", {})[metric] = report["index"][metric] - baseline["index"][metric]
+    return changes
@@ -0,0 +1,149 @@
+"""Streaming speech playback without temporary files.
+
+edge-tts audio chunks are written into the player as they arrive, so the
+first words play while the rest of the answer is still being synthesized.
+SpeechPlayer keeps one libmpv instance (python-mpv) for the whole session;
+where libmpv is not installed, PipePlayer pipes each utterance into the mpv
+executable at MPV_PATH. Both expose async play() and stop(), and never
+block the event loop.
+"""
+import asyncio
+import queue
+import threading
+from ..config import SPEECH_PLAYER, MPV_PATH
+
+_lock = threading.Lock()
+_player = None
+
+
+async def synthesize(text, voice):
+    """edge-tts MP3 chunks for text, yielded as they are streamed from the service"""
+    import edge_tts
+    async for chunk in edge_tts.Communicate(text, voice).stream():
+        if chunk["type"] == "audio":
+            yield chunk["data"]
+
+
+class SpeechPlayer:
+    """One long-lived libmpv player, each play() is streamed into it as a single file"""
+
+    def __init__(self, player=None):
+        self._player = player
+        self._lock = asyncio.Lock()
+        self._loop = None
+        self._finished = None
+        self._stopping = False
+        if player is not None:
+            self._watch(player)
+
+    @property
+    def player(self):
+        if self._player is None:
+            import mpv
+            self._player = mpv.MPV(video=False, ytdl=False)
+            self._watch(self._player)
+        return self._player
+
+    def _watch(self, player):
+        @player.event_callback('end-file')
+        def on_end_file(event):
+            # Called from the mpv event thread
+            if self._finished is not None:
+                self._loop.call_soon_threadsafe(self._finish, self._finished)
+
+    @staticmethod
+    def _finish(finished):
+        if not finished.done():
+            finished.set_result(None)
+
+    async def play(self, chunks):
+        """Play an async iterable of audio chunks, returns once it was played or stop() was called"""
+        async with self._lock:  # One utterance at a time
+            self._loop = asyncio.get_running_loop()
+            self._stopping = False
+            audio = queue.Queue()
+            # Read by mpv on its own thread; None ends the stream
+            reader = self.player.python_stream()(lambda: iter(audio.get, None))
+            try:
+                self._finished = self._loop.create_future()
+                self.player.play(reader.stream_uri)
+                try:
+                    async for chunk in chunks:
+                        if self._stopping:
+                            break
+                        if chunk:
+                            audio.put(chunk)
+                finally:
+                    audio.put(None)
+                    # Also after stop() or a synthesis error, so its end-file can't end the next play()
+                    await self._finished
+            finally:
+                self._finished = None
+                reader.unregister()
+
+    def stop(self):
+        """Cut the current utterance short, play() returns once the player has stopped"""
+        if self._finished is not None:
+            self._stopping = True
+            self.player.stop()
+
+    def close(self):
+        if self._player is not None:
+            self._player.terminate()
+            self._player = None
+
+
+class PipePlayer:
+    """Fallback without libmpv: an mpv process per utterance reading the audio from stdin"""
+
+    def __init__(self, command=MPV_PATH):
+        self.command = command
+        self.process = None
+        self._lock = asyncio.Lock()
+        self._stopping = False
+
+    async def play(self, chunks):
+        async with self._lock:
+            self._stopping = False
+            self.process = await asyncio.create_subprocess_exec(
+                self.command, '--no-terminal', '--no-video', '--cache=no', '-', stdin=asyncio.subprocess.PIPE)
+            try:
+                async for chunk in chunks:
+                    if self._stopping:
+                        break
+                    self.process.stdin.write(chunk)
+                    await self.process.stdin.drain()
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # Stopped
+            finally:
+                # End of the stream, mpv exits once it has played it
+                self.process.stdin.close()
+                await self.process.wait()
+                self.process = None
+
+    def stop(self):
+        if self.process is not None and self.process.returncode is None:
+            self._stopping = True
+            self.process.terminate()
+
+    def close(self):
+        self.stop()
+
+
+def create_player(kind=SPEECH_PLAYER):
+    if kind == "libmpv":
+        try:
+            import mpv  # noqa: F401
+            return SpeechPlayer()
+        except (ImportError, OSError) as e:
+            print(f"libmpv unavailable ({e}), playing through {MPV_PATH} instead")
+    return PipePlayer()
+
+
+def get_speech_player():
+    """Shared player, created on first use"""
+    global _player
+    with _lock:
+        if _player is None:
+            _player = create_player()
+        return _player
@@ -0,0 +1,203 @@
+"""Speech-to-text backends run on the same recording, with hedging between them.
+
+Backends, in the order given by STT_BACKENDS:
+    groq            Whisper large v3 turbo on the Groq API
+    google          Google Web Speech through speech_recognition
+    faster_whisper  Local Whisper on CPU, int8 (pip install faster-whisper)
+    vosk            Local Kaldi models, one per language under VOSK_MODEL_DIR (pip install vosk)
+
+The first backend starts at once; if it has not answered after
+STT_HEDGE_DELAY seconds (or as soon as it fails) the next one starts on the
+same audio, and the first non-empty transcription wins. A failed backend
+never means asking the user to speak again.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import numpy as np
+from ..config import (STT_BACKENDS, STT_HEDGE_DELAY, FASTER_WHISPER_MODEL, FASTER_WHISPER_THREADS,
+                      VOSK_MODEL_DIR)
+from .audio import to_array, to_pcm, to_wav
+from .vad import SAMPLE_RATE, SAMPLE_WIDTH
+
+# Language codes of the assistant -> Google locales
+GOOGLE_LANGUAGES = {'en': 'en-US', 'fr': 'fr-FR', 'ar': 'ar-MA'}
+
+_lock = threading.Lock()
+_speech_to_text = None
+
+
+class GroqSTT:
+    name = "groq"
+
+    def __init__(self, model="whisper-large-v3-turbo"):
+        from groq import Groq
+        self.client = Groq(api_key=os.getenv('GROQ_API_KEY'))
+        self.model = model
+
+    def transcribe(self, audio, language):
+        return self.client.audio.transcriptions.create(
+            file=("audio.wav", to_wav(audio)),
+            model=self.model,
+            language=language,
+            response_format="text"
+        )
+
+
+class GoogleSTT:
+    name = "google"
+
+    def __init__(self):
+        import speech_recognition as sr
+        self.sr = sr
+        self.recognizer = sr.Recognizer()
+
+    def transcribe(self, audio, language):
+        data = self.sr.AudioData(to_pcm(audio), SAMPLE_RATE, SAMPLE_WIDTH)
+        try:
+            return self.recognizer.recognize_google(data, language=GOOGLE_LANGUAGES.get(language, language))
+        except self.sr.UnknownValueError:
+            return None
+
+
+class FasterWhisperSTT:
+    name = "faster_whisper"
+
+    def __init__(self, model=FASTER_WHISPER_MODEL, threads=FASTER_WHISPER_THREADS):
+        import faster_whisper
+        self.faster_whisper = faster_whisper
+        self.model_name = model
+        self.threads = threads
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        """Loaded (and downloaded the first time) when this backend first runs, in its worker thread"""
+        with self._lock:
+            if self._model is None:
+                self._model = self.faster_whisper.WhisperModel(self.model_name, device="cpu", compute_type="int8",
+                                                               cpu_threads=self.threads)
+            return self._model
+
+    def transcribe(self, audio, language):
+        samples = to_array(audio).astype(np.float32) / 32768.0
+        segments, _ = self.model.transcribe(samples, language=language, beam_size=1, vad_filter=False)
+        return " ".join(segment.text.strip() for segment in segments)
+
+
+class VoskSTT:
+    name = "vosk"
+
+    def __init__(self, model_dir=VOSK_MODEL_DIR):
+        import vosk
+        self.vosk = vosk
+        self.model_dir = model_dir
+        self.models = {}
+
+    def transcribe(self, audio, language):
+        if language not in self.models:
+            path = self.model_dir / language
+            if not path.exists():
+                print(f"No Vosk model for '{language}' in {self.model_dir}")
+                return None
+            self.models[language] = self.vosk.Model(str(path))
+        recognizer = self.vosk.KaldiRecognizer(self.models[language], SAMPLE_RATE)
+        recognizer.AcceptWaveform(to_pcm(audio))
+        return json.loads(recognizer.FinalResult()).get("text")
+
+
+BACKENDS = {backend.name: backend for backend in (GroqSTT, GoogleSTT, FasterWhisperSTT, VoskSTT)}
+
+
+def create_backends(names=STT_BACKENDS):
+    """Instantiate the named backends, skipping those whose package is missing"""
+    backends = []
+    for name in names:
+        try:
+            backends.append(BACKENDS[name]())
+        except KeyError:
+            print(f"Unknown speech-to-text backend '{name}'")
+        except Exception as e:
+            print(f"Speech-to-text backend '{name}' unavailable: {e}")
+    return backends
+
+
+class SpeechToText:
+    """Transcribe one recording with several backends, hedged in order of preference.
+
+    hedge_delay=0 starts every backend at once and takes the first answer;
+    hedge_delay=None only moves on when a backend fails. Losing backends
+    run to completion in the background and their answers are dropped.
+    A backend still busy with an earlier recording is skipped, so with one
+    worker per backend a started backend never waits for a free thread.
+    """
+
+    def __init__(self, backends=None, hedge_delay=STT_HEDGE_DELAY):
+        self.backends = create_backends() if backends is None else backends
+        self.hedge_delay = hedge_delay
+        self.executor = ThreadPoolExecutor(max_workers=max(1, len(self.backends)), thread_name_prefix="stt")
+        self.running = {}  # backend name -> future of its latest call
+        self.stats = {backend.name: {"wins": 0, "failures": 0, "skipped": 0} for backend in self.backends}
+
+    def _run(self, backend, audio, language):
+        start = time.perf_counter()
+        try:
+            text = backend.transcribe(audio, language)
+            text = text.strip() if text else None
+        except Exception as e:
+            print(f"Error transcribing with {backend.name}: {e}")
+            text = None
+        return text, time.perf_counter() - start
+
+    def transcribe(self, audio, language="en"):
+        """Text of the recording, None if no backend understood it"""
+        remaining = iter(self.backends)
+        pending = {}
+
+        def start_next():
+            for backend in remaining:
+                previous = self.running.get(backend.name)
+                if previous is not None and not previous.done():
+                    # Still on a recording it lost, this one would queue behind it
+                    self.stats[backend.name]["skipped"] += 1
+                    continue
+                future = self.executor.submit(self._run, backend, audio, language)
+                self.running[backend.name] = future
+                pending[future] = backend
+                return True
+            return False
+
+        more = start_next()
+        while pending:
+            # Once every backend has started, just wait for them
+            done, _ = wait(pending, timeout=self.hedge_delay if more else None, return_when=FIRST_COMPLETED)
+            if not done:
+                more = start_next()  # Slow backend: hedge with the next one
+                continue
+            # Backends that finished together are taken in order of preference
+            for future in sorted(done, key=lambda future: self.backends.index(pending[future])):
+                backend = pending.pop(future)
+                text, seconds = future.result()
+                if text:
+                    self.stats[backend.name]["wins"] += 1
+                    print(f"Transcribed by {backend.name} in {seconds:.2f}s")
+                    return text
+                self.stats[backend.name]["failures"] += 1
+                more = more and start_next()  # Failed, the next one starts now rather than after the delay
+        return None
+
+
+def get_speech_to_text():
+    """Shared backend chain, created on first use"""
+    global _speech_to_text
+    with _lock:
+        if _speech_to_text is None:
+            _speech_to_text = SpeechToText()
+        return _speech_to_text
+
+
+def transcribe(audio, language="en"):
+    return get_speech_to_text().transcribe(audio, language)
@@ -0,0 +1,33 @@
+import re
+
+# Sentence end: terminal punctuation (Latin and Arabic) followed by whitespace
+SENTENCE_END = re.compile(r'(?<=[.!?؟…])\s+|\n+')
+
+
+class SentenceSplitter:
+    """Accumulate streamed tokens and release complete sentences"""
+
+    def __init__(self, min_length=20):
+        # Very short sentences ("Yes.") are merged with the next one so
+        # TTS is not called for a single word
+        self.min_length = min_length
+        self.buffer = ""
+
+    def feed(self, token):
+        """Add a token and return the sentences it completed"""
+        self.buffer += token
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(self.buffer):
+            candidate = self.buffer[start:match.start()].strip()
+            if len(candidate) >= self.min_length:
+                sentences.append(candidate)
+                start = match.end()
+        self.buffer = self.buffer[start:]
+        return sentences
+
+    def flush(self):
+        """Return whatever is left once the stream is finished"""
+        rest = self.buffer.strip()
+        self.buffer = ""
+        return [rest] if rest else []
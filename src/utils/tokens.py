@@ -0,0 +1,10 @@
+# Cohere does not ship a local tokenizer for command-r; ~4 characters per
+# token is close enough for budgeting prompts in en/fr/ar.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """Rough token count of a piece of text"""
+    if not text:
+        return 0
+    return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
@@ -1,11 +1,14 @@
 import speech_recognition as sr
 import os
-import wave
 import pyaudio
 from groq import Groq
-import edge_tts
 import asyncio
 from dotenv import load_dotenv
+from ..config import VAD_ENDPOINTING, DEBUG_AUDIO_FILE
+from .audio import save_wav, to_wav
+from .audio_capture import get_capture_service
+from .speech_player import get_speech_player, synthesize
+from .vad import SAMPLE_RATE
 
 load_dotenv()
 
@@ -24,10 +27,6 @@ def recognize_speech_from_mic(language='en-US', device_index=3):
 
     try:
         # Recognize speech using Google's speech recognition
-        text = recognizer.recognize_google(audio)
-        print("You said: " + text)
-
-        # Recognize speech again with the detected language
         text = recognizer.recognize_google(audio, language=language)
         print(f"You said (in {language}): " + text)
         return text
@@ -45,37 +44,46 @@ def recognize_speech_from_mic(language='en-US', device_index=3):
         return None
 
 async def speak(text, lang='en'):
-    """ Generate speech from text using edge-tts and play using mpv """
+    """ Generate speech from text using edge-tts and stream it to the shared player """
     voice = 'en-US-EmmaMultilingualNeural'  # Adjust voice as needed
-    output_file = "temp.mp3"
-
     try:
-        # Generate speech using edge-tts
-        communicate = edge_tts.Communicate(text, voice)
-        await communicate.save(output_file)
-
-        # Play the audio file using mpv
-        command = f'mpv --no-terminal {output_file}'
-        # command = fr'"C:\Users\Home\Downloads\mpv-i686-w64-mingw32\mpv.exe" {output_file}'
-        os.system(command)
+        await get_speech_player().play(synthesize(text, voice))
     except Exception as e:
         print(f"Error during TTS or playback: {e}")  # Informative error message
-    finally:
-        # Ensure temporary file is removed even if exceptions occur
-        if os.path.exists(output_file):
-            os.remove(output_file)
 
 # Initialize the Groq client
 client = Groq(api_key=groq_api_key)
 
-def record_audio_to_file(file_name="live_audio.wav"):
-    """Records audio from the microphone and saves it to a WAV file."""
+def record_audio(endpointing=VAD_ENDPOINTING, debug_file=DEBUG_AUDIO_FILE):
+    """Records audio from the microphone and returns it as in-memory PCM bytes.
+
+    With endpointing, the utterance comes from the shared capture service,
+    whose stream stays open between turns, and recording stops once the
+    speaker pauses. Returns None when no speech was heard, so there is
+    nothing to transcribe. debug_file additionally saves each recording
+    as a WAV file.
+    """
+    if endpointing:
+        print("Listening... Speak into the microphone.")
+        pcm = get_capture_service().listen()
+    else:
+        pcm = record_fixed_duration()
+
+    if not pcm:
+        print("No speech detected")
+        return None
+    if debug_file:
+        save_wav(pcm, debug_file)
+    return pcm
+
+def record_fixed_duration(seconds=8):
+    """Records a fixed number of seconds on a stream opened for this call only"""
     p = pyaudio.PyAudio()
 
     # Open a stream for recording
     stream = p.open(format=pyaudio.paInt16,
                     channels=1,
-                    rate=16000,
+                    rate=SAMPLE_RATE,
                     input=True,
                     frames_per_buffer=1024)
 
@@ -83,7 +91,7 @@ def record_audio_to_file(file_name="live_audio.wav"):
     frames = []
 
     try:
-        for _ in range(0, int(16000 / 1024 * 8)):  # Record for 5 seconds
+        for _ in range(0, int(SAMPLE_RATE / 1024 * seconds)):
             data = stream.read(1024)
             frames.append(data)
     except KeyboardInterrupt:
@@ -93,22 +101,25 @@ def record_audio_to_file(file_name="live_audio.wav"):
     stream.stop_stream()
     stream.close()
     p.terminate()
-
-    # Save the audio to file
-    wf = wave.open(file_name, 'wb')
-    wf.setnchannels(1)
-    wf.setsampwidth(p.get_sample_size(pyaudio.paInt16))
-    wf.setframerate(16000)
-    wf.writeframes(b''.join(frames))
-    wf.close()
-
-def transcribe_audio_with_groq(audio_file="live_audio.wav", language="en"):
-    """Transcribes audio using Groq API."""
-    with open(audio_file, "rb") as file:
-        transcription = client.audio.transcriptions.create(
-            file=(audio_file, file.read()),
-            model="whisper-large-v3-turbo",  # Specify the model
-            language=language,  # Specify the language
-            response_format="text"          # Use "text" for a simple string response
-        )
-    return transcription  # Returns the plain transcription text
\ No newline at end of file
+    return b''.join(frames)
+
+def record_audio_to_file(file_name="live_audio.wav", endpointing=VAD_ENDPOINTING):
+    """Records audio from the microphone and saves it to a WAV file, returns False if nothing was said"""
+    return record_audio(endpointing, debug_file=file_name) is not None
+
+def transcribe_audio_with_groq(audio="live_audio.wav", language="en"):
+    """Transcribes audio using Groq API.
+
+    audio is a recording from record_audio (PCM or WAV bytes, or an int16
+    array), uploaded straight from memory, or the path of a WAV file.
+    """
+    if isinstance(audio, str):
+        with open(audio, "rb") as file:
+            audio = file.read()
+    transcription = client.audio.transcriptions.create(
+        file=("audio.wav", to_wav(audio)),
+        model="whisper-large-v3-turbo",  # Specify the model
+        language=language,  # Specify the language
+        response_format="text"          # Use "text" for a simple string response
+    )
+    return transcription  # Returns the plain transcription text
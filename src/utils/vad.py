@@ -0,0 +1,127 @@
+"""Voice activity detection and end-of-utterance detection for microphone capture.
+
+Frames are 16 kHz mono 16-bit PCM. The energy detector needs only numpy;
+VAD_MODE='webrtc' uses the WebRTC detector from the webrtcvad package,
+which copes better with fans and background chatter.
+"""
+from collections import deque
+import numpy as np
+from ..config import (VAD_MODE, VAD_AGGRESSIVENESS, VAD_ENERGY_MARGIN_DB, VAD_NOISE_WINDOW_MS, VAD_FRAME_MS,
+                      VAD_PRE_ROLL_MS, VAD_TRAILING_SILENCE_MS, VAD_MIN_SPEECH_MS, VAD_NO_SPEECH_TIMEOUT, VAD_MAX_RECORDING)
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2  # Bytes per sample (paInt16)
+
+# Quieter than this is never speech, whatever the noise floor
+MIN_SPEECH_DB = -50.0
+
+
+def frame_samples(frame_ms=VAD_FRAME_MS):
+    return SAMPLE_RATE * frame_ms // 1000
+
+
+def level_db(frame):
+    """RMS level of a PCM frame in dB relative to full scale"""
+    samples = np.frombuffer(frame, dtype=np.int16).astype(np.float32) / 32768.0
+    if not len(samples):
+        return -100.0
+    return 10 * np.log10(max(float(np.mean(samples * samples)), 1e-10))
+
+
+class EnergyVAD:
+    """Speech when a frame is clearly louder than the running noise floor.
+
+    The floor starts at the first frame, so listening should begin before
+    the speaker does (the prompt is spoken first). It never stays below the
+    quietest frame of the last window_ms, so a lasting rise in background
+    noise (a fan, a crowd) is not taken for speech forever.
+    """
+
+    def __init__(self, margin_db=VAD_ENERGY_MARGIN_DB, window_ms=VAD_NOISE_WINDOW_MS, frame_ms=VAD_FRAME_MS):
+        self.margin_db = margin_db
+        self.noise_db = None
+        self.recent = deque(maxlen=max(1, window_ms // frame_ms))
+
+    def is_speech(self, frame):
+        level = level_db(frame)
+        if self.noise_db is None:
+            self.noise_db = level
+        self.recent.append(level)
+        speech = level > max(self.noise_db + self.margin_db, MIN_SPEECH_DB)
+        if not speech:
+            # Follow the noise floor down at once and up slowly
+            self.noise_db = level if level < self.noise_db else 0.95 * self.noise_db + 0.05 * level
+        elif len(self.recent) == self.recent.maxlen:
+            # Pauses between words dip to the floor; a whole window above it means the noise got louder
+            self.noise_db = max(self.noise_db, min(self.recent))
+        return speech
+
+
+class WebRTCVAD:
+    def __init__(self, aggressiveness=VAD_AGGRESSIVENESS):
+        import webrtcvad
+        self.vad = webrtcvad.Vad(aggressiveness)
+
+    def is_speech(self, frame):
+        return self.vad.is_speech(frame, SAMPLE_RATE)
+
+
+def create_vad(mode=VAD_MODE):
+    if mode == "webrtc":
+        try:
+            return WebRTCVAD()
+        except ImportError:
+            print("webrtcvad is not installed, falling back to the energy VAD")
+    return EnergyVAD()
+
+
+class Endpointer:
+    """Decide when an utterance starts and ends from a stream of frames.
+
+    Until speech starts the last pre_roll_ms of audio is kept in a ring
+    buffer so the first syllable is not cut off. Speech starts after
+    min_speech_ms of voiced frames and ends after trailing_silence_ms of
+    unvoiced ones. Listening stops without speech after no_speech_timeout
+    seconds, and any recording is cut at max_recording seconds.
+    """
+
+    def __init__(self, vad=None, frame_ms=VAD_FRAME_MS, pre_roll_ms=VAD_PRE_ROLL_MS,
+                 trailing_silence_ms=VAD_TRAILING_SILENCE_MS, min_speech_ms=VAD_MIN_SPEECH_MS,
+                 no_speech_timeout=VAD_NO_SPEECH_TIMEOUT, max_recording=VAD_MAX_RECORDING):
+        self.vad = vad or create_vad()
+        self.trailing_frames = max(1, trailing_silence_ms // frame_ms)
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        # Holds the voiced frames that start an utterance plus the pre-roll before them
+        self.pre_roll = deque(maxlen=pre_roll_ms // frame_ms + self.min_speech_frames)
+        self.no_speech_frames = int(no_speech_timeout * 1000 // frame_ms)
+        self.max_frames = int(max_recording * 1000 // frame_ms)
+        self.frames = []
+        self.seen = 0
+        self.voiced_run = 0
+        self.silent_run = 0
+        self.speech_detected = False
+        self.done = False
+
+    def feed(self, frame):
+        """Add one frame, returns True once capture should stop"""
+        self.seen += 1
+        voiced = self.vad.is_speech(frame)
+        if not self.speech_detected:
+            self.pre_roll.append(frame)
+            self.voiced_run = self.voiced_run + 1 if voiced else 0
+            if self.voiced_run >= self.min_speech_frames:
+                self.speech_detected = True
+                self.frames = list(self.pre_roll)
+            elif self.seen >= self.no_speech_frames:
+                self.done = True
+            return self.done
+
+        self.frames.append(frame)
+        self.silent_run = 0 if voiced else self.silent_run + 1
+        if self.silent_run >= self.trailing_frames or len(self.frames) >= self.max_frames:
+            self.done = True
+        return self.done
+
+    def audio(self):
+        """PCM of the utterance with its pre-roll, empty if no speech was detected"""
+        return b''.join(self.frames) if self.speech_detected else b''
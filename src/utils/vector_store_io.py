@@ -0,0 +1,179 @@
+"""Pickle-free persistence for the FAISS vector store.
+
+The index is written with faiss.write_index and opened memory-mapped, so the
+OS pages it in on demand and several processes share the same pages. Chunk
+texts, metadata and the FAISS position -> chunk ID mapping live in SQLite and
+are read lazily, one row per hit, instead of unpickling the whole docstore.
+
+Every build goes to its own version directory and is published by atomically
+replacing the pointer file, so running assistants never see a half-written
+index and can switch to the new one between turns:
+
+    index_version                 name of the published version
+    versions/<version>/
+        index.faiss               FAISS index
+        docstore.sqlite           chunks(position, id, content, metadata) and the
+                                  BM25 keyword index over them (see keyword_index.py)
+        manifest.json             file and chunk hashes for incremental updates
+"""
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Mapping
+import faiss
+from langchain_community.docstore.base import Docstore
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain.schema import Document
+from . import keyword_index
+from .index_factory import configure_index
+
+INDEX_FILE = "index.faiss"
+DOCSTORE_FILE = "docstore.sqlite"
+MANIFEST_FILE = "manifest.json"
+
+# Flat and SQ8 codes are mapped straight from the file. IVF inverted lists are
+# still read into RAM (FAISS only maps its own on-disk list format), but they
+# are the compressed part of the index.
+MMAP_FLAGS = faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY
+
+
+class SQLiteDocstore(Docstore):
+    """Read-only docstore that fetches chunks from docstore.sqlite by ID"""
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+
+    def _fetch_one(self, query, value):
+        with self._lock:
+            return self._connection.execute(query, (value,)).fetchone()
+
+    def search(self, search):
+        row = self._fetch_one("SELECT content, metadata FROM chunks WHERE id = ?", search)
+        if row is None:
+            return f"ID {search} not found."
+        return Document(id=search, page_content=row[0], metadata=json.loads(row[1]))
+
+    def position_to_id(self, position):
+        row = self._fetch_one("SELECT id FROM chunks WHERE position = ?", position)
+        if row is None:
+            raise KeyError(position)
+        return row[0]
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def documents(self):
+        """All (id, Document) pairs in FAISS position order"""
+        with self._lock:
+            rows = self._connection.execute("SELECT id, content, metadata FROM chunks ORDER BY position").fetchall()
+        return [(doc_id, Document(id=doc_id, page_content=content, metadata=json.loads(metadata)))
+                for doc_id, content, metadata in rows]
+
+    def close(self):
+        self._connection.close()
+
+
+class PositionMap(Mapping):
+    """index_to_docstore_id backed by the docstore, so nothing is loaded up front"""
+
+    def __init__(self, docstore):
+        self.docstore = docstore
+
+    def __getitem__(self, position):
+        return self.docstore.position_to_id(int(position))
+
+    def __iter__(self):
+        return iter(range(len(self.docstore)))
+
+    def __len__(self):
+        return len(self.docstore)
+
+
+def exists(path):
+    return (path / INDEX_FILE).exists() and (path / DOCSTORE_FILE).exists()
+
+
+def new_version():
+    """Version names sort in build order"""
+    return f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}"
+
+
+def read_version(pointer):
+    """Published version named by the pointer file, empty if none was published"""
+    try:
+        return pointer.read_text(encoding='utf-8').strip()
+    except FileNotFoundError:
+        return ""
+
+
+def publish(pointer, version):
+    """Point readers at version; the rename is atomic, so they see the old or the new name"""
+    tmp = pointer.with_name(f"{pointer.name}.tmp")
+    tmp.write_text(version, encoding='utf-8')
+    os.replace(tmp, pointer)
+
+
+def prune(versions_dir, keep, current):
+    """Delete all but the newest keep versions, never the current one.
+
+    Processes still reading an older version keep their open files on POSIX;
+    where the files are locked (Windows) the directory is left for next time.
+    """
+    versions = sorted(path for path in versions_dir.iterdir() if path.is_dir())
+    for path in versions[:-keep] if keep else versions:
+        if path.name != current:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def save(vector_store, path):
+    """Write the index and the docstore to a new version directory"""
+    path.mkdir(parents=True, exist_ok=True)
+    faiss.write_index(vector_store.index, str(path / INDEX_FILE))
+
+    connection = sqlite3.connect(str(path / DOCSTORE_FILE))
+    try:
+        connection.execute(
+            "CREATE TABLE chunks (position INTEGER PRIMARY KEY, id TEXT NOT NULL UNIQUE, "
+            "content TEXT NOT NULL, metadata TEXT NOT NULL)"
+        )
+        rows = []
+        for position, doc_id in sorted(vector_store.index_to_docstore_id.items()):
+            doc = vector_store.docstore.search(doc_id)
+            rows.append((position, doc_id, doc.page_content, json.dumps(doc.metadata, ensure_ascii=False)))
+        connection.executemany("INSERT INTO chunks VALUES (?, ?, ?, ?)", rows)
+        keyword_index.create(connection)
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def load(path, embeddings, mmap=True):
+    """Open a saved store.
+
+    With mmap (serving), the index is memory-mapped read-only and chunks are
+    fetched from SQLite on demand. Without it (re-indexing), the index and the
+    docstore are loaded in memory so chunks can be added and deleted.
+    """
+    docstore = SQLiteDocstore(path / DOCSTORE_FILE)
+    if mmap:
+        index = faiss.read_index(str(path / INDEX_FILE), MMAP_FLAGS)
+        index_to_docstore_id = PositionMap(docstore)
+    else:
+        index = faiss.read_index(str(path / INDEX_FILE))
+        documents = docstore.documents()
+        docstore.close()
+        index_to_docstore_id = {position: doc_id for position, (doc_id, _) in enumerate(documents)}
+        docstore = InMemoryDocstore(dict(documents))
+    return FAISS(
+        embedding_function=embeddings,
+        index=configure_index(index),
+        docstore=docstore,
+        index_to_docstore_id=index_to_docstore_id
+    )
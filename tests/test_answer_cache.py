@@ -0,0 +1,103 @@
+import threading
+import numpy as np
+from src.handlers.langchain_handler import LangChainHandler
+from src.utils.answer_cache import SemanticCache
+
+RESPONSE = {"answer": "We open at 9am.", "sources": ["data/odc_knowledge_base.json"]}
+
+
+def test_hit_on_similar_question_same_language():
+    cache = SemanticCache(threshold=0.9)
+    cache.put("opening hours", [1.0, 0.0, 0.0], "en", RESPONSE)
+    assert cache.get([0.99, 0.05, 0.0], "en") == RESPONSE
+    assert cache.get([0.99, 0.05, 0.0], "fr") is None
+    assert cache.get([0.0, 1.0, 0.0], "en") is None
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 2
+
+
+def test_lru_eviction_and_ttl():
+    cache = SemanticCache(max_size=2, threshold=0.9)
+    cache.put("a", [1.0, 0.0, 0.0], "en", RESPONSE)
+    cache.put("b", [0.0, 1.0, 0.0], "en", RESPONSE)
+    cache.get([1.0, 0.0, 0.0], "en")  # "a" is now most recently used
+    cache.put("c", [0.0, 0.0, 1.0], "en", RESPONSE)
+    assert cache.get([0.0, 1.0, 0.0], "en") is None
+    assert cache.get([1.0, 0.0, 0.0], "en") == RESPONSE
+
+    cache.ttl = -1
+    assert cache.get([1.0, 0.0, 0.0], "en") is None
+
+
+def test_new_index_version_invalidates():
+    version = ["v1"]
+    cache = SemanticCache(threshold=0.9, version_fn=lambda: version[0])
+    cache.put("a", [1.0, 0.0], "en", RESPONSE)
+    version[0] = "v2"
+    assert cache.get([1.0, 0.0], "en") is None
+    assert len(cache) == 0 and cache.stats["invalidations"] == 1
+
+
+class FakeMemory:
+    def __init__(self):
+        self.turns = []
+
+    def save_context(self, inputs, outputs):
+        self.turns.append((inputs["question"], outputs["answer"]))
+
+
+def make_handler(cache):
+    handler = LangChainHandler.__new__(LangChainHandler)
+    handler.answer_cache = cache
+    handler.selected_language = "en"
+    handler.memory = FakeMemory()
+    handler.embed_question = lambda question: [1.0, 0.0, 0.0]
+    return handler
+
+
+def test_follow_up_misses_the_cache():
+    cache = SemanticCache(threshold=0.9)
+    handler = make_handler(cache)
+    handler.store_in_cache("What are the opening hours?", [1.0, 0.0, 0.0], RESPONSE)
+    handler.store_in_cache("How much does it cost?", [1.0, 0.0, 0.0], {"answer": "It is free.", "sources": []})
+    assert len(cache) == 1  # Follow-ups are never stored
+
+    vector, cached = handler.lookup_cache("And the second one?")
+    assert vector == [1.0, 0.0, 0.0] and cached is None
+    assert handler.memory.turns == []
+
+    _, cached = handler.lookup_cache("What are your opening hours?")
+    assert cached == RESPONSE
+    assert handler.memory.turns == [("What are your opening hours?", RESPONSE["answer"])]
+
+
+def test_standalone_first_questions_are_cached():
+    cache = SemanticCache(threshold=0.9)
+    handler = make_handler(cache)
+    for question, language in [("Are there any upcoming events?", "en"), ("Y a-t-il des ateliers ?", "fr")]:
+        handler.selected_language = language
+        handler.store_in_cache(question, [1.0, 0.0, 0.0], RESPONSE)
+        _, cached = handler.lookup_cache(question)
+        assert cached == RESPONSE
+    assert len(cache) == 2
+
+
+def test_shared_between_threads():
+    cache = SemanticCache(max_size=8, threshold=0.9)
+    errors = []
+
+    def worker(offset):
+        rng = np.random.default_rng(offset)
+        try:
+            for i in range(300):
+                vector = rng.random(16)
+                cache.put(f"{offset}-{i}", vector, "en", RESPONSE)
+                cache.get(vector, "en")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == [] and len(cache) == 8
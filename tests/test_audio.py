@@ -0,0 +1,21 @@
+import io
+import wave
+import numpy as np
+from src.utils.audio import duration, is_wav, to_array, to_pcm, to_wav
+
+SAMPLES = (1000 * np.sin(np.arange(1600) / 10)).astype(np.int16)
+
+
+def test_wav_round_trip_in_memory():
+    wav = to_wav(SAMPLES)
+    assert is_wav(wav) and not is_wav(SAMPLES.tobytes())
+    with wave.open(io.BytesIO(wav), 'rb') as wf:
+        assert (wf.getnchannels(), wf.getsampwidth(), wf.getframerate()) == (1, 2, 16000)
+    assert np.array_equal(to_array(wav), SAMPLES)
+    assert to_wav(wav) == wav
+
+
+def test_buffer_types_are_interchangeable():
+    pcm = SAMPLES.tobytes()
+    assert to_pcm(SAMPLES) == to_pcm(pcm) == to_pcm(to_wav(pcm)) == pcm
+    assert duration(pcm) == duration(to_wav(pcm)) == 0.1
@@ -0,0 +1,57 @@
+import threading
+import time
+from src.utils.audio_capture import AudioCaptureService
+from src.utils.vad import EnergyVAD
+from tests.test_vad import frames, noise, tone
+
+
+class FakeStream:
+    """Plays queued frames in real time, then background noise"""
+
+    def __init__(self):
+        self.pending = []
+        self.lock = threading.Lock()
+        self.background = frames(noise(30, seed=3))[0]
+        self.stopped = False
+
+    def play(self, audio):
+        with self.lock:
+            self.pending.extend(frames(audio))
+
+    def read(self, size, exception_on_overflow=True):
+        time.sleep(0.001)
+        with self.lock:
+            return self.pending.pop(0) if self.pending else self.background
+
+    def stop_stream(self):
+        self.stopped = True
+
+    def close(self):
+        pass
+
+
+def test_stream_stays_open_across_utterances():
+    stream = FakeStream()
+    opened = []
+    service = AudioCaptureService(EnergyVAD(margin_db=12), open_stream=lambda: opened.append(1) or stream)
+    with service:
+        time.sleep(0.05)  # Idle frames set the noise floor before the first turn
+        for _ in range(2):
+            # The speaker starts right away: no recalibration delay
+            threading.Timer(0.01, stream.play, [tone(300) + noise(1000, seed=1)]).start()
+            audio = service.listen(timeout=5)
+            assert audio is not None and tone(300)[:2000] in audio
+        assert service.stats["utterances"] == 2
+        assert service.stats["listen_setup_ms"] < 100
+    assert opened == [1] and stream.stopped
+
+
+def test_audio_between_turns_is_dropped():
+    stream = FakeStream()
+    with AudioCaptureService(EnergyVAD(margin_db=12), open_stream=lambda: stream) as service:
+        stream.play(noise(150) + tone(300))  # e.g. the assistant speaking
+        while stream.pending:
+            time.sleep(0.005)
+        assert service.utterances.empty()
+        assert service.listen(timeout=0.2) is None
+        assert service.stats["no_speech"] == 1
@@ -0,0 +1,75 @@
+import asyncio
+from langchain_community.vectorstores import FAISS
+from src.handlers.langchain_handler import LangChainHandler
+from tests.test_incremental_index import CountingEmbeddings
+
+TEXTS = ["The FabLab opens at nine.", "Arduino workshop on Monday.", "The Coding School is free."]
+
+
+class FakeChain:
+    """ainvoke answers with a function of its input, after a delay that reverses the finishing order"""
+
+    def __init__(self, respond):
+        self.respond = respond
+
+    async def ainvoke(self, inputs):
+        await asyncio.sleep(0.05 / (1 + len(inputs["question"])))
+        return self.respond(inputs)
+
+
+def classify(inputs):
+    if "fail" in inputs["question"]:
+        raise RuntimeError("classifier down")
+    return {"text": "RAG_RELEVANT" if "FabLab" in inputs["question"] else "GENERAL_KNOWLEDGE"}
+
+
+def make_handler():
+    embeddings = CountingEmbeddings()
+    handler = LangChainHandler.__new__(LangChainHandler)
+    handler.vector_store = FAISS.from_texts(TEXTS, embeddings, metadatas=[{"source": "kb.json"}] * len(TEXTS))
+    handler.selected_language = "en"
+    handler.router = handler.inventory = None
+    handler._llm_semaphore = handler._llm_semaphore_loop = None
+    handler.refresh_index = lambda: None
+    handler.classification_chain = FakeChain(classify)
+    handler.general_chain = FakeChain(lambda inputs: {"text": f"general: {inputs['question']}"})
+    handler.chain = type("Chain", (), {})()
+    handler.chain.combine_docs_chain = FakeChain(
+        lambda inputs: {"output_text": f"{inputs['language']}: {inputs['input_documents'][0].page_content}"})
+    return handler, embeddings
+
+
+def test_results_in_input_order_with_batch_timings():
+    handler, embeddings = make_handler()
+    questions = ["When does the FabLab open?", "Tell me a joke", "Is the FabLab open at nine?"]
+    results = handler.get_responses(questions, language="fr")
+
+    assert [result["question"] for result in results] == questions
+    assert [result["classification"] for result in results] == ["RAG_RELEVANT", "GENERAL_KNOWLEDGE", "RAG_RELEVANT"]
+    assert results[0]["answer"].startswith("fr: ") and set(results[0]["sources"]) == {"kb.json"}
+    assert results[1] == {**results[1], "answer": "general: Tell me a joke", "sources": []}
+    # One embedding call and one search for the whole batch, timed once
+    assert embeddings.embedded == len(TEXTS) + len(questions)
+    assert len({(result["timings"]["embed_batch"], result["timings"]["search_batch"]) for result in results}) == 1
+    assert all(result["timings"]["search_batch"] >= 0 and result["timings"]["total"] > 0 for result in results)
+
+
+def test_failed_item_becomes_an_error_in_the_batch_language():
+    handler, _ = make_handler()
+    results = asyncio.run(handler.aget_responses(["When does the FabLab open?", "please fail"], language="fr"))
+    assert results[0]["classification"] == "RAG_RELEVANT"
+    failed = results[1]
+    assert failed["question"] == "please fail" and failed["classification"] is None
+    assert failed["error"] == "classifier down"
+    assert failed["answer"] == "Désolé, j'ai rencontré une erreur." and failed["sources"] == []
+    assert set(failed["timings"]) == {"embed_batch", "search_batch"}
+
+
+def test_batch_search_matches_single_searches():
+    handler, embeddings = make_handler()
+    questions = ["Arduino workshop", "Coding School", "FabLab opens"]
+    vectors = embeddings.embed_documents(questions)
+    for (docs, top_distance), vector, expected in zip(handler.batch_search(vectors, 2), vectors, TEXTS[1:] + TEXTS[:1]):
+        assert docs[0].page_content == expected
+        assert top_distance == handler.vector_store.similarity_search_with_score_by_vector(vector, 1)[0][1]
+    assert handler.get_responses([]) == []
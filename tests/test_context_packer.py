@@ -0,0 +1,53 @@
+from langchain.schema import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from src.config import CHUNK_OVERLAP, CHUNK_SIZE, DATA_DIR
+from src.utils.context_packer import pack_documents
+from src.utils.document_processor import JSONLoader
+from src.utils.tokens import estimate_tokens
+
+TEXT = " ".join(f"Sentence number {i} about the FabLab equipment and trainings." for i in range(12))
+
+
+def split(**kwargs):
+    splitter = RecursiveCharacterTextSplitter(chunk_size=200, chunk_overlap=60, **kwargs)
+    return splitter.split_documents([Document(page_content=TEXT, metadata={"source": "kb.json"})])
+
+
+def test_merges_overlapping_chunks_by_text_and_start_index():
+    for chunks in (split(), split(add_start_index=True)):
+        packed = pack_documents(chunks[:3], token_budget=1000)
+        assert len(packed) == 1
+        assert packed[0].page_content == TEXT[:len(packed[0].page_content)]
+
+
+def test_drops_duplicates_and_respects_budget():
+    chunks = split()
+    docs = [chunks[0], chunks[0], Document(page_content="Other source text.", metadata={"source": "x"})]
+    packed = pack_documents(docs, token_budget=estimate_tokens(chunks[0].page_content))
+    assert [doc.page_content for doc in packed] == [chunks[0].page_content]
+
+
+def test_separated_chunks_are_not_glued():
+    first = Document(page_content="The FabLab opens at nine", metadata={"source": "kb.json", "start_index": 0})
+    second = Document(page_content="Trainings start at ten", metadata={"source": "kb.json", "start_index": 25})
+    packed = pack_documents([first, second], token_budget=1000)
+    assert [doc.page_content for doc in packed] == [first.page_content, second.page_content]
+
+
+def test_top_group_over_budget_is_truncated():
+    chunks = split(add_start_index=True)
+    packed = pack_documents(chunks[:3], token_budget=20)
+    assert len(packed) == 1
+    assert estimate_tokens(packed[0].page_content) <= 20
+    assert chunks[0].page_content.startswith(packed[0].page_content)
+
+
+def test_items_of_one_file_are_not_merged():
+    splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP, add_start_index=True)
+    for name in ("materials_detailed.json", "odc_knowledge_base.json"):
+        docs = JSONLoader(DATA_DIR / name).load()
+        chunks = splitter.split_documents(docs)
+        packed = pack_documents(chunks[:10], token_budget=10000)
+        # Every packed text is a span of a single loaded item
+        assert all(any(doc.page_content in item.page_content for item in docs) for doc in packed)
+        assert len(packed) > 1
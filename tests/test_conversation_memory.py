@@ -0,0 +1,28 @@
+from src.utils.conversation_memory import TokenBudgetMemory
+
+
+def make_memory(**kwargs):
+    return TokenBudgetMemory(memory_key="chat_history", output_key="answer", return_messages=True,
+                             input_key="question", **kwargs)
+
+
+def test_history_stays_under_budget():
+    memory = make_memory(max_token_limit=60, summary_token_limit=30)
+    for i in range(10):
+        memory.save_context({"question": f"Question {i} about the FabLab printers?"},
+                            {"answer": f"Answer {i}. We have two printers available for members."})
+    assert len(memory.chat_memory.messages) == 2
+    assert memory.history_tokens() <= 60 + 30
+    assert len(memory.turn_token_counts) == 10
+    assert "Question 9" not in memory.summary and "Question 8" in memory.summary
+
+
+def test_summary_is_sent_first_and_cleared():
+    memory = make_memory(max_token_limit=10)
+    memory.save_context({"question": "What is the Coding School?"}, {"answer": "A free training center."})
+    memory.save_context({"question": "Is it free?"}, {"answer": "Yes."})
+    messages = memory.load_memory_variables({})["chat_history"]
+    assert messages[0].type == "system" and "Coding School" in messages[0].content
+    memory.clear()
+    assert memory.load_memory_variables({})["chat_history"] == []
+    assert memory.turn_token_counts == []
@@ -0,0 +1,60 @@
+from langchain_core.embeddings import Embeddings
+from src.utils.embedding_cache import CachedEmbeddings
+
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        self.calls.append([text])
+        return [float(len(text)), 2.0]
+
+
+def test_documents_are_embedded_once_across_instances(tmp_path):
+    inner = CountingEmbeddings()
+    cache = CachedEmbeddings(inner, "mini", tmp_path / "cache.sqlite")
+    assert cache.embed_documents(["ESP32", "Arduino  Nano", "ESP32"]) == [[5.0, 1.0], [13.0, 1.0], [5.0, 1.0]]
+    assert inner.calls == [["ESP32", "Arduino  Nano"]]
+
+    reopened = CachedEmbeddings(inner, "mini", tmp_path / "cache.sqlite")
+    assert reopened.embed_documents(["Arduino Nano", "ESP32"]) == [[13.0, 1.0], [5.0, 1.0]]
+    assert len(inner.calls) == 1
+    assert reopened.hit_rates()["document"] == 1.0
+
+    other_model = CachedEmbeddings(inner, "other", tmp_path / "cache.sqlite")
+    other_model.embed_documents(["ESP32"])
+    assert len(inner.calls) == 2
+
+
+def test_queries_and_eviction(tmp_path):
+    inner = CountingEmbeddings()
+    cache = CachedEmbeddings(inner, "mini", tmp_path / "cache.sqlite", max_entries=2)
+    assert cache.embed_query("hours") == [5.0, 2.0]
+    assert cache.embed_query("hours") == [5.0, 2.0]
+    assert cache.stats["query_hits"] == 1 and cache.stats["query_misses"] == 1
+
+    cache.embed_documents(["a", "b", "c"])
+    count = cache._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+    assert count == 2
+
+
+def test_hits_do_not_write_until_the_next_store(tmp_path):
+    inner = CountingEmbeddings()
+    cache = CachedEmbeddings(inner, "mini", tmp_path / "cache.sqlite", max_entries=2)
+    cache.embed_query("hours")
+    cache.embed_query("price")
+    changes = cache._connection.total_changes
+    for _ in range(5):
+        cache.embed_query("hours")
+    assert cache._connection.total_changes == changes and not cache._connection.in_transaction
+
+    cache.embed_query("events")  # The pending hit on "hours" is written first, "price" is evicted
+    assert cache.embed_query("hours") == [5.0, 2.0]
+    assert len(inner.calls) == 3
+    cache.flush()
+    assert cache._touched == {}
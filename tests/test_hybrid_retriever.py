@@ -0,0 +1,53 @@
+from langchain.schema import Document
+from langchain_community.vectorstores import FAISS
+from src.utils import vector_store_io
+from src.utils.hybrid_retriever import HybridRetriever, reciprocal_rank_fusion
+from src.utils.keyword_index import KeywordIndex, match_expression
+from tests.test_incremental_index import CountingEmbeddings
+
+ITEMS = [
+    ("ESP32 Development Board: 2.4GHz WiFi+Bluetooth.", {"name": "ESP32 Development Board",
+                                                        "keywords": ["esp32", "wifi", "microcontroller"]}),
+    ("Creality Ender 3 V2: 3D printer.", {"name": "Creality Ender 3 V2", "keywords": ["3d printer", "ender"]}),
+    ("The FabLab opens at nine.", {"name": "Opening hours", "keywords": ["hours", "horaires"]}),
+]
+
+
+def doc(name):
+    return Document(id=name, page_content=name)
+
+
+def test_rrf_favours_documents_ranked_by_both_lists():
+    fused = reciprocal_rank_fusion([[doc("a"), doc("b"), doc("c")], [doc("b"), doc("d"), doc("c")]])
+    assert [d.id for d in fused] == ["b", "c", "a", "d"]
+    assert len(reciprocal_rank_fusion([[doc("a"), doc("b")], [doc("c")]], limit=2)) == 2
+
+
+def test_match_expression_quotes_words():
+    assert match_expression('Do you have "ESP32"? (wifi)') == '"do" OR "you" OR "have" OR "esp32" OR "wifi"'
+    assert match_expression("?!") == ""
+
+
+def build(tmp_path):
+    embeddings = CountingEmbeddings()
+    store = FAISS.from_texts([text for text, _ in ITEMS], embeddings,
+                             metadatas=[metadata for _, metadata in ITEMS], ids=["esp32", "ender", "hours"])
+    vector_store_io.save(store, tmp_path)
+    return store, KeywordIndex.open(tmp_path / vector_store_io.DOCSTORE_FILE)
+
+
+def test_keyword_index_matches_part_names_and_keywords(tmp_path):
+    _, index = build(tmp_path)
+    assert index.search("Do you have an esp32?", k=1)[0][0].id == "esp32"
+    assert index.search("ENDER 3", k=1)[0][0].id == "ender"
+    assert index.search("horaires", k=1)[0][0].id == "hours"
+    assert index.search("nothing matches this", k=3) == []
+
+
+def test_hybrid_retriever_returns_keyword_hits_missed_by_dense(tmp_path):
+    store, index = build(tmp_path)
+    retriever = HybridRetriever(dense_retriever=store.as_retriever(search_kwargs={"k": 1}),
+                                keyword_index=index, fetch_k=3)
+    ids = [d.id for d in retriever.invoke("Ender")]
+    assert "ender" in ids
+    assert KeywordIndex.open(tmp_path / "missing.sqlite") is None
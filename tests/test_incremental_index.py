@@ -0,0 +1,189 @@
+import hashlib
+import json
+import time
+import sqlite3
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from src.utils import model_registry
+from src.utils.document_processor import DocumentProcessor
+
+
+class CountingEmbeddings(Embeddings):
+    """Deterministic embeddings that count how many texts were embedded"""
+
+    def __init__(self):
+        self.embedded = 0
+
+    def _embed(self, text):
+        vector = np.zeros(32, dtype=np.float32)
+        for word in text.lower().split():
+            vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % 32] += 1.0
+        return (vector / (np.linalg.norm(vector) or 1.0)).tolist()
+
+    def embed_documents(self, texts):
+        self.embedded += len(texts)
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+def make_processor(tmp_path, monkeypatch):
+    data_dir, store_dir = tmp_path / "data", tmp_path / "vectorstore"
+    data_dir.mkdir()
+    store_dir.mkdir()
+    embeddings = CountingEmbeddings()
+    monkeypatch.setattr(model_registry, "_embeddings", embeddings)
+    monkeypatch.setattr(model_registry, "_vector_store", None)
+    monkeypatch.setattr(model_registry, "_vector_store_version", None)
+    monkeypatch.setattr(model_registry, "_keyword_index", None)
+    monkeypatch.setattr(model_registry, "_retired", None)
+    monkeypatch.setattr(model_registry, "INDEX_VERSION_FILE", store_dir / "index_version")
+    monkeypatch.setattr(model_registry, "INDEX_VERSIONS_DIR", store_dir / "versions")
+    monkeypatch.setattr("src.utils.document_processor.INDEX_VERSION_FILE", store_dir / "index_version")
+    processor = DocumentProcessor()
+    processor.data_dir = data_dir
+    processor.version_file = store_dir / "index_version"
+    processor.versions_dir = store_dir / "versions"
+    return processor, embeddings, data_dir
+
+
+def write(path, message):
+    path.write_text(json.dumps({"message": message}), encoding="utf-8")
+
+
+def test_only_changed_chunks_are_embedded(tmp_path, monkeypatch):
+    processor, embeddings, data_dir = make_processor(tmp_path, monkeypatch)
+    write(data_dir / "kb.json", "The FabLab opens at nine.")
+    write(data_dir / "events.json", "Arduino workshop on Monday.")
+
+    store = processor.process_documents()
+    assert embeddings.embedded == 2 and len(store.docstore._dict) == 2
+
+    write(data_dir / "events.json", "Robotics bootcamp on Friday.")
+    store = processor.process_documents()
+    assert embeddings.embedded == 3
+    contents = sorted(doc.page_content for doc in store.docstore._dict.values())
+    assert contents == ["Robotics bootcamp on Friday.", "The FabLab opens at nine."]
+
+    (data_dir / "events.json").unlink()
+    store = processor.process_documents()
+    assert embeddings.embedded == 3
+    assert [doc.page_content for doc in store.docstore._dict.values()] == ["The FabLab opens at nine."]
+    assert store.index.ntotal == 1
+
+
+def test_rebuild_ignores_manifest(tmp_path, monkeypatch):
+    processor, embeddings, data_dir = make_processor(tmp_path, monkeypatch)
+    write(data_dir / "kb.json", "The FabLab opens at nine.")
+    processor.process_documents()
+    processor.process_documents()
+    assert embeddings.embedded == 1
+    processor.process_documents(rebuild=True)
+    assert embeddings.embedded == 2
+
+
+def test_ivf_index_is_rebuilt_on_delete(tmp_path, monkeypatch):
+    processor, embeddings, data_dir = make_processor(tmp_path, monkeypatch)
+    processor.index_type = "ivf_flat"
+    write(data_dir / "kb.json", "The FabLab opens at nine.")
+    write(data_dir / "events.json", "Arduino workshop on Monday.")
+    processor.process_documents()
+
+    write(data_dir / "events.json", "Robotics bootcamp on Friday.")
+    store = processor.process_documents()
+    assert store.index.ntotal == 2
+    assert sorted(store.index_to_docstore_id) == [0, 1]
+    best = store.similarity_search("Robotics bootcamp on Friday.", k=1)[0]
+    assert best.page_content == "Robotics bootcamp on Friday."
+
+
+def test_each_build_is_published_as_a_new_version(tmp_path, monkeypatch):
+    processor, _, data_dir = make_processor(tmp_path, monkeypatch)
+    monkeypatch.setattr("src.utils.document_processor.INDEX_KEEP_VERSIONS", 2)
+    versions = []
+    for message in ("First.", "Second.", "Third."):
+        write(data_dir / "kb.json", message)
+        processor.process_documents()
+        versions.append(DocumentProcessor.index_version())
+
+    assert len(set(versions)) == 3
+    assert model_registry.vector_store_version() == versions[-1]
+    # The oldest version is pruned, the previous one stays for readers still on it
+    assert sorted(path.name for path in processor.versions_dir.iterdir()) == versions[1:]
+    processor.process_documents()
+    assert DocumentProcessor.index_version() == versions[-1]  # Nothing changed, nothing published
+
+
+def test_registry_switches_to_published_version_in_background(tmp_path, monkeypatch):
+    processor, _, data_dir = make_processor(tmp_path, monkeypatch)
+    write(data_dir / "kb.json", "The FabLab opens at nine.")
+    processor.process_documents()
+    model_registry.set_vector_store(None, None)
+    old_store = model_registry.published_vector_store()
+    old_version = model_registry.vector_store_version()
+
+    # Another process publishes a new version
+    write(data_dir / "kb.json", "The FabLab opens at ten.")
+    processor.process_documents()
+    model_registry.set_vector_store(old_store, old_version)
+
+    assert model_registry.published_vector_store() is old_store  # Never waits for the load
+    deadline = time.time() + 5
+    while model_registry.published_vector_store() is old_store and time.time() < deadline:
+        time.sleep(0.01)
+    new_store = model_registry.published_vector_store()
+    assert model_registry.vector_store_version() == DocumentProcessor.index_version()
+    assert new_store.similarity_search("opens", k=1)[0].page_content == "The FabLab opens at ten."
+
+
+def test_replaced_index_is_closed_on_the_next_swap(tmp_path, monkeypatch):
+    processor, _, data_dir = make_processor(tmp_path, monkeypatch)
+    write(data_dir / "kb.json", "The FabLab opens at nine.")
+    processor.process_documents()
+    model_registry.set_vector_store(None, None)
+    old_store = model_registry.get_vector_store()
+    old_keywords = model_registry.get_keyword_index()
+
+    write(data_dir / "kb.json", "The FabLab opens at ten.")
+    processor.process_documents()
+    # A session still on the old index can finish its turn
+    assert old_store.similarity_search("opens", k=1)[0].page_content == "The FabLab opens at nine."
+    assert old_keywords.search("opens", 1)
+
+    write(data_dir / "kb.json", "The FabLab opens at eleven.")
+    processor.process_documents()
+    for read in (lambda: len(old_store.docstore), lambda: old_keywords.search("opens", 1)):
+        with pytest.raises(sqlite3.ProgrammingError):
+            read()
+
+
+def test_moved_chunk_gets_a_new_id():
+    chunk = Document(page_content="Arduino workshop on Monday.", metadata={"source": "events.json", "start_index": 0})
+    moved = Document(page_content=chunk.page_content, metadata={"source": "events.json", "start_index": 40})
+    assert DocumentProcessor.chunk_ids([chunk]) == DocumentProcessor.chunk_ids([chunk])
+    assert DocumentProcessor.chunk_ids([chunk]) != DocumentProcessor.chunk_ids([moved])
+
+
+def test_metadata_only_edit_is_stored(tmp_path, monkeypatch):
+    processor, _, data_dir = make_processor(tmp_path, monkeypatch)
+    materials = {"fablab_materials": {"tools": [{"name": "Cutter", "keywords": ["blade"]}]}}
+    path = data_dir / "materials.json"
+    path.write_text(json.dumps(materials), encoding="utf-8")
+    processor.process_documents()
+
+    materials["fablab_materials"]["tools"][0]["keywords"] = ["knife"]
+    path.write_text(json.dumps(materials), encoding="utf-8")
+    store = processor.process_documents()
+    keywords = [doc.metadata["keywords"] for doc in store.docstore._dict.values() if doc.metadata["name"] == "Cutter"]
+    assert keywords == [["knife"]]
+    manifest = processor.load_manifest(processor.current_index_path())
+    assert manifest["files"]["materials.json"]["hash"] == DocumentProcessor.file_hash(path)
+
+    # Reformatting the file changes its hash but no chunk
+    path.write_text(json.dumps(materials, indent=2), encoding="utf-8")
+    processor.process_documents()
+    manifest = processor.load_manifest(processor.current_index_path())
+    assert manifest["files"]["materials.json"]["hash"] == DocumentProcessor.file_hash(path)
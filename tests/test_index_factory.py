@@ -0,0 +1,36 @@
+import numpy as np
+from src.utils.index_factory import build_index, compare_index_types, factory_string, supports_sequential_remove
+
+
+def test_factory_string_scales_to_corpus():
+    assert factory_string("flat", 100, 384) == "Flat"
+    assert factory_string("ivf_flat", 100, 384) == "IVF2,Flat"
+    assert factory_string("ivf_flat", 100000, 384) == "IVF64,Flat"
+    assert factory_string("ivf_pq", 100, 384) == "IVF2,PQ48x4"
+    assert factory_string("ivf_pq", 100, 32) == "IVF2,PQ8x4"
+    assert factory_string("ivf_pq", 10, 384) == "Flat"
+
+
+def test_ivf_pq_builds_on_small_corpora():
+    rng = np.random.default_rng(0)
+    for count in (1, 15, 16):
+        vectors = rng.standard_normal((count, 32)).astype(np.float32)
+        index = build_index(vectors, "ivf_pq")
+        index.add(vectors)
+        assert index.ntotal == count
+        assert index.search(vectors[:1], 1)[1][0][0] != -1
+
+
+def test_only_ivf_needs_rebuild_on_remove():
+    vectors = np.random.default_rng(0).standard_normal((200, 16)).astype(np.float32)
+    assert supports_sequential_remove(build_index(vectors, "flat"))
+    assert supports_sequential_remove(build_index(vectors, "sq8"))
+    assert not supports_sequential_remove(build_index(vectors, "ivf_flat"))
+
+
+def test_compare_index_types_reports_exact_recall_for_flat():
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((200, 16)).astype(np.float32)
+    report = compare_index_types(vectors, vectors[:10], k=5, index_types=("flat", "sq8"))
+    assert report["flat"]["recall@5"] == 1.0
+    assert report["sq8"]["size_bytes"] < report["flat"]["size_bytes"]
@@ -0,0 +1,49 @@
+import hashlib
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_community.vectorstores import FAISS
+from src.handlers.intent_router import IntentRouter, RAG_RELEVANT, GENERAL_KNOWLEDGE
+
+
+class BagOfWordsEmbeddings(Embeddings):
+    """Tiny deterministic embeddings so the router can be tested without MiniLM"""
+
+    def _embed(self, text):
+        vector = np.zeros(64, dtype=np.float32)
+        for word in text.lower().replace("?", " ").split():
+            vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % 64] += 1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts):
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+EXEMPLARS = {
+    RAG_RELEVANT: ["does the fablab have a 3d printer", "fablab materials and trainings"],
+    GENERAL_KNOWLEDGE: ["what is the capital of france", "tell me a joke"],
+}
+
+
+def build_router():
+    store = FAISS.from_texts(["the fablab has a 3d printer and laser cutter"], BagOfWordsEmbeddings())
+    return IntentRouter(store, exemplars=EXEMPLARS)
+
+
+def test_routes_clear_questions_locally():
+    router = build_router()
+    assert router.route("does the fablab have a 3d printer")["label"] == RAG_RELEVANT
+    assert router.route("what is the capital of france")["label"] == GENERAL_KNOWLEDGE
+    assert router.fallback_rate() == 0.0
+
+
+def test_ambiguous_questions_fall_back(monkeypatch):
+    monkeypatch.setattr("src.handlers.intent_router.ROUTER_HIT_WEIGHT", 0.0)
+    router = build_router()
+    route = router.route("zzz")
+    assert route["label"] is None
+    assert router.stats == {"total": 1, "local": 0, "fallback": 1}
+    assert router.fallback_rate() == 1.0
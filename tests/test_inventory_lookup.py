@@ -0,0 +1,74 @@
+from src.config import INVENTORY_FILE
+from src.handlers.inventory_lookup import InventoryLookup, normalize
+
+MATERIALS = {
+    "microcontrollers": [
+        {"name": "Arduino Nano", "details": "with cable", "keywords": ["arduino", "nano", "microcontroller"]},
+        {"name": "Arduino Uno", "keywords": ["arduino", "uno", "microcontroller"]},
+        {"name": "Raspberry Pi 4", "details": "8GB", "keywords": ["raspberry pi", "4", "microcomputer"]},
+    ],
+    "tools": [
+        {"name": "Cutter", "details": "18*100mm", "keywords": ["cutter", "blade"]},
+    ],
+    "accessories_equipment": [
+        {"name": "Official Case for Raspberry Pi 4 Model B", "keywords": ["case", "raspberry pi 4"]},
+    ],
+}
+
+
+def make_lookup():
+    return InventoryLookup(MATERIALS, source="data/materials_detailed.json")
+
+
+def test_normalize_strips_accents_and_punctuation():
+    assert normalize("Avez-vous des microcontrôleurs ?") == "avez vous des microcontroleurs"
+
+
+def test_availability_by_name_with_typo():
+    lookup = make_lookup()
+    assert lookup.lookup("Do you have an Arduino Nano?")["answer"] == "Yes, the FabLab has Arduino Nano (with cable)."
+    assert lookup.lookup("Is there a raspbery pi 4?")["answer"] == "Yes, the FabLab has Raspberry Pi 4 (8GB)."
+    assert lookup.lookup("واش عندكم Arduino Uno؟", 'ar')["answer"] == "إيه، الفاب لاب عندو Arduino Uno."
+
+
+def test_most_specific_name_wins():
+    answer = make_lookup().lookup("Do you have an official case for Raspberry Pi 4?")["answer"]
+    assert "Official Case" in answer
+
+
+def test_count_by_keyword():
+    result = make_lookup().lookup("Combien d'arduinos avez-vous ?", 'fr')
+    assert result["answer"] == "L'inventaire du FabLab compte 2 arduino : Arduino Nano (with cable), Arduino Uno."
+    assert result["sources"] == ["data/materials_detailed.json"]
+
+
+def test_falls_through_when_unsure():
+    lookup = make_lookup()
+    assert lookup.lookup("What is an Arduino?") is None  # Not an availability question
+    assert lookup.lookup("Do you have trainings on Arduino?") is None
+    assert lookup.lookup("Is there a laser cutter?") is None  # Only part of the question matches
+    assert lookup.lookup("How many 3D printers are there?") is None
+    assert lookup.hit_rate() == 0.0
+
+
+def test_shipped_inventory_groups_partial_names():
+    lookup = InventoryLookup.from_file(INVENTORY_FILE)
+    count = lookup.lookup("How many Raspberry Pi do you have?")["answer"]
+    assert "Raspberry Pi 3B+" in count and "Raspberry Pi 4" in count and "HQ Camera Raspberry Pi" in count
+    assert "Raspberry Pi 4" in lookup.lookup("Do you have any Raspberry Pi?")["answer"]
+    camera = lookup.lookup("Is there a camera?")["answer"]
+    assert "ESP32 Cam" in camera and "Camera Module v2" in camera and "Samsung Gear 360 Camera" in camera
+
+
+def test_shipped_inventory_leaves_facility_questions_to_rag():
+    lookup = InventoryLookup.from_file(INVENTORY_FILE)
+    assert lookup.lookup("Is there wifi?") is None
+    assert lookup.lookup("Y a-t-il une connexion wifi ?", 'fr') is None
+    assert lookup.lookup("Is there a room for meetings?") is None
+    assert lookup.lookup("Do you have an Alpha Wifi Key?")["answer"] == "Yes, the FabLab has Alpha Wifi Key."
+
+
+def test_shipped_inventory_full_name_is_one_item():
+    lookup = InventoryLookup.from_file(INVENTORY_FILE)
+    assert lookup.lookup("Do you have a Raspberry Pi 4?")["answer"] == "Yes, the FabLab has Raspberry Pi 4 (8GB)."
+    assert lookup.lookup("Do you have an ESP32 Cam?")["answer"] == "Yes, the FabLab has ESP32 Cam."
@@ -0,0 +1,48 @@
+import json
+from src.utils.document_processor import JSONLoader
+
+
+def load(tmp_path, data):
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return JSONLoader(path).load()
+
+
+def test_one_document_per_material_plus_category_overview(tmp_path):
+    docs = load(tmp_path, {"fablab_materials": {"microcontrollers": [
+        {"name": "Arduino Nano", "details": "with cable", "keywords": ["arduino", "nano"]},
+        {"name": "ESP32 Cam", "keywords": ["esp32", "camera"]},
+    ]}})
+    assert [doc.page_content for doc in docs] == [
+        "FabLab microcontrollers: Arduino Nano (with cable).",
+        "FabLab microcontrollers: ESP32 Cam.",
+        "FabLab microcontrollers available (2): Arduino Nano, ESP32 Cam.",
+    ]
+    assert docs[0].metadata["category"] == "fablab_materials/microcontrollers"
+    assert docs[0].metadata["keywords"] == ["arduino", "nano"]
+    assert "{" not in "".join(doc.page_content for doc in docs)
+
+
+def test_knowledge_items_become_sections(tmp_path):
+    docs = load(tmp_path, {"knowledge_base": {"odc": {"programs": {"coding_school": {
+        "name": "Coding School",
+        "description": "A free technological center.",
+        "key_highlights": {"employment_rate": "95% of trainees secure jobs."},
+        "keywords": ["coding"],
+    }}}}})
+    assert len(docs) == 1
+    assert docs[0].page_content == ("Coding School. Description: A free technological center. "
+                                    "Key highlights: employment rate: 95% of trainees secure jobs.")
+    assert docs[0].metadata["name"] == "Coding School"
+    assert docs[0].metadata["keywords"] == ["coding"]
+
+
+def test_events_and_messages(tmp_path):
+    docs = load(tmp_path, {"events": [{"title": "Arduino Day", "day": "12", "month": "Mar",
+                                       "start_date": "09:00", "end_date": "17:00", "location": "Agadir"}]})
+    assert docs[0].page_content == "Event: Arduino Day. Date: 12 Mar. Time: 09:00 - 17:00. Location: Agadir."
+    assert docs[0].metadata["category"] == "events"
+
+    docs = load(tmp_path, {"message": "No events right now."})
+    assert [doc.page_content for doc in docs] == ["No events right now."]
+    assert load(tmp_path, {"content": ""}) == []
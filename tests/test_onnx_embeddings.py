@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+onnx = pytest.importorskip("onnx")
+pytest.importorskip("onnxruntime")
+from onnx import TensorProto, helper, numpy_helper  # noqa: E402
+from tokenizers import Tokenizer, models, pre_tokenizers  # noqa: E402
+from src.utils.onnx_embeddings import MODEL_FILE, TOKENIZER_FILE, OnnxEmbeddings, parity, quantize  # noqa: E402
+
+WORDS = ["[PAD]", "[UNK]", "fablab", "arduino", "printer", "opens", "at", "nine"]
+DIMENSION = 16
+
+
+def write_model(directory, name=MODEL_FILE):
+    """Tiny transformer stand-in: token embedding lookup followed by a projection"""
+    rng = np.random.default_rng(0)
+    embedding = numpy_helper.from_array(rng.standard_normal((len(WORDS), DIMENSION)).astype(np.float32), "embedding")
+    projection = numpy_helper.from_array(rng.standard_normal((DIMENSION, DIMENSION)).astype(np.float32), "projection")
+    graph = helper.make_graph(
+        [helper.make_node("Gather", ["embedding", "input_ids"], ["tokens"]),
+         helper.make_node("MatMul", ["tokens", "projection"], ["last_hidden_state"])],
+        "encoder",
+        [helper.make_tensor_value_info("input_ids", TensorProto.INT64, ["batch", "sequence"]),
+         helper.make_tensor_value_info("attention_mask", TensorProto.INT64, ["batch", "sequence"])],
+        [helper.make_tensor_value_info("last_hidden_state", TensorProto.FLOAT, ["batch", "sequence", DIMENSION])],
+        initializer=[embedding, projection],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 17)], ir_version=8)
+    onnx.save(model, str(directory / name))
+
+    tokenizer = Tokenizer(models.WordLevel({word: i for i, word in enumerate(WORDS)}, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer.save(str(directory / TOKENIZER_FILE))
+
+
+def test_vectors_are_normalized_and_independent_of_padding(tmp_path):
+    write_model(tmp_path)
+    embeddings = OnnxEmbeddings(tmp_path, threads=1, batch_size=2)
+    alone = embeddings.embed_query("fablab arduino")
+    batched = embeddings.embed_documents(["fablab arduino", "the fablab opens at nine", "printer"])
+    assert np.allclose(alone, batched[0], atol=1e-5)
+    assert np.allclose(np.linalg.norm(batched, axis=1), 1.0, atol=1e-5)
+
+
+def test_int8_model_matches_float_model(tmp_path):
+    write_model(tmp_path, "model.onnx")
+    quantize(tmp_path / "model.onnx", tmp_path / MODEL_FILE)
+
+    reference_dir = tmp_path / "reference"
+    reference_dir.mkdir()
+    write_model(reference_dir)
+    texts = ["fablab arduino", "the fablab opens at nine", "printer"]
+    result = parity(OnnxEmbeddings(reference_dir, threads=1), OnnxEmbeddings(tmp_path, threads=1), texts)
+    assert result["min_cosine"] > 0.99
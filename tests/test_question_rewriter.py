@@ -0,0 +1,27 @@
+from src.utils.question_rewriter import is_follow_up, rewrite_question
+
+
+def test_detects_follow_ups():
+    assert is_follow_up("How much is it?", 'en')
+    assert is_follow_up("And laser cutters?", 'en')
+    assert is_follow_up("How many are there?", 'en')
+    assert is_follow_up("Et comment y accéder avec ça ?", 'fr')
+    assert is_follow_up("واش فيها شي تكوين؟", 'ar')
+    assert is_follow_up("Saturday?", 'en')
+    assert not is_follow_up("What programs does the Orange Digital Center offer?")
+    assert not is_follow_up("واش عندكم طابعة ثلاثية الأبعاد فالفاب لاب؟")
+
+
+def test_standalone_questions_are_not_follow_ups():
+    assert not is_follow_up("Are there any upcoming events?", 'en')
+    assert not is_follow_up("Is there a FabLab in Rabat?", 'en')
+    assert not is_follow_up("Y a-t-il des ateliers ?", 'fr')
+    assert not is_follow_up("Il y a des formations en robotique ?", 'fr')
+    assert not is_follow_up("كاين شي ورشات؟", 'ar')
+
+
+def test_rewrite_expands_only_follow_ups():
+    previous = "Do you have a 3D printer?"
+    assert rewrite_question("How many are there?", previous) == f"{previous} How many are there?"
+    assert rewrite_question("What is the Coding School at ODC?", previous) == "What is the Coding School at ODC?"
+    assert rewrite_question("How many are there?", None) == "How many are there?"
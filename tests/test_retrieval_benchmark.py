@@ -0,0 +1,54 @@
+from pathlib import Path
+from langchain.schema import Document
+from benchmarks.retrieval import QUERIES_FILE
+from src.utils.document_processor import JSONLoader
+from src.utils.retrieval_benchmark import compare, evaluate, load_queries
+
+QUERIES = [
+    {"query": "Do you have an ESP32?", "language": "en", "sources": ["materials_detailed.json"],
+     "items": ["ESP32 Cam", "ESP32 Development Board"]},
+    {"query": "Prochaines formations", "language": "fr", "sources": ["upcoming_training_events.json"]},
+    {"query": "Wach kayn Meta Quest?", "language": "ar", "sources": ["materials_detailed.json"],
+     "items": ["Meta Quest 2 VR Headset"]},
+]
+
+RESULTS = {
+    "Do you have an ESP32?": [Document(page_content="", metadata={"source": "data/materials_detailed.json",
+                                                                   "name": "Arduino Uno"}),
+                              Document(page_content="", metadata={"source": "data/materials_detailed.json",
+                                                                   "name": "ESP32 Cam"})],
+    "Prochaines formations": [Document(page_content="", metadata={"source": "data/upcoming_training_events.json"})],
+    "Wach kayn Meta Quest?": [Document(page_content="", metadata={"source": "data/odc_knowledge_base.json",
+                                                                   "name": "Meta Quest 2 VR Headset"})],
+}
+
+
+def test_recall_and_mrr():
+    report = evaluate(RESULTS.get, QUERIES, ks=(1, 3), rounds=2)
+    assert report["recall@1"] == 1 / 3
+    assert report["recall@3"] == 2 / 3
+    assert report["mrr"] == (1 / 2 + 1) / 3
+    assert report["by_language"]["en"]["recall@1"] == 0.0
+    assert report["misses"] == ["Wach kayn Meta Quest?"]  # Right name, wrong source file
+    assert report["latency_ms_p95"] >= report["latency_ms_p50"] >= 0
+
+
+def test_compare_reports_changes():
+    report = {"retrievers": {"dense": {"recall@1": 0.5, "mrr": 0.6, "queries": 3, "misses": []}},
+              "index": {"build_seconds": 2.0, "size_bytes": 1000}}
+    baseline = {"retrievers": {"dense": {"recall@1": 0.25, "mrr": 0.6, "queries": 3, "misses": []}},
+                "index": {"build_seconds": 3.0, "size_bytes": 1000}}
+    assert compare(report, baseline) == {"dense": {"recall@1": 0.25, "mrr": 0.0},
+                                         "index": {"build_seconds": -1.0, "size_bytes": 0}}
+
+
+def test_labelled_queries_match_the_data():
+    names = {}
+    for path in Path("data").glob("*.json"):
+        names[path.name] = {doc.metadata.get("name") for doc in JSONLoader(path).load()}
+    queries = load_queries(QUERIES_FILE)
+    assert {query["language"] for query in queries} == {"en", "fr", "ar"}
+    for query in queries:
+        assert all(source in names for source in query["sources"]), query["query"]
+        for item in query.get("items", []):
+            assert any(item in names[source] for source in query["sources"]), item
@@ -0,0 +1,133 @@
+import asyncio
+import socket
+import threading
+import time
+from aiohttp import web
+from src.handlers.remote_handler import RemoteHandler
+from src.server import ChatServer, ChatSession
+
+
+class FakeHandler:
+    """Answers with the session's language and how many questions it has seen"""
+
+    greetings = {"en": "Hello!", "fr": "Bonjour !", "ar": "سلام!"}
+
+    def __init__(self, language):
+        self.selected_language = language
+        self.history = []
+        self.last_response = None
+
+    async def aget_response(self, question, context=""):
+        self.history.append(question)
+        return {"answer": f"{self.selected_language}:{len(self.history)}:{question}", "sources": []}
+
+    async def astream_response(self, question):
+        if question == "crash":
+            raise RuntimeError("pipeline down")
+        self.last_response = await self.aget_response(question)
+        for token in self.last_response["answer"].split(":"):
+            yield token
+
+
+class RunningServer:
+    """ChatServer on a free local port, served from its own event loop thread"""
+
+    def __init__(self):
+        self.server = ChatServer(handler_factory=FakeHandler)
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            self.port = s.getsockname()[1]
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.loop = asyncio.new_event_loop()
+        self.runner = web.AppRunner(self.server.create_app())
+        started = threading.Event()
+
+        def serve():
+            asyncio.set_event_loop(self.loop)
+            self.loop.run_until_complete(self.runner.setup())
+            self.loop.run_until_complete(web.TCPSite(self.runner, "127.0.0.1", self.port).start())
+            started.set()
+            self.loop.run_forever()
+
+        self.thread = threading.Thread(target=serve, daemon=True)
+        self.thread.start()
+        started.wait(5)
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+
+
+def test_sessions_are_isolated():
+    running = RunningServer()
+    try:
+        first, second = RemoteHandler(running.url, "en"), RemoteHandler(running.url, "fr")
+        assert first.get_response("hours?")["answer"] == "en:1:hours?"
+        assert first.get_response("price?")["answer"] == "en:2:price?"
+        assert second.get_response("horaires ?")["answer"] == "fr:1:horaires ?"
+
+        second.selected_language = "ar"
+        assert asyncio.run(second.aget_response("وقتاش؟"))["answer"] == "ar:2:وقتاش؟"
+        assert len(running.server.sessions) == 2
+
+        first.clear_memory()  # New session, the old one is deleted
+        assert first.get_response("hours?")["answer"] == "en:1:hours?"
+        assert len(running.server.sessions) == 2
+    finally:
+        running.close()
+
+
+def test_websocket_round_trip():
+    running = RunningServer()
+    try:
+        handler = RemoteHandler(running.url, "en")
+
+        async def stream():
+            return [token async for token in handler.astream_response("events?")]
+
+        assert asyncio.run(stream()) == ["en", "1", "events?"]
+        assert handler.last_response == {"answer": "en:1:events?", "sources": []}
+    finally:
+        running.close()
+
+
+def test_websocket_closed_without_answer():
+    running = RunningServer()
+    try:
+        handler = RemoteHandler(running.url, "fr")
+
+        async def stream():
+            return [token async for token in handler.astream_response("crash")]
+
+        assert asyncio.run(stream()) == ["Désolé, j'ai rencontré une erreur."]
+        assert handler.last_response == handler.error_response("fr")
+    finally:
+        running.close()
+
+
+def test_unknown_session_and_unreachable_server():
+    running = RunningServer()
+    try:
+        handler = RemoteHandler(running.url, "en")
+        handler.session_id = "missing"
+        assert handler.get_response("hours?") == handler.error_response()
+    finally:
+        running.close()
+    assert handler.get_response("hours?") == handler.error_response()
+
+
+def test_idle_sessions_expire():
+    server = ChatServer(handler_factory=FakeHandler)
+
+    async def scenario():
+        for language in ("en", "fr", "ar"):
+            server.sessions[f"session-{language}"] = ChatSession(FakeHandler(language))
+        now = time.time()
+        server.sessions["session-en"].last_seen = now - 100
+        server.sessions["session-fr"].last_seen = now - 100
+        async with server.sessions["session-fr"].lock:  # Mid-turn sessions are kept
+            server.expire_idle_sessions(now, ttl=60)
+        assert sorted(server.sessions) == ["session-ar", "session-fr"]
+
+    asyncio.run(scenario())
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import time
+from src.utils.speech_player import SpeechPlayer
+
+
+class FakeMPV:
+    """Reads the python stream on its own thread like libmpv, 'playing' 10 ms per chunk"""
+
+    def __init__(self):
+        self.streams, self.callbacks, self.played = {}, [], []
+        self.stopped = threading.Event()
+
+    def python_stream(self):
+        def register(generator_fun):
+            name = f"stream{len(self.streams)}"
+            self.streams[name] = generator_fun
+            generator_fun.stream_uri = f"python://{name}"
+            generator_fun.unregister = lambda: self.streams.pop(name)
+            return generator_fun
+        return register
+
+    def event_callback(self, event_type):
+        def register(callback):
+            self.callbacks.append(callback)
+            return callback
+        return register
+
+    def play(self, uri):
+        self.stopped.clear()
+        threading.Thread(target=self._play, args=(self.streams[uri[len("python://"):]],)).start()
+
+    def _play(self, generator_fun):
+        for chunk in generator_fun():
+            if self.stopped.is_set():
+                break
+            time.sleep(0.01)
+            self.played.append(chunk)
+        for callback in self.callbacks:
+            callback({"event": "end-file"})
+
+    def stop(self):
+        self.stopped.set()
+
+
+async def chunks(count, delay=0.0):
+    for i in range(count):
+        await asyncio.sleep(delay)
+        yield b"mp3-%d" % i
+
+
+def test_play_streams_chunks_without_blocking_the_loop():
+    async def scenario():
+        fake = FakeMPV()
+        player = SpeechPlayer(fake)
+        ticks = 0
+
+        async def other_work():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        worker = asyncio.create_task(other_work())
+        await player.play(chunks(5))
+        await player.play(chunks(2))  # Same player, next utterance
+        worker.cancel()
+        assert fake.played == [b"mp3-0", b"mp3-1", b"mp3-2", b"mp3-3", b"mp3-4", b"mp3-0", b"mp3-1"]
+        assert ticks >= 5
+        assert fake.streams == {}
+
+    asyncio.run(scenario())
+
+
+def test_stop_cuts_playback_short():
+    async def scenario():
+        fake = FakeMPV()
+        player = SpeechPlayer(fake)
+        playback = asyncio.create_task(player.play(chunks(100, delay=0.005)))
+        await asyncio.sleep(0.05)
+        player.stop()
+        await asyncio.wait_for(playback, timeout=1)
+        assert 0 < len(fake.played) < 100
+
+    asyncio.run(scenario())
+
+
+def test_synthesis_error_still_ends_the_stream():
+    async def failing():
+        yield b"mp3-0"
+        raise ConnectionError("edge-tts unreachable")
+
+    async def scenario():
+        fake = FakeMPV()
+        player = SpeechPlayer(fake)
+        try:
+            await asyncio.wait_for(player.play(failing()), timeout=1)
+        except ConnectionError:
+            pass
+        assert fake.played == [b"mp3-0"]
+        await asyncio.wait_for(player.play(chunks(1)), timeout=1)
+
+    asyncio.run(scenario())
@@ -0,0 +1,83 @@
+import sys
+import time
+import types
+import numpy as np
+from src.utils.speech_to_text import FasterWhisperSTT, SpeechToText
+
+AUDIO = np.zeros(1600, dtype=np.int16).tobytes()
+
+
+class FakeBackend:
+    def __init__(self, name, text=None, delay=0.0, error=None):
+        self.name, self.text, self.delay, self.error = name, text, delay, error
+        self.calls = []
+
+    def transcribe(self, audio, language):
+        self.calls.append((audio, language))
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.text
+
+
+def test_failure_moves_on_without_waiting_for_the_delay():
+    groq = FakeBackend("groq", error=ConnectionError("offline"))
+    local = FakeBackend("faster_whisper", " Do you have an Arduino? ")
+    stt = SpeechToText([groq, local], hedge_delay=10)
+    start = time.perf_counter()
+    assert stt.transcribe(AUDIO, "en") == "Do you have an Arduino?"
+    assert time.perf_counter() - start < 1
+    assert groq.calls == local.calls == [(AUDIO, "en")]  # Same recording, no re-recording
+    assert stt.stats == {"groq": {"wins": 0, "failures": 1, "skipped": 0},
+                         "faster_whisper": {"wins": 1, "failures": 0, "skipped": 0}}
+
+
+def test_slow_backend_is_hedged():
+    slow = FakeBackend("groq", "slow answer", delay=0.5)
+    fast = FakeBackend("google", "fast answer")
+    assert SpeechToText([slow, fast], hedge_delay=0.05).transcribe(AUDIO) == "fast answer"
+
+
+def test_fast_primary_does_not_start_the_others():
+    primary = FakeBackend("groq", "hello")
+    backup = FakeBackend("google", "hello")
+    assert SpeechToText([primary, backup], hedge_delay=0.5).transcribe(AUDIO) == "hello"
+    assert backup.calls == []
+
+
+def test_parallel_mode_and_nothing_understood():
+    backends = [FakeBackend("groq", "", delay=0.05), FakeBackend("google"), FakeBackend("vosk", delay=0.1)]
+    stt = SpeechToText(backends, hedge_delay=0)
+    start = time.perf_counter()
+    assert stt.transcribe(AUDIO) is None
+    assert time.perf_counter() - start < 0.3  # Ran side by side
+    assert all(len(backend.calls) == 1 for backend in backends)
+
+
+def test_loser_still_running_does_not_delay_the_next_turn():
+    stalled = FakeBackend("groq", "late answer", delay=0.5)
+    backup = FakeBackend("google", "hello")
+    stt = SpeechToText([stalled, backup], hedge_delay=0.05)
+    assert stt.transcribe(AUDIO) == "hello"
+    start = time.perf_counter()
+    assert stt.transcribe(AUDIO) == "hello"  # groq is still on the first recording
+    assert time.perf_counter() - start < 0.2
+    assert len(stalled.calls) == 1 and stt.stats["groq"]["skipped"] == 1
+
+
+def test_faster_whisper_model_loads_on_first_use(monkeypatch):
+    loaded = []
+
+    class WhisperModel:
+        def __init__(self, name, **options):
+            loaded.append(name)
+
+        def transcribe(self, samples, **options):
+            return [types.SimpleNamespace(text=" hello ")], None
+
+    monkeypatch.setitem(sys.modules, "faster_whisper", types.SimpleNamespace(WhisperModel=WhisperModel))
+    backend = FasterWhisperSTT("base")
+    assert loaded == []  # Creating the chain does not download the model
+    assert backend.transcribe(AUDIO, "en") == "hello"
+    assert backend.transcribe(AUDIO, "en") == "hello"
+    assert loaded == ["base"]
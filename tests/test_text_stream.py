@@ -0,0 +1,25 @@
+from src.utils.text_stream import SentenceSplitter
+
+
+def stream(text, splitter):
+    sentences = []
+    for token in text.split(" "):
+        sentences += splitter.feed(token + " ")
+    return sentences + splitter.flush()
+
+
+def test_releases_sentences_as_they_close():
+    splitter = SentenceSplitter()
+    assert splitter.feed("We have a 3D printer in the FabLab") == []
+    assert splitter.feed(". You can") == ["We have a 3D printer in the FabLab."]
+    assert splitter.flush() == ["You can"]
+
+
+def test_short_sentences_are_merged():
+    sentences = stream("Yes. We have two Ender 3 printers. Anything else?", SentenceSplitter())
+    assert sentences == ["Yes. We have two Ender 3 printers.", "Anything else?"]
+
+
+def test_arabic_question_mark_ends_sentence():
+    sentences = stream("واش بغيتي تعرف شي حاجة أخرى على الفاب لاب؟ مرحبا بك", SentenceSplitter())
+    assert sentences[0].endswith("؟")
@@ -0,0 +1,78 @@
+import numpy as np
+from src.utils.vad import SAMPLE_RATE, EnergyVAD, Endpointer, frame_samples
+
+FRAME_MS = 30
+
+
+def tone(ms, amplitude=8000):
+    t = np.arange(SAMPLE_RATE * ms // 1000) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.int16).tobytes()
+
+
+def noise(ms, amplitude=60, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(0, amplitude, SAMPLE_RATE * ms // 1000).astype(np.int16).tobytes()
+
+
+def frames(audio):
+    size = frame_samples(FRAME_MS) * 2
+    return [audio[i:i + size] for i in range(0, len(audio), size)]
+
+
+def make_endpointer(**options):
+    settings = dict(frame_ms=FRAME_MS, pre_roll_ms=150, trailing_silence_ms=300, min_speech_ms=60,
+                    no_speech_timeout=2, max_recording=5)
+    settings.update(options)
+    return Endpointer(EnergyVAD(margin_db=12), **settings)
+
+
+def feed(endpointer, audio):
+    for count, frame in enumerate(frames(audio), 1):
+        if endpointer.feed(frame):
+            return count
+    return None
+
+
+def test_energy_vad_tracks_noise_floor():
+    vad = EnergyVAD(margin_db=12)
+    assert not any(vad.is_speech(frame) for frame in frames(noise(600)))
+    assert all(vad.is_speech(frame) for frame in frames(tone(300)))
+
+
+def test_energy_vad_follows_a_lasting_rise_in_noise():
+    vad = EnergyVAD(margin_db=12, window_ms=3000, frame_ms=FRAME_MS)
+    assert not any(vad.is_speech(frame) for frame in frames(noise(2000)))
+    # A fan starts: louder than the margin, taken for speech until the window has passed
+    voiced = [vad.is_speech(frame) for frame in frames(noise(10000, amplitude=400, seed=1))]
+    assert all(voiced[:50]) and not any(voiced[110:])
+    assert all(vad.is_speech(frame) for frame in frames(tone(2000)))
+
+
+def test_stops_after_trailing_silence_and_keeps_pre_roll():
+    endpointer = make_endpointer()
+    audio = noise(900) + tone(600) + noise(2000, seed=1)
+    stopped_at = feed(endpointer, audio)
+    assert endpointer.speech_detected
+    # 30 noise frames, 20 speech frames, 10 silent frames to end
+    assert stopped_at == 30 + 20 + 10
+    captured = endpointer.audio()
+    assert len(captured) == len(b''.join(frames(audio)[30 - 5:stopped_at]))  # 150 ms of pre-roll
+    assert tone(600)[:1000] in captured
+
+
+def test_short_pause_does_not_end_utterance():
+    endpointer = make_endpointer()
+    stopped_at = feed(endpointer, noise(300) + tone(300) + noise(150, seed=1) + tone(300) + noise(1000, seed=2))
+    assert stopped_at == 10 + 10 + 5 + 10 + 10
+
+
+def test_gives_up_without_speech():
+    endpointer = make_endpointer()
+    assert feed(endpointer, noise(5000)) == 2000 // FRAME_MS
+    assert not endpointer.speech_detected and endpointer.audio() == b''
+
+
+def test_long_speech_is_capped():
+    endpointer = make_endpointer(max_recording=1)
+    feed(endpointer, noise(300) + tone(3000))
+    assert len(endpointer.frames) == 1000 // FRAME_MS
@@ -0,0 +1,46 @@
+from langchain_community.vectorstores import FAISS
+from src.utils import vector_store_io
+from tests.test_incremental_index import CountingEmbeddings
+
+TEXTS = ["The FabLab opens at nine.", "Arduino workshop on Monday.", "Robotics bootcamp on Friday."]
+
+
+def build(tmp_path):
+    embeddings = CountingEmbeddings()
+    store = FAISS.from_texts(TEXTS, embeddings, metadatas=[{"source": f"{i}.json"} for i in range(3)],
+                             ids=["a", "b", "c"])
+    vector_store_io.save(store, tmp_path)
+    return store, embeddings
+
+
+def test_mmap_load_matches_saved_store(tmp_path):
+    store, embeddings = build(tmp_path)
+    loaded = vector_store_io.load(tmp_path, embeddings)
+
+    assert isinstance(loaded.docstore, vector_store_io.SQLiteDocstore)
+    assert dict(loaded.index_to_docstore_id) == store.index_to_docstore_id
+    for text in TEXTS:
+        expected = store.similarity_search(text, k=2)
+        assert loaded.similarity_search(text, k=2) == expected
+    assert loaded.docstore.search("b").metadata == {"source": "1.json"}
+    assert loaded.docstore.search("missing") == "ID missing not found."
+
+
+def test_editable_load_supports_delete(tmp_path):
+    _, embeddings = build(tmp_path)
+    loaded = vector_store_io.load(tmp_path, embeddings, mmap=False)
+    loaded.delete(["b"])
+    vector_store_io.save(loaded, tmp_path / "next")
+
+    reloaded = vector_store_io.load(tmp_path / "next", embeddings)
+    assert list(reloaded.index_to_docstore_id.values()) == ["a", "c"]
+    assert reloaded.similarity_search(TEXTS[2], k=1)[0].page_content == TEXTS[2]
+
+
+def test_publish_replaces_pointer(tmp_path):
+    pointer = tmp_path / "index_version"
+    assert vector_store_io.read_version(pointer) == ""
+    vector_store_io.publish(pointer, "1-a")
+    vector_store_io.publish(pointer, "2-b")
+    assert vector_store_io.read_version(pointer) == "2-b"
+    assert [path.name for path in tmp_path.iterdir()] == ["index_version"]